@@ -0,0 +1,216 @@
+"""
+End-to-end page-load benchmark
+
+Starts the browser offscreen against the local fixture server and
+records:
+- startup: time to the window, to its first paint, until the staged
+  session restore has finished (time to interactive), to the first
+  contentful paint and to the first finished load of the homepage
+- navigation: navigate_to_url → loadFinished for light and heavy pages
+  (large DOM, many stylesheets, scripts and images)
+- tab creation: the cost of add_new_tab itself and until the tab loaded
+- memory of the browser and its renderers with 1, 10 and 50 tabs open
+
+Results are written as JSON with a fixed layout, so runs from two
+commits can be diffed directly or compared with --baseline.
+
+Usage:
+    python bench_page_load.py
+    python bench_page_load.py --output before.json
+    python bench_page_load.py --output after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer, QUrl
+from PyQt6.QtWidgets import QApplication
+
+from bench_session_restore import process_tree_rss_mb
+from fixture_server import FixtureServer
+from main import Browser, SettingsManager
+
+PAGES = {
+    'light': {'paragraphs': 50, 'assets': 1},
+    'heavy': {'paragraphs': 5000, 'assets': 10, 'scripts': 10, 'images': 30},
+}
+# Paint timing of the current document relative to time.time(), in ms
+FIRST_PAINT_SCRIPT = """(() => {
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    return paint ? performance.timeOrigin + paint.startTime : null;
+})()"""
+
+
+def wait_for(signal, timeout_ms=30000):
+    loop = QEventLoop()
+    signal.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(loop.quit)
+
+
+def run_js(page, script, timeout_ms=5000):
+    result = []
+    loop = QEventLoop()
+    page.runJavaScript(script, lambda value: (result.append(value), loop.quit()))
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    return result[0] if result else None
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'runs': len(timings),
+        'mean_ms': statistics.fmean(timings),
+        'p50_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'max_ms': timings[-1]
+    }
+
+
+def page_url(server, kind, n):
+    query = '&'.join(f'{key}={value}' for key, value in PAGES[kind].items())
+    return server.url(f'/page/{kind}-{n}?{query}')
+
+
+def measure_startup(server):
+    settings = SettingsManager()
+    settings.set('homepage', page_url(server, 'light', 'home'))
+    start_wall = time.time()
+    start = time.perf_counter()
+    browser = Browser()
+    window_ms = (time.perf_counter() - start) * 1000
+    # The window paints first; tabs only exist once the restore has run
+    wait_for(browser.startup_finished)
+    if browser.tab_metrics['first_load_ms'] is None:
+        wait_for(browser.current_browser().loadFinished)
+    loaded_ms = browser.tab_metrics['first_load_ms']
+    # Chromium may not report paint timing without a real display; the
+    # source field says which measurement was used.
+    painted_at = run_js(browser.current_browser().page(), FIRST_PAINT_SCRIPT)
+    result = {
+        'window_ms': window_ms,
+        'window_paint_ms': browser.tab_metrics['first_paint_ms'],
+        'interactive_ms': browser.tab_metrics['interactive_ms'],
+        'first_paint_ms': painted_at - start_wall * 1000 if painted_at else loaded_ms,
+        'first_paint_source': 'first-contentful-paint' if painted_at else 'loadFinished',
+        'first_load_ms': loaded_ms
+    }
+    return browser, result
+
+
+def measure_navigation(browser, server, kind, runs):
+    timings = []
+    for n in range(runs):
+        tab = browser.current_browser()
+        start = time.perf_counter()
+        browser.navigate_to_url(page_url(server, kind, n))
+        wait_for(tab.loadFinished)
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def measure_tabs(browser, server, counts):
+    """Open tabs until each count is reached; returns the tab-creation
+    timings and the memory at each count"""
+    create_ms, loaded_ms, memory = [], [], {}
+    for count in counts:
+        while browser.tabs.count() < count:
+            start = time.perf_counter()
+            tab = browser.add_new_tab(QUrl(page_url(server, 'light', f'tab{browser.tabs.count()}')), 'Fixture')
+            create_ms.append((time.perf_counter() - start) * 1000)
+            wait_for(tab.loadFinished)
+            loaded_ms.append((time.perf_counter() - start) * 1000)
+        rss = process_tree_rss_mb()
+        memory[str(count)] = {'total_mb': rss, 'per_tab_mb': rss / count}
+    return {'create': summarize(create_ms), 'create_to_loaded': summarize(loaded_ms)}, memory
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def flatten(report, prefix=''):
+    """Numeric leaves of the results as {'a.b.c': value}"""
+    values = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)):
+            values[f'{prefix}{key}'] = value
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure startup, navigation, tab creation and memory per tab')
+    parser.add_argument('--delay', type=float, default=50, help='fixture server delay per response in ms')
+    parser.add_argument('--runs', type=int, default=20, help='navigations per page kind')
+    parser.add_argument('--tabs', type=int, nargs='+', default=[1, 10, 50], help='tab counts to measure memory at')
+    parser.add_argument('--output', default='page_load_results.json', help='JSON file for the results')
+    parser.add_argument('--baseline', help='earlier results to compare with')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    server = FixtureServer(delay_ms=args.delay).start()
+    cwd = os.getcwd()
+    output = os.path.abspath(args.output)
+    # The browser keeps its profile in the working directory
+    work_dir = tempfile.mkdtemp(prefix='browser_page_load_bench_')
+    os.chdir(work_dir)
+    try:
+        print("⏱  Measuring startup...")
+        browser, startup = measure_startup(server)
+        navigation = {}
+        for kind in PAGES:
+            print(f"⏱  Navigating to {args.runs} {kind} pages...")
+            navigation[kind] = measure_navigation(browser, server, kind, args.runs)
+        print(f"⏱  Opening up to {max(args.tabs)} tabs...")
+        tabs, memory = measure_tabs(browser, server, sorted(args.tabs))
+        browser.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        server.stop()
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'settings': {'delay_ms': args.delay, 'runs': args.runs, 'tabs': sorted(args.tabs), 'pages': PAGES},
+        'results': {'startup': startup, 'navigation': navigation, 'tabs': tabs, 'memory': memory}
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, sort_keys=True)
+
+    results = flatten(report['results'])
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = flatten(json.load(f).get('results', {}))
+    print(f"\n{'metric':<44} {'value':>12} {'vs baseline':>12}")
+    print('-' * 70)
+    for name, value in results.items():
+        line = f"{name:<44} {value:>12.1f}"
+        if baseline.get(name):
+            line += f" {value / baseline[name] - 1:>+11.1%}"
+        print(line)
+    print(f"\n💾 Results written to {output}")
+    app.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Speculative preload benchmark
+
+Opens a new tab in a browser window and types fixture site addresses
+into its URL bar one key at a time, which preloads the confident top
+match. The simulated user presses Enter as soon as the inline completion
+shows the site they want. The time from Enter until the page finishes
+loading is measured with preloading on and off, against the local
+fixture server.
+
+Usage:
+    python bench_preload.py
+    python bench_preload.py --trials 100 --delay 300 --key-interval 150
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from fixture_server import FixtureServer
+from main import Browser, BrowserDatabase, OmniboxIndex
+
+WORDS = ('python', 'browser', 'news', 'weather', 'docs', 'tutorial', 'video', 'search',
+         'github', 'shop', 'recipe', 'travel', 'music', 'sports', 'science', 'finance')
+
+
+def wait(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def wait_for(signal, timeout_ms=30000):
+    loop = QEventLoop()
+    signal.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(loop.quit)
+
+
+def make_sites(count, rng):
+    """Site URLs with Zipf-like popularity, most popular first"""
+    names = [f'{a}{b}' for a in WORDS for b in WORDS if a != b]
+    rng.shuffle(names)
+    return [f'http://{name}.test/' for name in names[:count]]
+
+
+def build_index(sites, now):
+    omnibox = OmniboxIndex()
+    for rank, url in enumerate(sites):
+        for visit in range(max(1, 60 // (rank + 1))):
+            visited_at = (now - timedelta(days=visit % 30, minutes=rank)).isoformat()
+            omnibox.record_visit(url.split('//')[1].split('.')[0].title(), url, visited_at)
+    return omnibox
+
+
+def run_trials(window, sites, weights, args, rng):
+    """Return the Enter-to-loaded time of each trial in ms"""
+    timings = []
+    for _ in range(args.trials):
+        view = window.add_new_tab()
+        wait_for(view.loadFinished)
+        url = rng.choices(sites, weights)[0]
+        address = url.split('//', 1)[1]
+        for end in range(1, len(address) + 1):
+            # setText does not emit textEdited, which the URL bar reacts to
+            window.url_bar.setText(address[:end])
+            window.update_suggestions(address[:end])
+            wait(args.key_interval)
+            if window.omnibox.preload_candidate(address[:end]) == url:
+                break
+
+        start = time.perf_counter()
+        entry = window.preloader.pending.get(BrowserDatabase.normalize_url(url))
+        ready = entry is not None and entry['load_ms'] is not None
+        hits = window.preloader.stats['hits']
+        window.navigate_to_url(url)
+        if window.preloader.stats['hits'] == hits or not ready:
+            wait_for(view.loadFinished)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        window.remove_tab(window.tabs.indexOf(view))
+        wait(args.idle)
+    return timings
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'mean_ms': statistics.fmean(timings),
+        'p50_ms': statistics.median(timings),
+        'p95_ms': timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure speculative preload hit rate and time saved')
+    parser.add_argument('--trials', type=int, default=50)
+    parser.add_argument('--sites', type=int, default=40)
+    parser.add_argument('--delay', type=float, default=250, help='fixture server delay per response in ms')
+    parser.add_argument('--key-interval', type=int, default=120, help='ms between simulated keystrokes')
+    parser.add_argument('--idle', type=int, default=200, help='ms to wait between trials')
+    parser.add_argument('--budget', type=int, default=2, help='speculative loads allowed at once')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    server = FixtureServer(delay_ms=args.delay).start()
+    # Every *.test host resolves to the fixture server, so sites get
+    # distinct addresses to type while all traffic stays local.
+    app = QApplication(sys.argv[:1] + [f'--host-resolver-rules=MAP *.test 127.0.0.1:{server.port}'])
+
+    sites = make_sites(args.sites, random.Random(7))
+    weights = [1 / (rank + 1) for rank in range(len(sites))]
+    report = {'created_at': datetime.now().isoformat(), 'settings': vars(args), 'modes': {}}
+    cwd = os.getcwd()
+    # The window keeps its profile, history and session in the working
+    # directory; use a throwaway one
+    os.chdir(tempfile.mkdtemp(prefix='browser_preload_bench_'))
+    try:
+        window = Browser()
+        wait_for(window.startup_finished)
+        window.settings_manager.set('homepage', server.url('/start'))
+        for mode, budget in (('without_preload', 0), ('with_preload', args.budget)):
+            print(f"⏱  Running {args.trials} trials {mode.replace('_', ' ')}...")
+            window.omnibox = build_index(sites, datetime.now())
+            window.preloader.cancel()
+            window.preloader.budget = budget
+            window.preloader.stats = dict.fromkeys(window.preloader.stats, 0)
+            timings = run_trials(window, sites, weights, args, random.Random(42))
+            report['modes'][mode] = {**summarize(timings), **window.preloader.metrics()}
+        window.preloader.cancel()
+    finally:
+        os.chdir(cwd)
+        server.stop()
+
+    base = report['modes']['without_preload']
+    fast = report['modes']['with_preload']
+    print(f"\n{'mode':<18} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    print('-' * 52)
+    for mode, result in report['modes'].items():
+        print(f"{mode:<18} {result['mean_ms']:>10.1f} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f}")
+    print(f"\nHit rate: {fast['hit_rate']:.0%} ({fast['hits']} hits, {fast['misses']} misses, "
+          f"{fast['discarded']} discarded of {fast['started']} started)")
+    print(f"Time saved per hit: {fast['avg_saved_ms']:.1f} ms; "
+          f"mean Enter-to-loaded time {base['mean_ms'] - fast['mean_ms']:.1f} ms lower")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    app.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Session restore benchmark
+
+Writes an N-tab session pointing at the local fixture server and starts
+the browser on it. Reports:
+- startup time, first paint, time to interactive and time until the
+  active tab has loaded
+- memory of the browser and its renderer processes
+- the latency of switching to each restored tab and of loading it
+
+The lazy restore the browser does is compared with loading every tab up
+front, which is what restoring used to do. Switching back and forth
+between two named sessions of the same size is timed as well.
+
+Usage:
+    python bench_session_restore.py
+    python bench_session_restore.py --tabs 60 --delay 150
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from fixture_server import FixtureServer
+from main import Browser, SessionManager, TabPlaceholder
+
+
+def wait_for(signal, timeout_ms=30000):
+    loop = QEventLoop()
+    signal.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(loop.quit)
+
+
+def process_tree_rss_mb(pid=None):
+    """Resident memory of pid and all of its descendants, in MB"""
+    pid = pid or os.getpid()
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree = {pid}
+    grew = True
+    while grew:
+        children = {child for child, parent in parents.items() if parent in tree} - tree
+        tree |= children
+        grew = bool(children)
+
+    total_kb = 0
+    for member in tree:
+        try:
+            with open(f'/proc/{member}/status', 'r') as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            continue
+    return total_kb / 1024
+
+
+def run_mode(server, tabs, eager):
+    session_tabs = [{'url': server.url(f'/page/{i}'), 'title': f'Fixture {i}', 'index': i} for i in range(tabs)]
+    SessionManager().save_session(session_tabs, set(), current_tab=tabs // 2)
+
+    browser = Browser()
+    startup_ms = browser.tab_metrics['startup_ms']
+    # The window paints first and restores the session in stages after
+    wait_for(browser.startup_finished)
+    if browser.tab_metrics['first_load_ms'] is None:
+        wait_for(browser.current_browser().loadFinished)
+    result = {
+        'startup_ms': startup_ms,
+        'window_paint_ms': browser.tab_metrics['first_paint_ms'],
+        'interactive_ms': browser.tab_metrics['interactive_ms'],
+        'first_load_ms': browser.tab_metrics['first_load_ms'],
+        'materialized_at_startup': browser.tab_metrics['materialized_tabs']
+    }
+
+    if eager:
+        start = time.perf_counter()
+        loading = set()
+        for i in range(browser.tabs.count()):
+            if isinstance(browser.tabs.widget(i), TabPlaceholder):
+                tab = browser.materialize_tab(i)
+                loading.add(tab)
+                tab.loadFinished.connect(lambda ok, tab=tab: loading.discard(tab))
+        deadline = time.monotonic() + 120
+        while loading and time.monotonic() < deadline:
+            QApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        result['all_loaded_ms'] = result['first_load_ms'] + (time.perf_counter() - start) * 1000
+    result['rss_after_startup_mb'] = process_tree_rss_mb()
+
+    switch_ms, load_ms = [], []
+    for i in range(browser.tabs.count()):
+        if i == browser.tabs.currentIndex():
+            continue
+        placeholder = isinstance(browser.tabs.widget(i), TabPlaceholder)
+        start = time.perf_counter()
+        browser.tabs.setCurrentIndex(i)
+        switch_ms.append(browser.tab_metrics['switch_ms'][-1])
+        if placeholder:
+            wait_for(browser.current_browser().loadFinished)
+        load_ms.append((time.perf_counter() - start) * 1000)
+    result['switch_p50_ms'] = statistics.median(switch_ms)
+    result['switch_max_ms'] = max(switch_ms)
+    result['switch_to_loaded_p50_ms'] = statistics.median(load_ms)
+    result['rss_all_tabs_mb'] = process_tree_rss_mb()
+
+    browser.close()
+    return result
+
+
+def run_switches(server, tabs, switches=10):
+    manager = SessionManager()
+    for name in ('Alpha', 'Beta'):
+        manager.save_named_session(name, [{'url': server.url(f'/page/{name}-{i}'), 'title': f'{name} {i}', 'index': i}
+                                          for i in range(tabs)], set(), current_tab=0)
+    browser = Browser()
+    wait_for(browser.startup_finished)
+    switch_ms, loaded_ms = [], []
+    for i in range(switches):
+        start = time.perf_counter()
+        browser.switch_session(('Alpha', 'Beta')[i % 2])
+        switch_ms.append(browser.tab_metrics['session_switch_ms'])
+        wait_for(browser.current_browser().loadFinished)
+        loaded_ms.append((time.perf_counter() - start) * 1000)
+        assert browser.tabs.count() == tabs
+    browser.close()
+    return {'session_switch_p50_ms': statistics.median(switch_ms), 'session_switch_max_ms': max(switch_ms),
+            'session_switch_to_loaded_p50_ms': statistics.median(loaded_ms)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure lazy versus eager session restore')
+    parser.add_argument('--tabs', type=int, default=30)
+    parser.add_argument('--delay', type=float, default=150, help='fixture server delay per response in ms')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    server = FixtureServer(delay_ms=args.delay).start()
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='browser_restore_bench_')
+    os.chdir(work_dir)
+    report = {'created_at': datetime.now().isoformat(), 'settings': vars(args), 'modes': {}}
+    try:
+        for mode, eager in (('lazy', False), ('eager', True)):
+            print(f"⏱  Restoring {args.tabs} tabs {mode}ly...")
+            report['modes'][mode] = run_mode(server, args.tabs, eager)
+        print(f"⏱  Switching between two {args.tabs}-tab sessions...")
+        report['session_switch'] = run_switches(server, args.tabs)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        server.stop()
+
+    keys = ('startup_ms', 'window_paint_ms', 'interactive_ms', 'first_load_ms', 'rss_after_startup_mb',
+            'switch_p50_ms', 'switch_to_loaded_p50_ms', 'rss_all_tabs_mb')
+    print(f"\n{'metric':<26} {'lazy':>12} {'eager':>12}")
+    print('-' * 52)
+    for key in keys:
+        print(f"{key:<26} {report['modes']['lazy'][key]:>12.1f} {report['modes']['eager'][key]:>12.1f}")
+    print(f"\nEager restore finished loading every tab after {report['modes']['eager']['all_loaded_ms']:.0f} ms")
+    switching = report['session_switch']
+    print(f"Session switch: p50 {switching['session_switch_p50_ms']:.1f} ms, "
+          f"max {switching['session_switch_max_ms']:.1f} ms, "
+          f"active tab loaded after {switching['session_switch_to_loaded_p50_ms']:.0f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    app.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
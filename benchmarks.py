@@ -0,0 +1,530 @@
+"""
+Benchmark suite for the browser's non-GUI managers
+
+Runs headless and reports throughput and latency percentiles for each case,
+then compares them with a stored baseline.
+
+Usage:
+    python benchmarks.py                    # run and compare with the baseline
+    python benchmarks.py --save-baseline    # run and store results as the baseline
+    python benchmarks.py --full             # include the 1M-row database cases
+    python benchmarks.py --only database    # run cases whose name starts with "database"
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from main import (BrowserDatabase, SessionManager, SessionJournal, SettingsManager, ExtensionManager,
+                  ThemeManager, OmniboxIndex, UiUpdateScheduler, TabSwitcherIndex)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SEARCH_BUDGET_MS = 10
+SEARCH_BUDGET_FULL_MS = 40  # 1M visits, where one-letter prefixes match most places
+OMNIBOX_BUDGET_MS = 5
+TAB_SWITCHER_BUDGET_MS = 2
+WORDS = ('python', 'browser', 'news', 'weather', 'docs', 'tutorial', 'video', 'search',
+         'github', 'shop', 'recipe', 'travel', 'music', 'sports', 'science', 'finance')
+
+
+class Timer:
+    """Collects per-operation latencies for one benchmark case"""
+
+    def __init__(self, name, ops_per_sample=1):
+        self.name = name
+        self.ops_per_sample = ops_per_sample
+        self.samples = []
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+
+    def result(self):
+        samples = sorted(self.samples)
+        total = sum(samples)
+        percentiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+        return {
+            'samples': len(samples),
+            'ops_per_sec': (len(samples) * self.ops_per_sample) / total if total else 0.0,
+            'p50_ms': percentiles[49] * 1000,
+            'p95_ms': percentiles[94] * 1000,
+            'p99_ms': percentiles[98] * 1000,
+            'max_ms': samples[-1] * 1000
+        }
+
+
+def make_rows(rng, count, start=datetime(2024, 1, 1)):
+    """Visits spread over count // 10 pages, a few of them very popular"""
+    pages = max(count // 10, 1)
+    rows = []
+    for i in range(count):
+        page = int(rng.paretovariate(1.2)) % pages if i % 2 else rng.randrange(pages)
+        words = ' '.join(WORDS[(page + k) % len(WORDS)] for k in range(4))
+        rows.append((f'{words.title()} {page}', f'https://{WORDS[page % len(WORDS)]}.example.com/{page}',
+                     (start + timedelta(seconds=15 * i)).isoformat()))
+    return rows
+
+
+def bench_database(results, sizes, rng):
+    for size in sizes:
+        db = BrowserDatabase(f'bench_{size}.db')
+        rows = make_rows(rng, size)
+
+        insert = Timer(f'database.insert_batch.{size}', ops_per_sample=1000)
+        for i in range(0, size, 1000):
+            with insert:
+                db.add_history_batch(rows[i:i + 1000])
+        results[insert.name] = insert.result()
+
+        single = Timer(f'database.add_history.{size}')
+        for i in range(200):
+            with single:
+                db.add_history(f'Single visit {i}', f'https://single.example.com/{i}')
+        results[single.name] = single.result()
+
+        recent = Timer(f'database.get_history.{size}')
+        for _ in range(200):
+            with recent:
+                db.get_history(100)
+        results[recent.name] = recent.result()
+
+        paging = Timer(f'database.history_page.{size}')
+        anchor = None
+        for _ in range(min(size // 200, 200)):
+            with paging:
+                page = db.get_history_page(anchor, 200)
+            if not page:
+                break
+            last = page[-1]
+            anchor = (last[3], last[4], last[0])
+        results[paging.name] = paging.result()
+
+        search = Timer(f'database.search.{size}')
+        next_page = Timer(f'database.search_next_page.{size}')
+        for i in range(200):
+            word = WORDS[i % len(WORDS)]
+            with search:
+                page = db.search_history(word[:1 + i % len(word)], 20)
+            with next_page:
+                db.search_history(word[:1 + i % len(word)], 20, (page[-1][4], page[-1][0]))
+        results[search.name] = search.result()
+        results[next_page.name] = next_page.result()
+        p99_ms = max(results[search.name]['p99_ms'], results[next_page.name]['p99_ms'])
+        budget_ms = SEARCH_BUDGET_MS if size <= 100000 else SEARCH_BUDGET_FULL_MS
+        print(f"   {size} visits: search page p99 {p99_ms:.2f} ms (budget {budget_ms} ms)")
+        assert p99_ms < budget_ms, "History search pages are over budget"
+
+        omnibox = OmniboxIndex()
+        omnibox.load(db)
+        keystrokes = Timer(f'database.omnibox_complete.{size}')
+        for i in range(200):
+            word = WORDS[i % len(WORDS)]
+            with keystrokes:
+                omnibox.complete(word[:1 + i % len(word)])
+        results[keystrokes.name] = keystrokes.result()
+
+        top = Timer(f'database.most_visited.{size}')
+        for _ in range(200):
+            with top:
+                db.get_most_visited(10)
+        results[top.name] = top.result()
+
+        db.close()
+
+
+class PlaceSource:
+    """Feeds OmniboxIndex.load() generated pages instead of a database"""
+
+    def __init__(self, places):
+        self.places = places
+
+    def iter_places(self):
+        return iter(self.places)
+
+    def iter_bookmarks(self):
+        return iter(())
+
+
+def bench_omnibox(results, rng, pages=500000):
+    """Broad multi-term URL bar queries against a large index"""
+    places = []
+    for page in range(pages):
+        words = rng.sample(WORDS, 4)
+        places.append((f'https://{words[0]}.example.com/{page}', f"{' '.join(words).title()} {page}",
+                       rng.paretovariate(1.2)))
+    omnibox = OmniboxIndex()
+    omnibox.load(PlaceSource(places))
+
+    broad = Timer(f'omnibox.broad_query.{pages}')
+    for _ in range(300):
+        query = ' '.join(rng.choice(WORDS)[:rng.randint(1, 3)] for _ in range(3))
+        with broad:
+            matches = omnibox.complete(query)
+        assert len(matches) == 8, "Every query has more than enough matches"
+    results[broad.name] = broad.result()
+    p99_ms = results[broad.name]['p99_ms']
+    print(f"   {pages} pages: broad 3-term query p99 {p99_ms:.2f} ms (budget {OMNIBOX_BUDGET_MS} ms)")
+    assert p99_ms < OMNIBOX_BUDGET_MS, "Broad omnibox queries are over budget"
+
+
+def bench_sessions(results, rng):
+    manager = SessionManager()
+    for count in (100, 500):
+        tabs = [{'url': f'https://{WORDS[i % len(WORDS)]}.example.com/{i}?q={rng.random()}',
+                 'title': f'Tab {i} ' + ' '.join(rng.sample(WORDS, 4)),
+                 'index': i} for i in range(count)]
+        pinned = set(range(0, count, 25))
+
+        save = Timer(f'session.save.{count}')
+        for _ in range(50):
+            with save:
+                manager.save_session(tabs, pinned)
+        results[save.name] = save.result()
+
+        load = Timer(f'session.load.{count}')
+        for _ in range(50):
+            with load:
+                manager.load_session()
+        results[load.name] = load.result()
+
+    # Thousands of tab events since the last snapshot, as after a long
+    # session that crashed before compacting
+    events = 10000
+    journal = SessionJournal(manager, sync_interval=0.5, compact_after=events + 1)
+    journal.start([(i, f'https://{WORDS[i % len(WORDS)]}.example.com/{i}', f'Tab {i}', False) for i in range(100)])
+    record = Timer('session.journal_record')
+    for i in range(events):
+        tab_id = rng.randrange(100)
+        with record:
+            journal.navigated(tab_id, f'https://{WORDS[i % len(WORDS)]}.example.com/{tab_id}/{i}')
+    results[record.name] = record.result()
+    journal.close()
+
+    replay = Timer(f'session.journal_replay.{events}')
+    for _ in range(10):
+        with replay:
+            SessionJournal(manager).load()
+    results[replay.name] = replay.result()
+    journal.clear()
+    manager.clear_session()
+    bench_snapshot_format(results, rng)
+    bench_named_sessions(results, rng)
+
+
+def bench_named_sessions(results, rng, count=100, sessions=20):
+    """Reading what a switch to a named session needs: its tab list and
+    its still-compressed histories"""
+    work_dir = tempfile.mkdtemp(prefix='browser_sessions_bench_')
+    try:
+        manager = SessionManager(os.path.join(work_dir, 'browser_session.bin'), None,
+                                 os.path.join(work_dir, 'sessions'))
+        for n in range(sessions):
+            tabs = [{'url': f'https://{WORDS[i % len(WORDS)]}.example.com/{n}/{i}', 'title': f'Tab {i}', 'index': i}
+                    for i in range(count)]
+            manager.save_named_session(f'Project {n}', tabs, {0}, histories={
+                i: SessionManager.pack_history(make_history(rng, i)) for i in range(count)})
+        
+        listing = Timer(f'session.named_list.{sessions}')
+        for _ in range(50):
+            with listing:
+                manager.list_sessions()
+        results[listing.name] = listing.result()
+        
+        switch = Timer(f'session.named_load.{count}')
+        for i in range(50):
+            name = f'Project {i % sessions}'
+            with switch:
+                manager.load_named_session(name)
+                manager.named(name).load_tab_histories()
+        results[switch.name] = switch.result()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def make_history(rng, tab, entries=12):
+    """Roughly what QDataStream writes for a tab's back/forward list: UTF-16
+    URLs and titles plus opaque page state"""
+    data = bytearray()
+    for step in range(entries):
+        url = f'https://{WORDS[(tab + step) % len(WORDS)]}.example.com/{tab}/{step}?q={rng.random()}'
+        title = f'Tab {tab} step {step} ' + ' '.join(rng.sample(WORDS, 3))
+        data += (url + title + url).encode('utf-16-be') + rng.randbytes(64)
+    return bytes(data)
+
+
+def bench_snapshot_format(results, rng, count=200):
+    """The binary snapshot against the same session as JSON with base64
+    histories, which has to be parsed whole to restore any one tab"""
+    work_dir = tempfile.mkdtemp(prefix='browser_snapshot_bench_')
+    try:
+        tabs = [{'url': f'https://{WORDS[i % len(WORDS)]}.example.com/{i}', 'title': f'Tab {i}', 'index': i, 'id': i}
+                for i in range(count)]
+        histories = [make_history(rng, i) for i in range(count)]
+        manager = SessionManager(os.path.join(work_dir, 'browser_session.bin'), legacy_file=None)
+        json_file = os.path.join(work_dir, 'browser_session.json')
+        
+        def save_json():
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump({'tabs': [{**tab, 'history': base64.b64encode(history).decode('ascii')}
+                                    for tab, history in zip(tabs, histories)],
+                           'pinned_tabs': [], 'current_tab': 0}, f)
+        
+        def load_json():
+            with open(json_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        cases = {
+            'binary': (lambda: manager.save_session(tabs, set(), histories={
+                           i: SessionManager.pack_history(history) for i, history in enumerate(histories)}),
+                       manager.load_session,
+                       lambda i: SessionManager.unpack_history(manager.load_tab_history(i)),
+                       manager.session_file),
+            'json': (save_json, load_json,
+                     lambda i: base64.b64decode(load_json()['tabs'][i]['history']),
+                     json_file)
+        }
+        sizes = {}
+        for fmt, (save_case, load_case, tab_case, path) in cases.items():
+            save = Timer(f'session.snapshot_save.{fmt}.{count}')
+            for _ in range(10):
+                with save:
+                    save_case()
+            sizes[fmt] = os.path.getsize(path)
+            results[save.name] = {**save.result(), 'file_bytes': sizes[fmt]}
+            
+            load = Timer(f'session.snapshot_load.{fmt}.{count}')
+            for _ in range(50):
+                with load:
+                    load_case()
+            results[load.name] = load.result()
+            
+            one_tab = Timer(f'session.snapshot_tab_history.{fmt}.{count}')
+            for _ in range(50):
+                tab = rng.randrange(count)
+                with one_tab:
+                    assert tab_case(tab) == histories[tab]
+            results[one_tab.name] = one_tab.result()
+        print(f"📦 {count}-tab snapshot: {sizes['binary'] / 1024:.0f} KB binary, {sizes['json'] / 1024:.0f} KB JSON")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def bench_settings(results):
+    manager = SettingsManager()
+    churn = Timer('settings.set')
+    for i in range(500):
+        with churn:
+            manager.set('homepage', f'https://example.com/{i}')
+    results[churn.name] = churn.result()
+
+
+def bench_extensions(results):
+    manager = ExtensionManager()
+    add = Timer('extensions.add')
+    for i in range(200):
+        with add:
+            manager.add_extension(f'Extension {i}', f'browser_extensions/ext_{i}.js')
+    results[add.name] = add.result()
+
+    toggle = Timer('extensions.toggle')
+    for ext in list(manager.extensions):
+        with toggle:
+            manager.toggle_extension(ext['id'])
+    results[toggle.name] = toggle.result()
+
+    enabled = Timer('extensions.get_enabled')
+    for _ in range(500):
+        with enabled:
+            manager.get_enabled_extensions()
+    results[enabled.name] = enabled.result()
+
+    remove = Timer('extensions.remove')
+    for ext in list(manager.extensions):
+        with remove:
+            manager.remove_extension(ext['id'])
+    results[remove.name] = remove.result()
+
+
+def bench_themes(results):
+    manager = ThemeManager()
+    for theme_name in manager.get_theme_names():
+        generate = Timer(f'theme.generate_stylesheet.{theme_name}')
+        for _ in range(500):
+            with generate:
+                manager.generate_stylesheet(theme_name)
+        results[generate.name] = generate.result()
+
+
+def bench_ui_updates(results, rng, tabs=50, frame_ms=16):
+    """Reload every tab at once, as after a network change, and count the
+    UI updates the scheduler coalesces or skips for background tabs"""
+    events = []
+    for tab in range(tabs):
+        start = rng.uniform(0, 200)
+        duration = rng.uniform(300, 2000)
+        events.append((start, tab, 'url', f'https://{WORDS[tab % len(WORDS)]}.example.com/{tab}'))
+        for progress in range(0, 101, 5):
+            events.append((start + duration * progress / 100, tab, 'progress', progress))
+        events.append((start + duration, tab, 'title', f'Tab {tab}'))
+    events.sort(key=lambda event: event[0])
+
+    current = 0
+    labels = {}
+
+    def apply(tab, changes):
+        hidden = 0
+        for kind, value in changes.items():
+            if kind == 'title':
+                labels[tab] = value
+            elif tab != current:
+                hidden += 1
+        return hidden
+
+    due = []
+    scheduler = UiUpdateScheduler(apply, frame_ms, defer=lambda delay, flush: due.append(now + delay))
+    flush = Timer(f'ui.flush.{tabs}_tab_reload')
+    for now, tab, kind, value in events:
+        while due and due[0] <= now:
+            due.pop(0)
+            with flush:
+                scheduler.flush()
+        scheduler.mark(tab, kind, value)
+    if due:
+        with flush:
+            scheduler.flush()
+
+    metrics = scheduler.metrics()
+    results[flush.name] = {**flush.result(), 'updates_marked': metrics['marked'], 'updates_applied': metrics['applied'],
+                           'updates_skipped': metrics['skipped']}
+    assert len(labels) == tabs, "Every tab label should end up updated"
+    print(f"   {tabs}-tab reload: {metrics['marked']} updates marked, {metrics['applied']} applied in "
+          f"{metrics['flushes']} flushes, {metrics['skipped']} skipped "
+          f"({metrics['coalesced']} coalesced, {metrics['hidden']} for background tabs)")
+
+
+def bench_tab_switcher(results, rng, tabs=1000):
+    """Type queries into the tab switcher one keystroke at a time"""
+    index = TabSwitcherIndex()
+    for tab in range(tabs):
+        words = rng.sample(WORDS, 4)
+        index.set(tab, f"{' '.join(words).title()} - Tab {tab}",
+                  f'https://{words[0]}.example.com/{words[1]}/{tab}?ref={rng.randrange(10 ** 6)}')
+
+    queries = [' '.join(rng.sample(WORDS, 2)) for _ in range(40)]
+    queries += [''.join(rng.sample(word, 3)) for word in WORDS]  # scrambled, so only fuzzy matches
+    keystroke = Timer(f'tabs.switcher_keystroke.{tabs}')
+    for query in queries:
+        for end in range(1, len(query) + 1):
+            with keystroke:
+                index.search(query[:end])
+    results[keystroke.name] = keystroke.result()
+    p99_ms = results[keystroke.name]['p99_ms']
+    print(f"   {tabs} tabs: keystroke p99 {p99_ms:.2f} ms (budget {TAB_SWITCHER_BUDGET_MS} ms)")
+    assert p99_ms < TAB_SWITCHER_BUDGET_MS, "Tab switcher keystrokes are over budget"
+
+    rename = Timer(f'tabs.switcher_update.{tabs}')
+    for tab in range(0, tabs, 5):
+        with rename:
+            index.set(tab, title=f'Renamed {tab}')
+    results[rename.name] = rename.result()
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table and return the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<42} {'ops/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'vs baseline':>12}")
+    print('-' * 90)
+    for name, result in results.items():
+        line = f"{name:<42} {result['ops_per_sec']:>12.1f} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f}"
+        base = baseline.get(name)
+        if base and base['ops_per_sec']:
+            change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+            line += f" {change:>+11.1%}"
+            if change < -threshold:
+                line += '  ⚠'
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the browser managers')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                        help='history sizes for the database cases')
+    parser.add_argument('--full', action='store_true', help='also run the 1M-row database cases')
+    parser.add_argument('--only', help='only run cases whose name starts with this prefix')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the baseline')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='throughput drop that counts as a regression (default 0.2)')
+    args = parser.parse_args()
+
+    sizes = args.sizes + ([1000000] if args.full and 1000000 not in args.sizes else [])
+    suites = [
+        ('database', lambda results, rng: bench_database(results, sizes, rng)),
+        ('omnibox', bench_omnibox),
+        ('session', bench_sessions),
+        ('settings', lambda results, rng: bench_settings(results)),
+        ('extensions', lambda results, rng: bench_extensions(results)),
+        ('theme', lambda results, rng: bench_themes(results)),
+        ('ui', bench_ui_updates),
+        ('tabs', bench_tab_switcher),
+    ]
+
+    # The managers read and write files in the working directory, so run in
+    # a scratch directory to leave the real profile alone.
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='browser_bench_')
+    os.chdir(work_dir)
+    results = {}
+    try:
+        for name, suite in suites:
+            if args.only and not name.startswith(args.only.split('.')[0]):
+                continue
+            print(f"⏱  Running {name} benchmarks...")
+            suite(results, random.Random(42))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.only:
+        results = {name: result for name, result in results.items() if name.startswith(args.only)}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold)
+
+    report = {'created_at': datetime.now().isoformat(), 'python': sys.version.split()[0], 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif not baseline:
+        print("\nℹ No baseline yet; run with --save-baseline to store one")
+
+    if regressions:
+        print(f"\n⚠ {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Local HTTP fixture server for the page-load benchmarks
+
+Serves generated pages with an artificial delay on every response, so
+load times are repeatable and the network is never touched. Each page
+links a few stylesheets served with the same delay, which makes loads
+take several round trips like real pages. Query parameters make a page
+heavier than the server defaults: more DOM, more stylesheets, scripts
+and images.
+
+Usage:
+    python fixture_server.py                       # serve on port 8765
+    python fixture_server.py --port 9000 --delay 400
+    curl 'http://127.0.0.1:8765/page/7?delay=100'  # per-request delay in ms
+    curl 'http://127.0.0.1:8765/page/7?paragraphs=5000&assets=10&scripts=10&images=20'
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = 'FixtureServer/1.0'
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        delay_ms = float(query.get('delay', [self.server.delay_ms])[0])
+
+        if parts.path.startswith('/asset/') and parts.path.endswith('.js'):
+            body = f'// {parts.path}\n' + ''.join(f'window.fixture{i} = (window.fixture{i} || 0) + 1;\n'
+                                                   for i in range(64))
+            content_type = 'application/javascript'
+        elif parts.path.startswith('/asset/') and parts.path.endswith('.svg'):
+            body = ('<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64">'
+                    '<rect width="64" height="64" fill="#4a90e2"/></svg>')
+            content_type = 'image/svg+xml'
+        elif parts.path.startswith('/asset/'):
+            body = f'/* {parts.path} */\n' + 'p { margin: 0 0 1em; }\n' * 64
+            content_type = 'text/css'
+        elif parts.path == '/' or parts.path.startswith('/page/'):
+            counts = {key: int(query.get(key, [getattr(self.server, key)])[0])
+                      for key in ('assets', 'scripts', 'images', 'paragraphs')}
+            body = self.render_page(parts.path.rstrip('/').rpartition('/')[2] or 'index', delay_ms, **counts)
+            content_type = 'text/html; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+
+        time.sleep(delay_ms / 1000)
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        # Preloading should only win by starting early, never through the cache
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def render_page(self, name, delay_ms, assets, scripts, images, paragraphs):
+        head = [f'<link rel="stylesheet" href="/asset/{name}-{i}.css?delay={delay_ms:g}">' for i in range(assets)]
+        head += [f'<script src="/asset/{name}-{i}.js?delay={delay_ms:g}"></script>' for i in range(scripts)]
+        body = [f'<img src="/asset/{name}-{i}.svg?delay={delay_ms:g}" width="64" height="64" alt="">'
+                for i in range(images)]
+        body += [f'<p>Fixture page {name}, paragraph {i}.</p>' for i in range(paragraphs)]
+        return (f'<!DOCTYPE html>\n<html><head><title>Fixture {name}</title>\n' + '\n'.join(head) + '\n</head>\n'
+                f'<body><h1>Fixture {name}</h1>\n' + '\n'.join(body) + '\n</body></html>\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Runs the fixture HTTP server on a background thread"""
+
+    def __init__(self, port=0, delay_ms=250, assets=3, paragraphs=200, scripts=0, images=0):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.delay_ms = delay_ms
+        self.httpd.assets = assets
+        self.httpd.paragraphs = paragraphs
+        self.httpd.scripts = scripts
+        self.httpd.images = images
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def url(self, path='/'):
+        return f'http://127.0.0.1:{self.port}{path}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='FixtureServer', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fixture pages for the page-load benchmarks')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=250, help='delay per response in ms (default 250)')
+    parser.add_argument('--assets', type=int, default=3, help='stylesheets linked from each page')
+    parser.add_argument('--scripts', type=int, default=0, help='scripts loaded by each page')
+    parser.add_argument('--images', type=int, default=0, help='images on each page')
+    args = parser.parse_args()
+
+    server = FixtureServer(args.port, args.delay, args.assets, scripts=args.scripts, images=args.images)
+    print(f"🌐 Serving fixture pages on {server.url()} (delay {args.delay:g} ms, Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,232 @@
 import sys
 import os
+import argparse
+import bisect
+import csv
+import heapq
+import html
+import itertools
 import json
+import math
+import operator
+import queue
+import re
+import signal
 import sqlite3
-from datetime import datetime
-from PyQt6.QtCore import QUrl, Qt, QSize, QTimer
+import struct
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+
+# Marks around the Qt imports, which dominate import time, for --trace-startup
+IMPORTS_STARTED = time.perf_counter()
+from PyQt6.QtCore import (QUrl, Qt, QSize, QTimer, QObject, QEvent, QAbstractListModel, QModelIndex,
+                          QSortFilterProxyModel, QThread, pyqtSignal, QByteArray, QDataStream, QIODevice)
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QToolBar, 
                               QLineEdit, QPushButton, QVBoxLayout, QWidget, 
                               QHBoxLayout, QDialog, QListWidget, QLabel, 
                               QMessageBox, QInputDialog, QMenu, QFileDialog,
                               QProgressBar, QListWidgetItem, QComboBox, QSplitter,
-                              QTextEdit, QScrollArea, QFrame)
-from PyQt6.QtGui import QIcon, QAction, QKeySequence, QTextCursor
+                              QTextEdit, QScrollArea, QFrame, QListView, QSpinBox,
+                              QProgressDialog, QCompleter, QTableWidget, QTableWidgetItem,
+                              QHeaderView, QAbstractItemView)
+from PyQt6.QtGui import QIcon, QAction, QKeySequence, QTextCursor, QStandardItemModel, QStandardItem
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import (QWebEngineDownloadRequest, QWebEngineProfile, 
                                    QWebEngineScript, QWebEnginePage)
+IMPORTS_FINISHED = time.perf_counter()
 
 
 class BrowserDatabase:
-    def __init__(self):
-        self.db_path = 'browser_data.db'
+    """SQLite store for bookmarks and history.
+
+    A single long-lived writer connection is shared by all writes and
+    guarded by a lock; every thread that reads gets its own connection so
+    readers never queue behind a commit (WAL allows both at once).
+    """
+
+    PRAGMAS = (
+        'PRAGMA auto_vacuum=INCREMENTAL',
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-16000',
+        'PRAGMA mmap_size=134217728',
+        'PRAGMA busy_timeout=5000',
+    )
+
+    # Statement text is kept constant so sqlite3's per-connection
+    # statement cache can reuse the prepared statements.
+    SQL_ADD_BOOKMARK = 'INSERT INTO bookmarks (title, url, created_at) VALUES (?, ?, ?)'
+    SQL_GET_BOOKMARKS = 'SELECT id, title, url, created_at FROM bookmarks ORDER BY created_at DESC'
+    SQL_DELETE_BOOKMARK = 'DELETE FROM bookmarks WHERE id = ?'
+    SQL_UPSERT_PLACE = '''
+        INSERT INTO places (url, title, visit_count, last_visited_at, frecency)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET
+            title = CASE WHEN excluded.last_visited_at >= last_visited_at
+                         THEN excluded.title ELSE title END,
+            visit_count = visit_count + 1,
+            last_visited_at = max(last_visited_at, excluded.last_visited_at),
+            frecency = frecency + excluded.frecency
+    '''
+    SQL_ADD_VISIT = 'INSERT INTO visits (place_id, visited_at) SELECT id, ? FROM places WHERE url = ?'
+    SQL_GET_HISTORY = '''
+        SELECT visits.id, places.title, places.url, visits.visited_at
+        FROM visits JOIN places ON places.id = visits.place_id
+        ORDER BY visits.visited_at DESC LIMIT ?
+    '''
+    # Keyset pages: each page starts strictly after the sort key of the
+    # previous page's last row, so every page is an index range seek.
+    SQL_GET_HISTORY_FIRST_PAGE = '''
+        SELECT visits.id, places.title, places.url, visits.visited_at, visits.place_id
+        FROM visits JOIN places ON places.id = visits.place_id
+        ORDER BY visits.visited_at DESC, visits.place_id DESC, visits.id DESC LIMIT ?
+    '''
+    SQL_GET_HISTORY_PAGE = '''
+        SELECT visits.id, places.title, places.url, visits.visited_at, visits.place_id
+        FROM visits JOIN places ON places.id = visits.place_id
+        WHERE (visits.visited_at, visits.place_id, visits.id) < (?, ?, ?)
+        ORDER BY visits.visited_at DESC, visits.place_id DESC, visits.id DESC LIMIT ?
+    '''
+    SQL_GET_BOOKMARKS_FIRST_PAGE = '''
+        SELECT id, title, url, created_at FROM bookmarks
+        ORDER BY created_at DESC, id DESC LIMIT ?
+    '''
+    SQL_GET_BOOKMARKS_PAGE = '''
+        SELECT id, title, url, created_at FROM bookmarks
+        WHERE (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC LIMIT ?
+    '''
+    SQL_OLDEST_VISITS = 'SELECT id, place_id FROM visits ORDER BY visited_at LIMIT ?'
+    SQL_OLDEST_VISITS_BEFORE = 'SELECT id, place_id FROM visits WHERE visited_at < ? ORDER BY visited_at LIMIT ?'
+    SQL_REFRESH_PLACE = '''
+        UPDATE places SET
+            visit_count = (SELECT COUNT(*) FROM visits WHERE place_id = places.id),
+            frecency = (SELECT COALESCE(SUM(visit_score(visited_at)), 0)
+                        FROM visits WHERE place_id = places.id)
+        WHERE id = ?
+    '''
+    SQL_GET_MOST_VISITED = 'SELECT id, title, url, visit_count FROM places ORDER BY visit_count DESC LIMIT ?'
+    SQL_GET_FRECENT = 'SELECT id, title, url, frecency FROM places ORDER BY frecency DESC LIMIT ?'
+    # History matches come back most frecent first. Up to SEARCH_SORT_LIMIT
+    # of them are simply sorted; broader terms such as "com" instead walk
+    # the frecency index until a page is full rather than sort every match.
+    SEARCH_SORT_LIMIT = 1000
+    # Tokens present in nearly every URL; they never narrow a search.
+    SEARCH_NOISE_TERMS = frozenset(('http', 'https', 'www'))
+    SQL_COUNT_HISTORY_MATCHES = 'SELECT COUNT(*) FROM (SELECT 1 FROM places_fts WHERE places_fts MATCH ? LIMIT ?)'
+    SQL_SEARCH_HISTORY = '''
+        SELECT places.id, places.title, places.url, places.last_visited_at, places.frecency
+        FROM places_fts JOIN places ON places.id = places_fts.rowid
+        WHERE places_fts MATCH ? AND (places.frecency, places.id) < (?, ?)
+        ORDER BY places.frecency DESC, places.id DESC LIMIT ?
+    '''
+    SQL_SEARCH_HISTORY_BY_FRECENCY = '''
+        SELECT id, title, url, last_visited_at, frecency FROM places INDEXED BY idx_places_frecency
+        WHERE id IN (SELECT rowid FROM places_fts WHERE places_fts MATCH ?) AND (frecency, id) < (?, ?)
+        ORDER BY frecency DESC, id DESC LIMIT ?
+    '''
+    SQL_SEARCH_BOOKMARKS = '''
+        SELECT bookmarks.id, bookmarks.title, bookmarks.url, bookmarks.created_at, bookmarks_fts.rank
+        FROM bookmarks_fts JOIN bookmarks ON bookmarks.id = bookmarks_fts.rowid
+        WHERE bookmarks_fts MATCH ? AND (bookmarks_fts.rank, bookmarks.id) > (?, ?)
+        ORDER BY bookmarks_fts.rank, bookmarks.id LIMIT ?
+    '''
+
+    # A visit adds 2 ** (days since FRECENCY_EPOCH / half-life) to its
+    # place's frecency. Growing the weight of new visits instead of
+    # decaying old ones gives the same ordering as an exponentially
+    # decayed score while only ever needing an incremental add.
+    FRECENCY_EPOCH = datetime(2020, 1, 1)
+    FRECENCY_HALF_LIFE_DAYS = 30.0
+
+    # Applied in order; PRAGMA user_version records how many have run.
+    MIGRATIONS = (
+        '_migrate_create_tables',
+        '_migrate_add_indexes',
+        '_migrate_places_and_visits',
+        '_migrate_full_text_search',
+    )
+
+    class _Reader:
+        """One thread's read connection, closed once the thread exits and
+        its thread-local values are dropped"""
+
+        def __init__(self, conn):
+            self.conn = conn
+        
+        def __del__(self):
+            self.conn.close()
+
+    def __init__(self, db_path='browser_data.db'):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = weakref.WeakSet()
+        self.conn = self._connect()
         self.init_database()
+        self.fts_enabled = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'places_fts'").fetchone() is not None
+        self.load_bookmark_index()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function('visit_score', 1, self.visit_score, deterministic=True)
+        return conn
+    
+    def reader(self):
+        """Return the calling thread's read connection"""
+        if self.db_path == ':memory:':
+            return self.conn
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            reader = self._local.reader = self._Reader(self._connect())
+            with self._lock:
+                self._readers.add(reader)
+        return reader.conn
+    
+    def execute_write(self, sql, params=()):
+        """Run a single write statement in its own transaction"""
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params)
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """Bring the schema up to date by running pending migrations"""
+        with self._lock:
+            version = self.schema_version()
+            for target in range(version + 1, len(self.MIGRATIONS) + 1):
+                migration = getattr(self, self.MIGRATIONS[target - 1])
+                self.conn.execute('BEGIN')
+                with self.conn:
+                    migration(self.conn.cursor())
+                    self.conn.execute(f'PRAGMA user_version = {target}')
+    
+    def enable_auto_vacuum(self):
+        """Switch a file created before incremental auto-vacuum over to it;
+        returns whether that was needed.
+
+        It only takes effect on an existing file after a full VACUUM,
+        which can take seconds on a large history, so this is left to the
+        retention thread rather than done while opening.
+        """
+        with self._lock:
+            if self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                return False
+            self.conn.execute('VACUUM')
+            return True
+    
+    def schema_version(self):
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    def _migrate_create_tables(self, cursor):
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS bookmarks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,55 +244,1077 @@ class BrowserDatabase:
                 visited_at TEXT NOT NULL
             )
         ''')
+    
+    def _migrate_add_indexes(self, cursor):
+        # The listing queries read only indexed columns (id is the rowid),
+        # so these indexes cover them and no table lookup is needed.
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_visited_at ON history (visited_at, title, url)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_url ON history (url)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bookmarks_created_at ON bookmarks (created_at, title, url)')
+    
+    def _migrate_places_and_visits(self, cursor):
+        cursor.execute('''
+            CREATE TABLE places (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                visit_count INTEGER NOT NULL DEFAULT 0,
+                last_visited_at TEXT NOT NULL,
+                frecency REAL NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE visits (
+                id INTEGER PRIMARY KEY,
+                place_id INTEGER NOT NULL REFERENCES places (id),
+                visited_at TEXT NOT NULL
+            )
+        ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('CREATE INDEX idx_visits_visited_at ON visits (visited_at, place_id)')
+        cursor.execute('CREATE INDEX idx_visits_place_id ON visits (place_id)')
+        cursor.execute('CREATE INDEX idx_places_visit_count ON places (visit_count)')
+        cursor.execute('CREATE INDEX idx_places_frecency ON places (frecency)')
+        
+        # Stream the old rows across in chunks so memory stays flat
+        # regardless of how large the history table has grown.
+        rows = self.conn.execute('SELECT title, url, visited_at FROM history ORDER BY id')
+        while True:
+            chunk = rows.fetchmany(5000)
+            if not chunk:
+                break
+            self._record_visits(cursor, chunk)
+        
+        cursor.execute('DROP TABLE history')
+    
+    def _migrate_full_text_search(self, cursor):
+        # Some SQLite builds ship without FTS5; search then falls back to LIKE.
+        if not cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0]:
+            return
+        
+        for table, columns in (('places', ('title', 'url')), ('bookmarks', ('title', 'url'))):
+            fts = f'{table}_fts'
+            cols = ', '.join(columns)
+            new_cols = ', '.join(f'new.{c}' for c in columns)
+            old_cols = ', '.join(f'old.{c}' for c in columns)
+            changed = ' OR '.join(f'old.{c} IS NOT new.{c}' for c in columns)
+            
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE {fts} USING fts5(
+                    {cols}, content='{table}', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+                )
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_cols});
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                END
+            ''')
+            # Visits rewrite the title column on every upsert; only touch the
+            # index when the text actually changed.
+            cursor.execute(f'''
+                CREATE TRIGGER {fts}_update AFTER UPDATE OF {cols} ON {table}
+                WHEN {changed} BEGIN
+                    INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                    INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_cols});
+                END
+            ''')
+            # Title matches weigh twice as much as URL matches.
+            cursor.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25(2.0, 1.0)')")
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    
+    @classmethod
+    def _search_terms(cls, text):
+        return [term for term in re.findall(r'\w+', text.lower()) if term not in cls.SEARCH_NOISE_TERMS]
+    
+    def _search(self, table, text, after, limit):
+        terms = self._search_terms(text)
+        if not terms:
+            return []
+        if not self.fts_enabled:
+            # Same order and keys as below, with a plain LIKE standing in
+            # for bm25 on bookmarks
+            where = ' AND '.join('(title LIKE ? OR url LIKE ?)' for _ in terms)
+            params = [p for term in terms for p in (f'%{term}%', f'%{term}%')]
+            if table == 'places':
+                sql = (f'SELECT id, title, url, last_visited_at, frecency FROM places '
+                       f'WHERE {where} AND (frecency, id) < (?, ?) ORDER BY frecency DESC, id DESC LIMIT ?')
+            else:
+                sql = (f'SELECT id, title, url, created_at, 0 FROM bookmarks '
+                       f'WHERE {where} AND (0, id) > (?, ?) ORDER BY id LIMIT ?')
+            return self.reader().execute(sql, (*params, *after, limit)).fetchall()
+        
+        # Every term must match, each as a prefix of some token.
+        query = ' '.join(f'"{term}"*' for term in terms)
+        reader = self.reader()
+        if table == 'bookmarks':
+            sql = self.SQL_SEARCH_BOOKMARKS
+        elif reader.execute(self.SQL_COUNT_HISTORY_MATCHES, (query, self.SEARCH_SORT_LIMIT + 1)).fetchone()[0] \
+                > self.SEARCH_SORT_LIMIT:
+            sql = self.SQL_SEARCH_HISTORY_BY_FRECENCY
+        else:
+            sql = self.SQL_SEARCH_HISTORY
+        return reader.execute(sql, (query, *after, limit)).fetchall()
+    
+    def search_history(self, text, limit=50, after=None):
+        """Places whose title or URL match every word of text, most frecent first.
+
+        Rows end with frecency; pass (frecency, id) of the last row as
+        after to get the next page.
+        """
+        return self._search('places', text, after or (math.inf, 0), limit)
+    
+    def search_bookmarks(self, text, limit=50, after=None):
+        """Bookmarks whose title or URL match every word of text, best first.
+
+        Rows end with their bm25 rank; pass (rank, id) of the last row as
+        after to get the next page.
+        """
+        return self._search('bookmarks', text, after or (-math.inf, 0), limit)
+    
+    @classmethod
+    def visit_score(cls, visited_at):
+        """Frecency contributed by one visit at the given ISO timestamp"""
+        days = (datetime.fromisoformat(visited_at) - cls.FRECENCY_EPOCH).total_seconds() / 86400
+        return 2.0 ** (days / cls.FRECENCY_HALF_LIFE_DAYS)
+    
+    def _record_visits(self, cursor, rows):
+        rows = list(rows)
+        cursor.executemany(self.SQL_UPSERT_PLACE,
+                           [(url, title, visited_at, self.visit_score(visited_at)) for title, url, visited_at in rows])
+        cursor.executemany(self.SQL_ADD_VISIT, [(visited_at, url) for _, url, visited_at in rows])
+    
+    @staticmethod
+    def normalize_url(url):
+        """Canonical form used to decide whether two URLs are the same page"""
+        try:
+            parts = urlsplit(url.strip())
+        except ValueError:
+            return url.strip()
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if (scheme, netloc.rpartition(':')[2]) in (('http', '80'), ('https', '443')):
+            netloc = netloc.rpartition(':')[0]
+        path = parts.path if parts.path != '/' else ''
+        return urlunsplit((scheme, netloc, path.rstrip('/') if path else path, parts.query, ''))
+    
+    def load_bookmark_index(self):
+        """Build the normalized URL -> bookmark ids map used for O(1) lookups"""
+        self._bookmark_ids = {}
+        self._bookmark_urls = {}
+        for bookmark_id, url in self.reader().execute('SELECT id, url FROM bookmarks'):
+            self._index_bookmark(bookmark_id, url)
+    
+    def _index_bookmark(self, bookmark_id, url):
+        key = self.normalize_url(url)
+        self._bookmark_ids.setdefault(key, set()).add(bookmark_id)
+        self._bookmark_urls[bookmark_id] = key
+    
+    def is_bookmarked(self, url):
+        return self.normalize_url(url) in self._bookmark_ids
     
     def add_bookmark(self, title, url):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO bookmarks (title, url, created_at) VALUES (?, ?, ?)',
-                      (title, url, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        """Bookmark url unless it already is; return the new id or None"""
+        with self._lock:
+            if self.is_bookmarked(url):
+                return None
+            bookmark_id = self.execute_write(self.SQL_ADD_BOOKMARK,
+                                             (title, url, datetime.now().isoformat())).lastrowid
+            self._index_bookmark(bookmark_id, url)
+            return bookmark_id
+    
+    def add_bookmarks_batch(self, rows):
+        """Insert the (title, url, created_at) rows not bookmarked yet in one
+        transaction; return how many were added"""
+        with self._lock, self.conn:
+            fresh = []
+            seen = set()
+            for title, url, created_at in rows:
+                key = self.normalize_url(url)
+                if key in self._bookmark_ids or key in seen:
+                    continue
+                seen.add(key)
+                fresh.append((title, url, created_at))
+            if not fresh:
+                return 0
+            
+            last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM bookmarks').fetchone()[0]
+            self.conn.executemany(self.SQL_ADD_BOOKMARK, fresh)
+            for bookmark_id, url in self.conn.execute('SELECT id, url FROM bookmarks WHERE id > ?', (last_id,)):
+                self._index_bookmark(bookmark_id, url)
+            return len(fresh)
     
     def get_bookmarks(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, title, url, created_at FROM bookmarks ORDER BY created_at DESC')
-        bookmarks = cursor.fetchall()
-        conn.close()
-        return bookmarks
+        return self.reader().execute(self.SQL_GET_BOOKMARKS).fetchall()
+    
+    def get_bookmarks_page(self, after=None, limit=200):
+        """Bookmarks older than the (created_at, id) key after, newest first"""
+        if after is None:
+            return self.reader().execute(self.SQL_GET_BOOKMARKS_FIRST_PAGE, (limit,)).fetchall()
+        return self.reader().execute(self.SQL_GET_BOOKMARKS_PAGE, (*after, limit)).fetchall()
     
     def delete_bookmark(self, bookmark_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM bookmarks WHERE id = ?', (bookmark_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.execute_write(self.SQL_DELETE_BOOKMARK, (bookmark_id,))
+            key = self._bookmark_urls.pop(bookmark_id, None)
+            ids = self._bookmark_ids.get(key)
+            if ids is not None:
+                ids.discard(bookmark_id)
+                if not ids:
+                    del self._bookmark_ids[key]
     
     def add_history(self, title, url):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO history (title, url, visited_at) VALUES (?, ?, ?)',
-                      (title, url, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        self.add_history_batch([(title, url, datetime.now().isoformat())])
+    
+    def add_history_batch(self, rows):
+        """Record many (title, url, visited_at) visits in one transaction"""
+        with self._lock, self.conn:
+            self._record_visits(self.conn.cursor(), rows)
     
     def get_history(self, limit=100):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, title, url, visited_at FROM history ORDER BY visited_at DESC LIMIT ?', (limit,))
-        history = cursor.fetchall()
-        conn.close()
-        return history
+        return self.reader().execute(self.SQL_GET_HISTORY, (limit,)).fetchall()
+    
+    def get_history_page(self, after=None, limit=200):
+        """Visits older than the (visited_at, place_id, id) key after, newest first"""
+        if after is None:
+            return self.reader().execute(self.SQL_GET_HISTORY_FIRST_PAGE, (limit,)).fetchall()
+        return self.reader().execute(self.SQL_GET_HISTORY_PAGE, (*after, limit)).fetchall()
+    
+    def get_most_visited(self, limit=10):
+        return self.reader().execute(self.SQL_GET_MOST_VISITED, (limit,)).fetchall()
+    
+    def get_frecent(self, limit=10):
+        return self.reader().execute(self.SQL_GET_FRECENT, (limit,)).fetchall()
     
     def clear_history(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM history')
-        conn.commit()
-        conn.close()
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM visits')
+            self.conn.execute('DELETE FROM places')
+    
+    def delete_oldest_visits(self, limit, before=None):
+        """Delete up to limit of the oldest visits, optionally only those
+        visited before the ISO timestamp before; return how many went"""
+        with self._lock, self.conn:
+            if before is None:
+                rows = self.conn.execute(self.SQL_OLDEST_VISITS, (limit,)).fetchall()
+            else:
+                rows = self.conn.execute(self.SQL_OLDEST_VISITS_BEFORE, (before, limit)).fetchall()
+            if not rows:
+                return 0
+            
+            self.conn.executemany('DELETE FROM visits WHERE id = ?', [(row[0],) for row in rows])
+            place_ids = [(place_id,) for place_id in {row[1] for row in rows}]
+            self.conn.executemany(self.SQL_REFRESH_PLACE, place_ids)
+            self.conn.executemany('DELETE FROM places WHERE id = ? AND visit_count = 0', place_ids)
+            return len(rows)
+    
+    def visit_count(self):
+        return self.reader().execute('SELECT COUNT(*) FROM visits').fetchone()[0]
+    
+    def bookmark_count(self):
+        return self.reader().execute('SELECT COUNT(*) FROM bookmarks').fetchone()[0]
+    
+    def _iter_rows(self, sql, chunk_size):
+        cursor = self.reader().execute(sql)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+    
+    def iter_history(self, chunk_size=5000):
+        """Yield (title, url, visited_at) for every visit, oldest first"""
+        return self._iter_rows('''
+            SELECT places.title, places.url, visits.visited_at
+            FROM visits JOIN places ON places.id = visits.place_id
+            ORDER BY visits.visited_at
+        ''', chunk_size)
+    
+    def iter_bookmarks(self, chunk_size=5000):
+        """Yield (title, url, created_at) for every bookmark, oldest first"""
+        return self._iter_rows('SELECT title, url, created_at FROM bookmarks ORDER BY created_at', chunk_size)
+
+    def iter_places(self, chunk_size=5000):
+        """Yield (url, title, frecency) for every visited page"""
+        return self._iter_rows('SELECT url, title, frecency FROM places', chunk_size)
+
+    def _pragma(self, name):
+        return self.reader().execute(f'PRAGMA {name}').fetchone()[0]
+    
+    def file_bytes(self):
+        return self._pragma('page_count') * self._pragma('page_size')
+    
+    def used_bytes(self):
+        """Bytes held by live pages, excluding the free list"""
+        return (self._pragma('page_count') - self._pragma('freelist_count')) * self._pragma('page_size')
+    
+    def incremental_vacuum(self, pages=256):
+        """Return up to pages free pages to the file system; return bytes reclaimed"""
+        with self._lock:
+            page_size = self.conn.execute('PRAGMA page_size').fetchone()[0]
+            before = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+            self.conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+            after = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if before != after:
+                # In WAL mode the file only shrinks once the WAL is checkpointed.
+                self.conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+            return (before - after) * page_size
+    
+    def close(self):
+        """Close the writer and every reader connection"""
+        with self._lock:
+            for reader in list(self._readers):
+                reader.conn.close()
+            self._readers = weakref.WeakSet()
+            self._local = threading.local()
+            self.conn.close()
+
+
+class HistoryWriter(threading.Thread):
+    """Background thread that group-commits history rows.
+
+    Navigations only enqueue a row; the thread commits whatever has
+    accumulated once batch_size rows are pending or flush_interval
+    seconds have passed since the first pending row.
+    """
+
+    _STOP = object()
+
+    def __init__(self, database, batch_size=64, flush_interval=0.5, max_queue=10000):
+        super().__init__(name='HistoryWriter', daemon=True)
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {
+            'written': 0,
+            'dropped': 0,
+            'batches': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+    
+    def add(self, title, url):
+        """Queue a visit without blocking; drops the row if the queue is full"""
+        try:
+            self.queue.put_nowait((title, url, datetime.now().isoformat()))
+        except queue.Full:
+            self.stats['dropped'] += 1
+    
+    def flush(self, timeout=None):
+        """Block until every row queued so far has been committed"""
+        if not self.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+    
+    def stop(self, timeout=5.0):
+        """Commit pending rows and stop the thread"""
+        if self.is_alive():
+            self.queue.put(self._STOP)
+            self.join(timeout)
+    
+    def metrics(self):
+        batches = self.stats['batches']
+        return {
+            'queue_depth': self.queue.qsize(),
+            'written': self.stats['written'],
+            'dropped': self.stats['dropped'],
+            'batches': batches,
+            'last_flush_ms': self.stats['last_flush_ms'],
+            'max_flush_ms': self.stats['max_flush_ms'],
+            'avg_flush_ms': self.stats['total_flush_ms'] / batches if batches else 0.0
+        }
+    
+    def _commit(self, pending):
+        if not pending:
+            return
+        start = time.perf_counter()
+        try:
+            self.database.add_history_batch(pending)
+        except sqlite3.Error as e:
+            print(f"Error writing history: {str(e)}")
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats['written'] += len(pending)
+        self.stats['batches'] += 1
+        self.stats['last_flush_ms'] = elapsed
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed)
+        self.stats['total_flush_ms'] += elapsed
+    
+    def run(self):
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if not pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is self._STOP:
+                self._commit(pending)
+                return
+            if isinstance(item, threading.Event):
+                self._commit(pending)
+                pending = []
+                item.set()
+                continue
+            if item is not None:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+            
+            if pending and (len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._commit(pending)
+                pending = []
+
+
+class HistoryRetentionJob(threading.Thread):
+    """Background thread that trims history to the retention settings.
+
+    Visits are deleted in small batches, each its own short transaction,
+    with a pause in between so the history writer and readers are never
+    locked out for long. Freed pages are then handed back to the file
+    system a step at a time through incremental vacuum; a profile from
+    before that was enabled gets its one full VACUUM on the first run.
+    """
+
+    def __init__(self, database, settings_manager, interval=600, initial_delay=60,
+                 batch_size=500, batch_pause=0.05, vacuum_pages=256):
+        super().__init__(name='HistoryRetention', daemon=True)
+        self.database = database
+        self.settings_manager = settings_manager
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self.stats = {
+            'runs': 0,
+            'last_run': None,
+            'last_deleted': 0,
+            'last_reclaimed_bytes': 0,
+            'deleted': 0,
+            'reclaimed_bytes': 0
+        }
+    
+    def request_run(self):
+        """Run a pass now instead of waiting for the next interval"""
+        self._wake.set()
+    
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+    
+    def run(self):
+        delay = self.initial_delay
+        while not self._stopping.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stopping.is_set():
+                return
+            try:
+                self.run_once()
+            except sqlite3.Error as e:
+                print(f"Error pruning history: {str(e)}")
+            delay = self.interval
+    
+    def _delete_batches(self, before=None, budget=None, until=None):
+        deleted = 0
+        while not self._stopping.is_set():
+            limit = self.batch_size if budget is None else min(self.batch_size, budget - deleted)
+            if limit <= 0 or (until is not None and until()):
+                break
+            count = self.database.delete_oldest_visits(limit, before=before)
+            deleted += count
+            if count < limit:
+                break
+            time.sleep(self.batch_pause)
+        return deleted
+    
+    def run_once(self):
+        """Apply the age, count and size limits, then compact; return stats"""
+        max_age_days = int(self.settings_manager.get('history_max_age_days') or 0)
+        max_visits = int(self.settings_manager.get('history_max_visits') or 0)
+        max_db_mb = int(self.settings_manager.get('history_max_db_size_mb') or 0)
+        deleted = 0
+        self.database.enable_auto_vacuum()
+        
+        if max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+            deleted += self._delete_batches(before=cutoff)
+        
+        if max_visits > 0:
+            excess = self.database.visit_count() - max_visits
+            if excess > 0:
+                deleted += self._delete_batches(budget=excess)
+        
+        if max_db_mb > 0:
+            max_bytes = max_db_mb * 1024 * 1024
+            deleted += self._delete_batches(until=lambda: self.database.used_bytes() <= max_bytes)
+        
+        reclaimed = 0
+        while not self._stopping.is_set():
+            step = self.database.incremental_vacuum(self.vacuum_pages)
+            if not step:
+                break
+            reclaimed += step
+            time.sleep(self.batch_pause)
+        
+        self.stats['runs'] += 1
+        self.stats['last_run'] = datetime.now().isoformat()
+        self.stats['last_deleted'] = deleted
+        self.stats['last_reclaimed_bytes'] = reclaimed
+        self.stats['deleted'] += deleted
+        self.stats['reclaimed_bytes'] += reclaimed
+        return dict(self.stats)
+
+
+class NetscapeBookmarkParser(HTMLParser):
+    """Incremental parser for Netscape bookmark files; collects (title, url, add_date)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self._link = None
+        self._text = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._link = dict(attrs)
+            self._text = []
+    
+    def handle_data(self, data):
+        if self._link is not None:
+            self._text.append(data)
+    
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._link is not None:
+            self.items.append((''.join(self._text).strip(), self._link.get('href') or '',
+                               self._link.get('add_date')))
+            self._link = None
+
+
+class BrowserDataTransfer:
+    """Streams history and bookmarks between BrowserDatabase and files.
+
+    Formats are picked by extension: Netscape bookmark HTML (.html, .htm;
+    bookmarks only), JSON Lines (.jsonl, .ndjson) and CSV (.csv). Records
+    are read lazily and written in chunk_size batches, each batch one
+    transaction, so memory stays bounded whatever the file size.
+    """
+
+    CHUNK_SIZE = 5000
+    READ_SIZE = 64 * 1024
+    FORMATS = {'.html': 'html', '.htm': 'html', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+    DATE_FIELDS = {'history': 'visited_at', 'bookmarks': 'created_at'}
+
+    def __init__(self, database, chunk_size=CHUNK_SIZE):
+        self.database = database
+        self.chunk_size = chunk_size
+    
+    @classmethod
+    def detect_format(cls, path):
+        fmt = cls.FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise ValueError(f'Unsupported file type: {os.path.basename(path)}')
+        return fmt
+    
+    # Import
+    
+    def import_file(self, path, kind, progress=None, cancelled=None):
+        """Import kind ('history' or 'bookmarks') from path.
+
+        progress(fraction, count) is called after every chunk; returning
+        early when cancelled() is true keeps the chunks already committed.
+        """
+        fmt = self.detect_format(path)
+        if fmt == 'html' and kind != 'bookmarks':
+            raise ValueError('Bookmark HTML files can only be imported as bookmarks')
+        
+        total = os.path.getsize(path) or 1
+        stats = {'imported': 0, 'skipped': 0, 'cancelled': False}
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            records = {'html': self._read_html, 'jsonl': self._read_jsonl, 'csv': self._read_csv}[fmt](f)
+            chunk = []
+            for record in records:
+                row = self._to_row(record, kind)
+                if row is None:
+                    stats['skipped'] += 1
+                    continue
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(kind, chunk, stats)
+                    chunk = []
+                    if progress:
+                        progress(min(f.buffer.tell() / total, 1.0), stats['imported'])
+                    if cancelled and cancelled():
+                        stats['cancelled'] = True
+                        return stats
+            self._import_chunk(kind, chunk, stats)
+        if progress:
+            progress(1.0, stats['imported'])
+        return stats
+    
+    def _import_chunk(self, kind, chunk, stats):
+        if not chunk:
+            return
+        if kind == 'history':
+            self.database.add_history_batch(chunk)
+            stats['imported'] += len(chunk)
+        else:
+            added = self.database.add_bookmarks_batch(chunk)
+            stats['imported'] += added
+            stats['skipped'] += len(chunk) - added
+    
+    def _to_row(self, record, kind):
+        url = self._text(record.get('url'))
+        if not url:
+            return None
+        date = self._parse_date(record.get(self.DATE_FIELDS[kind]) or record.get('add_date'))
+        if date is None:
+            return None
+        return (self._text(record.get('title')) or url, url, date)
+    
+    @staticmethod
+    def _text(value):
+        """value as stripped text; None for values like lists or objects
+        that are not text in any useful sense"""
+        if value is None:
+            return ''
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            return None
+        return str(value).strip()
+    
+    @staticmethod
+    def _parse_date(value):
+        """Naive local ISO timestamp for value, or None if it isn't a date.
+        Dates in the future become now; frecency would overflow on them."""
+        now = datetime.now()
+        if value in (None, ''):
+            return now.isoformat()
+        try:
+            # Netscape files store seconds since the epoch.
+            seconds = int(value)
+        except (TypeError, ValueError):
+            try:
+                date = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+                if date.tzinfo is not None:
+                    date = date.astimezone().replace(tzinfo=None)
+            except (ValueError, OverflowError):
+                return None
+        else:
+            try:
+                date = datetime.fromtimestamp(seconds)
+            except (ValueError, OverflowError, OSError):
+                # Past what datetime can hold, e.g. milliseconds
+                if seconds < 0:
+                    return None
+                date = now
+        return min(date, now).isoformat()
+    
+    def _read_html(self, f):
+        parser = NetscapeBookmarkParser()
+        while True:
+            data = f.read(self.READ_SIZE)
+            if not data:
+                break
+            parser.feed(data)
+            for title, url, add_date in parser.items:
+                yield {'title': title, 'url': url, 'add_date': add_date}
+            parser.items = []
+        parser.close()
+        for title, url, add_date in parser.items:
+            yield {'title': title, 'url': url, 'add_date': add_date}
+    
+    def _read_jsonl(self, f):
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield record if isinstance(record, dict) else {}
+    
+    def _read_csv(self, f):
+        yield from csv.DictReader(f)
+    
+    # Export
+    
+    def export_file(self, path, kind, progress=None, cancelled=None):
+        """Export kind ('history' or 'bookmarks') to path; same callbacks as import_file"""
+        fmt = self.detect_format(path)
+        if fmt == 'html' and kind != 'bookmarks':
+            raise ValueError('Only bookmarks can be exported as HTML')
+        
+        if kind == 'history':
+            total, rows = self.database.visit_count(), self.database.iter_history(self.chunk_size)
+        else:
+            total, rows = self.database.bookmark_count(), self.database.iter_bookmarks(self.chunk_size)
+        date_field = self.DATE_FIELDS[kind]
+        stats = {'exported': 0, 'cancelled': False}
+        
+        # Write to a temporary file and rename, so a failed or cancelled
+        # export never leaves a truncated file behind.
+        tmp_path = path + '.part'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = {'html': self._write_html, 'jsonl': self._write_jsonl, 'csv': self._write_csv}[fmt]
+                for count in writer(f, rows, date_field):
+                    stats['exported'] = count
+                    if count % self.chunk_size == 0:
+                        if progress:
+                            progress(count / total if total else 1.0, count)
+                        if cancelled and cancelled():
+                            stats['cancelled'] = True
+                            break
+            if stats['cancelled']:
+                os.remove(tmp_path)
+                return stats
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if progress:
+            progress(1.0, stats['exported'])
+        return stats
+    
+    def _write_html(self, f, rows, date_field):
+        f.write('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n'
+                '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+                '<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n')
+        count = 0
+        for title, url, date in rows:
+            add_date = int(datetime.fromisoformat(date).timestamp())
+            f.write(f'    <DT><A HREF="{html.escape(url)}" ADD_DATE="{add_date}">{html.escape(title)}</A>\n')
+            count += 1
+            yield count
+        f.write('</DL><p>\n')
+    
+    def _write_jsonl(self, f, rows, date_field):
+        count = 0
+        for title, url, date in rows:
+            f.write(json.dumps({'title': title, 'url': url, date_field: date}, ensure_ascii=False) + '\n')
+            count += 1
+            yield count
+    
+    def _write_csv(self, f, rows, date_field):
+        writer = csv.writer(f)
+        writer.writerow(['title', 'url', date_field])
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            yield count
+
+
+class OmniboxIndex:
+    """In-memory prefix index over history and bookmarks for the URL bar.
+
+    Every page is indexed under the words of its title and URL. The
+    distinct words are kept sorted, so the words that a typed prefix can
+    complete form one slice found by bisection. A query starts from its
+    narrowest term, the one with the fewest postings: if that matches at
+    most CANDIDATE_LIMIT pages, they are filtered by the other terms and
+    ranked. If every term is broad, the best pages are walked in rank
+    order as long as matches turn up often enough for that to be the
+    shorter way, and otherwise the narrowest term's pages are collected.
+    Either way the result is the best limit pages matching every term.
+
+    Pages rank by frecency. A bookmark counts as BOOKMARK_BOOST_VISITS
+    extra visits today. Visits update the index in place; load() rebuilds
+    it from the database.
+    """
+
+    CANDIDATE_LIMIT = 5000
+    SCAN_MARGIN = 4
+    BOOKMARK_BOOST_VISITS = 5
+    PRELOAD_MIN_CHARS = 3
+    PRELOAD_DOMINANCE = 2.0
+    ADDRESS_PREFIX_RE = re.compile(r'^(?:[a-z][a-z0-9+.-]*://)?(?:www\d?\.)?')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._pending = None
+        self._ids = {}          # url -> page id
+        self._urls = []
+        self._titles = []
+        self._texts = []        # ' word word ...' of each page, for matching
+        self._scores = []
+        self._bookmarked = set()
+        self._postings = {}     # word -> ids of the pages containing it
+        self._words = []        # sorted keys of _postings
+        self._ranked = []       # page ids, best score first
+        self._bookmark_boost = BrowserDatabase.visit_score(datetime.now().isoformat()) * self.BOOKMARK_BOOST_VISITS
+
+    def __len__(self):
+        return len(self._urls)
+
+    @staticmethod
+    def page_words(url, title):
+        """Distinct search words of a page; bare numbers are left out since
+        they are mostly ids nobody types"""
+        return {word for word in BrowserDatabase._search_terms(f'{title} {url}') if not word.isdigit()}
+
+    def load(self, database):
+        """Rebuild from database off the UI thread; visits recorded while
+        loading are replayed onto the new index"""
+        with self._load_lock:
+            with self._lock:
+                self._pending = []
+            fresh = OmniboxIndex()
+            for url, title, frecency in database.iter_places():
+                fresh._add_page(url, title, frecency, sort=False)
+            for title, url, _ in database.iter_bookmarks():
+                page_id = fresh._ids.get(url)
+                if page_id is None:
+                    page_id = fresh._add_page(url, title, 0.0, sort=False)
+                if page_id not in fresh._bookmarked:
+                    fresh._bookmarked.add(page_id)
+                    fresh._scores[page_id] += fresh._bookmark_boost
+            fresh._words = sorted(fresh._postings)
+            fresh._ranked = sorted(range(len(fresh._scores)), key=fresh._scores.__getitem__, reverse=True)
+            self._swap(fresh)
+
+    def _swap(self, fresh):
+        with self._lock:
+            pending, self._pending = self._pending, None
+            for name in ('_ids', '_urls', '_titles', '_texts', '_scores', '_bookmarked', '_postings',
+                         '_words', '_ranked', '_bookmark_boost'):
+                setattr(self, name, getattr(fresh, name))
+            for title, url, visited_at in pending:
+                self.record_visit(title, url, visited_at)
+
+    def load_in_background(self, database):
+        thread = threading.Thread(target=self.load, args=(database,), name='OmniboxLoader', daemon=True)
+        thread.start()
+        return thread
+
+    def _rank_key(self, page_id):
+        return -self._scores[page_id]
+
+    def _add_page(self, url, title, score, sort=True):
+        page_id = len(self._urls)
+        self._ids[url] = page_id
+        self._urls.append(url)
+        self._titles.append(title)
+        self._texts.append('')
+        self._scores.append(score)
+        self._index_words(page_id, url, title, sort)
+        if sort:
+            bisect.insort(self._ranked, page_id, key=self._rank_key)
+        return page_id
+
+    def _index_words(self, page_id, url, title, sort=True):
+        words = self.page_words(url, title)
+        self._texts[page_id] = ' ' + ' '.join(words)
+        for word in words:
+            ids = self._postings.get(word)
+            if ids is None:
+                self._postings[word] = [page_id]
+                if sort:
+                    bisect.insort(self._words, word)
+            elif ids[-1] != page_id:
+                ids.append(page_id)
+
+    def _rescore(self, page_id, delta):
+        position = bisect.bisect_left(self._ranked, -self._scores[page_id], key=self._rank_key)
+        while self._ranked[position] != page_id:
+            position += 1
+        del self._ranked[position]
+        self._scores[page_id] += delta
+        bisect.insort(self._ranked, page_id, key=self._rank_key)
+
+    def _page(self, url, title):
+        page_id = self._ids.get(url)
+        if page_id is None:
+            return self._add_page(url, title, 0.0)
+        if title and title != self._titles[page_id]:
+            # Postings of the old title's words are left behind; complete()
+            # checks candidates against _texts so they cannot match on them.
+            self._titles[page_id] = title
+            self._index_words(page_id, url, title)
+        return page_id
+
+    def record_visit(self, title, url, visited_at=None):
+        visited_at = visited_at or datetime.now().isoformat()
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((title, url, visited_at))
+            self._rescore(self._page(url, title), BrowserDatabase.visit_score(visited_at))
+
+    def set_title(self, url, title):
+        with self._lock:
+            if url in self._ids:
+                self._page(url, title)
+
+    def add_bookmark(self, title, url):
+        with self._lock:
+            page_id = self._page(url, title)
+            if page_id not in self._bookmarked:
+                self._bookmarked.add(page_id)
+                self._rescore(page_id, self._bookmark_boost)
+
+    def sync_bookmarks(self, is_bookmarked):
+        """Take the boost back from pages whose bookmark has been deleted"""
+        with self._lock:
+            for page_id in [page_id for page_id in self._bookmarked if not is_bookmarked(self._urls[page_id])]:
+                self._bookmarked.discard(page_id)
+                self._rescore(page_id, -self._bookmark_boost)
+
+    def _slices(self, terms):
+        """(postings, lo, hi) of the slice of _words each term completes,
+        narrowest first. Every word has a posting, so a slice with more
+        words than the narrowest so far has postings is not counted; its
+        word count stands in."""
+        slices = []
+        narrowest = None
+        for term in sorted(terms, key=len, reverse=True):
+            lo = bisect.bisect_left(self._words, term)
+            hi = bisect.bisect_left(self._words, term + '\uffff', lo)
+            if narrowest is not None and hi - lo > narrowest:
+                slices.append((hi - lo, lo, hi))
+                continue
+            count = sum(map(len, map(self._postings.__getitem__, self._words[lo:hi])))
+            narrowest = count if narrowest is None else min(narrowest, count)
+            slices.append((count, lo, hi))
+        return sorted(slices)
+
+    def _matching(self, page_ids, needles):
+        """The page_ids whose text has every needle, in the same order"""
+        texts = self._texts
+        for needle in needles:
+            page_ids = [page_id for page_id in page_ids if needle in texts[page_id]]
+        return page_ids
+
+    def _best(self, text, limit):
+        terms = BrowserDatabase._search_terms(text)
+        if not terms:
+            return []
+        # Postings keep the words of old titles, so every candidate is
+        # checked against its current text, even for the narrowest term
+        needles = [' ' + term for term in terms]
+        slices = self._slices(terms)
+        count, lo, hi = slices[0]
+        if count > self.CANDIDATE_LIMIT:
+            # Every term is broad. If the matches are dense, walking the
+            # best pages finds them sooner than collecting the narrowest
+            # term's pages. The first stretch walked expects the terms to
+            # match independently, with SCAN_MARGIN to spare; the next
+            # ones expect the density of the matches found so far. The
+            # walk goes on while it stays shorter than collecting.
+            pages = len(self._ranked)
+            density = 1.0
+            for postings, _, _ in slices:
+                density *= min(postings / pages, 1.0)
+            best = []
+            start, steps = 0, int(limit / density * self.SCAN_MARGIN)
+            while start + steps <= count:
+                best += self._matching(self._ranked[start:start + steps], needles)
+                start += steps
+                if len(best) >= limit or start >= pages:
+                    return best[:limit]
+                steps = max((limit - len(best)) * start // max(len(best), 1), limit)
+
+        candidates = set(itertools.chain.from_iterable(map(self._postings.__getitem__, self._words[lo:hi])))
+        return heapq.nsmallest(limit, self._matching(candidates, needles), key=self._rank_key)
+
+    def complete(self, text, limit=8):
+        """The best limit (url, title, bookmarked) pages having a word that
+        starts with each term of text"""
+        with self._lock:
+            return [(self._urls[page_id], self._titles[page_id], page_id in self._bookmarked)
+                    for page_id in self._best(text, limit)]
+
+    def preload_candidate(self, text):
+        """URL of the top match if it is a safe bet to load before Enter:
+        text is the start of its address and it outranks the runner-up
+        PRELOAD_DOMINANCE times over"""
+        typed = self.ADDRESS_PREFIX_RE.sub('', text.strip().lower())
+        if len(typed) < self.PRELOAD_MIN_CHARS or ' ' in typed:
+            return None
+        with self._lock:
+            best = self._best(text, 2)
+            if not best:
+                return None
+            url = self._urls[best[0]]
+            if not self.ADDRESS_PREFIX_RE.sub('', url.lower()).startswith(typed):
+                return None
+            if len(best) > 1 and self._scores[best[0]] < self.PRELOAD_DOMINANCE * self._scores[best[1]]:
+                return None
+            return url
+
+
+class ProcessSampler:
+    """CPU and memory of a set of processes, reading each /proc/<pid>/stat
+    once per sample; memory is 0 where /proc is not available.
+
+    CPU% is the CPU time a process used since the previous sample divided
+    by the wall time in between, so 100 means one full core. A process
+    seen for the first time reports 0 until the next sample.
+    """
+
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def __init__(self):
+        self._last = {}  # pid -> (cpu ticks, time.monotonic()) at the previous sample
+    
+    @classmethod
+    def read_stat(cls, pid):
+        """(cpu ticks, resident bytes) of pid, or None if it is gone"""
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                data = f.read()
+            # The command name may contain spaces, so split after its ')'
+            fields = data[data.rfind(b')') + 2:].split()
+            return int(fields[11]) + int(fields[12]), int(fields[21]) * cls.PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return None
+    
+    @classmethod
+    def rss_bytes(cls, pid):
+        """Resident memory of pid, or 0 if it is gone"""
+        stat = cls.read_stat(pid)
+        return stat[1] if stat else 0
+    
+    def sample(self, pids):
+        """Map each live pid to {'cpu_percent', 'rss_bytes'}"""
+        now = time.monotonic()
+        samples = {}
+        last = {}
+        for pid in set(pids):
+            if pid <= 0:
+                continue
+            stat = self.read_stat(pid)
+            if stat is None:
+                continue
+            ticks, rss = stat
+            cpu = 0.0
+            previous = self._last.get(pid)
+            if previous and now > previous[1]:
+                cpu = (ticks - previous[0]) / self.CLOCK_TICKS / (now - previous[1]) * 100
+            samples[pid] = {'cpu_percent': cpu, 'rss_bytes': rss}
+            last[pid] = (ticks, now)
+        self._last = last
+        return samples
 
 
 class ThemeManager:
@@ -372,7 +1596,16 @@ class SettingsManager:
             'homepage': 'https://www.google.com',
             'search_engine': 'https://www.google.com/search?q=',
             'download_path': os.path.expanduser('~/Downloads'),
-            'theme': 'Light'
+            'theme': 'Light',
+            # History retention is opt-in; 0 keeps everything
+            'history_max_age_days': 0,
+            'history_max_visits': 0,
+            'history_max_db_size_mb': 0,
+            'preload_budget': 2,
+            'tab_freeze_after_min': 10,
+            'tab_max_live': 0,
+            'tab_memory_budget_mb': 0,
+            'session_name': ''
         }
         self.settings = self.load_settings()
     
@@ -395,44 +1628,656 @@ class SettingsManager:
 
 
 class SessionManager:
-    def __init__(self):
-        self.session_file = 'browser_session.json'
+    """Saves and loads the session snapshot.
+
+    The snapshot is a binary container: a fixed header, an index with the
+    offset and length of each tab's back/forward history, the tab list as
+    compressed JSON, then each history compressed on its own. Reading the
+    tab list or one tab's history never touches the other histories.
+    Sessions from the old browser_session.json still load until the first
+    save replaces them.
+
+    Named sessions are further snapshots in sessions_dir, one file each.
+    Listing them reads only their headers.
+    """
+
+    MAGIC = b'BSES'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHII')  # magic, version, tab count, tab list length
+    ENTRY = struct.Struct('<QI')  # offset and length of one packed history; 0 length if none
     
-    def save_session(self, tabs_data, pinned_tabs):
-        """Save current browser session"""
+    def __init__(self, session_file='browser_session.bin', legacy_file='browser_session.json',
+                 sessions_dir='browser_sessions'):
+        self.session_file = session_file
+        self.legacy_file = legacy_file
+        self.sessions_dir = sessions_dir
+    
+    @staticmethod
+    def pack_history(data):
+        """Compress a serialized QWebEngineHistory for the snapshot"""
+        return zlib.compress(bytes(data), 6)
+    
+    @staticmethod
+    def unpack_history(packed):
+        return zlib.decompress(packed)
+    
+    def save_session(self, tabs_data, pinned_tabs, current_tab=0, journal_seq=0, histories=None):
+        """Save current browser session; histories maps a tab index to its
+        packed history"""
+        histories = histories or {}
         session = {
             'tabs': tabs_data,
-            'pinned_tabs': list(pinned_tabs)
+            'pinned_tabs': list(pinned_tabs),
+            'current_tab': current_tab,
+            'journal_seq': journal_seq
         }
+        meta = zlib.compress(json.dumps(session, separators=(',', ':')).encode('utf-8'), 6)
+        blobs = [histories.get(tab.get('index', i), b'') for i, tab in enumerate(tabs_data)]
+        offset = self.HEADER.size + self.ENTRY.size * len(blobs) + len(meta)
+        index = bytearray()
+        for blob in blobs:
+            index += self.ENTRY.pack(offset, len(blob))
+            offset += len(blob)
+        
+        # Write a new file and rename it over the old one, so a crash
+        # mid-write leaves the previous session intact
+        temp_file = self.session_file + '.tmp'
         try:
-            with open(self.session_file, 'w', encoding='utf-8') as f:
-                json.dump(session, f, indent=4)
+            with open(temp_file, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(blobs), len(meta)))
+                f.write(index)
+                f.write(meta)
+                for blob in blobs:
+                    f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.session_file)
         except Exception as e:
             print(f"Error saving session: {str(e)}")
     
+    def _read_header(self, f):
+        magic, version, count, meta_length = self.HEADER.unpack(f.read(self.HEADER.size))
+        if magic != self.MAGIC or version > self.VERSION:
+            raise ValueError(f"{self.session_file} is not a session snapshot this version can read")
+        return count, meta_length
+    
     def load_session(self):
         """Load saved browser session"""
-        if os.path.exists(self.session_file):
-            try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
+        try:
+            if os.path.exists(self.session_file):
+                with open(self.session_file, 'rb') as f:
+                    count, meta_length = self._read_header(f)
+                    f.seek(self.ENTRY.size * count, os.SEEK_CUR)
+                    return json.loads(zlib.decompress(f.read(meta_length)))
+            if self.legacy_file and os.path.exists(self.legacy_file):
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
-            except Exception as e:
-                print(f"Error loading session: {str(e)}")
+        except Exception as e:
+            print(f"Error loading session: {str(e)}")
         return None
     
+    def load_tab_history(self, index):
+        """The packed history of the tab at index, read on its own, or None"""
+        try:
+            with open(self.session_file, 'rb') as f:
+                count, _ = self._read_header(f)
+                if not 0 <= index < count:
+                    return None
+                f.seek(self.HEADER.size + self.ENTRY.size * index)
+                offset, length = self.ENTRY.unpack(f.read(self.ENTRY.size))
+                if not length:
+                    return None
+                f.seek(offset)
+                return f.read(length)
+        except (OSError, ValueError, struct.error):
+            return None
+    
+    def load_tab_histories(self):
+        """Packed histories of all tabs by index, still compressed"""
+        try:
+            with open(self.session_file, 'rb') as f:
+                count, _ = self._read_header(f)
+                entries = [self.ENTRY.unpack(f.read(self.ENTRY.size)) for _ in range(count)]
+                data = f.read()
+        except (OSError, ValueError, struct.error):
+            return {}
+        base = self.HEADER.size + self.ENTRY.size * len(entries)
+        return {i: data[offset - base:offset - base + length] for i, (offset, length) in enumerate(entries) if length}
+    
     def clear_session(self):
         """Clear saved session"""
-        if os.path.exists(self.session_file):
-            os.remove(self.session_file)
+        for path in (self.session_file, self.legacy_file):
+            if path and os.path.exists(path):
+                os.remove(path)
+    
+    def named(self, name):
+        """A SessionManager for the named session's snapshot"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Session name cannot be empty")
+        return SessionManager(os.path.join(self.sessions_dir, quote(name, safe=' ') + '.bin'), None, None)
+    
+    def list_sessions(self):
+        """Name, tab count and save time of every named session, by name"""
+        sessions = []
+        if not os.path.isdir(self.sessions_dir):
+            return sessions
+        for entry in os.listdir(self.sessions_dir):
+            if not entry.endswith('.bin'):
+                continue
+            path = os.path.join(self.sessions_dir, entry)
+            try:
+                with open(path, 'rb') as f:
+                    count, _ = self._read_header(f)
+                saved_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            except (OSError, ValueError, struct.error):
+                continue
+            sessions.append({'name': unquote(entry[:-4]), 'tabs': count, 'saved_at': saved_at})
+        return sorted(sessions, key=lambda session: session['name'].lower())
+    
+    def save_named_session(self, name, tabs_data, pinned_tabs, current_tab=0, histories=None):
+        session = self.named(name)
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        session.save_session(tabs_data, pinned_tabs, current_tab, histories=histories)
+    
+    def load_named_session(self, name):
+        """The named session's tab list, or None; histories stay on disk
+        until named(name).load_tab_history asks for them"""
+        session = self.named(name)
+        return session.load_session() if os.path.exists(session.session_file) else None
+    
+    def delete_named_session(self, name):
+        self.named(name).clear_session()
+
+
+class SessionJournal:
+    """Append-only log of tab events on top of the session snapshot.
+
+    Opening, closing, navigating, retitling, pinning, moving and switching
+    tabs each append one JSON line as they happen, so a crash loses at most
+    the events not yet written out. Lines reach the OS immediately; fsync
+    runs at most once per sync_interval seconds. Every compact_after
+    events the current state is written as a new snapshot, atomically, and
+    the journal starts over. Events carry a sequence number and the
+    snapshot the last one it includes, so a crash between the two steps
+    replays nothing twice. Tab histories are not journaled; each snapshot
+    takes them from history_provider, which maps tab ids to packed
+    histories.
+    """
+
+    def __init__(self, session_manager, journal_file=None, sync_interval=1.0, compact_after=1000,
+                 history_provider=None):
+        self.session_manager = session_manager
+        self.history_provider = history_provider
+        self.journal_file = journal_file or os.path.splitext(session_manager.session_file)[0] + '.journal'
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.recording = False
+        self.seq = 0
+        self.pending = 0  # events since the last snapshot
+        self.order = []  # tab ids, left to right
+        self.tabs = {}  # tab id -> {'url', 'title', 'pinned'}
+        self.active = None
+        self.snapshot_ids = []  # tab ids in the loaded snapshot, by index
+        self._file = None
+        self._sync_timer = None
+        self._lock = threading.Lock()
+        self.stats = {'events': 0, 'syncs': 0, 'compactions': 0, 'replayed': 0, 'last_replay_ms': 0.0}
+    
+    def load(self):
+        """The saved session with the journal replayed over it, in the form
+        SessionManager.load_session returns, or None if there is none"""
+        start = time.perf_counter()
+        snapshot = self.session_manager.load_session() or {}
+        self.seq = snapshot.get('journal_seq', 0)
+        pinned = set(snapshot.get('pinned_tabs', []))
+        self.order, self.tabs, self.active = [], {}, None
+        self.snapshot_ids = []
+        for position, tab in enumerate(snapshot.get('tabs', [])):
+            tab_id = tab.get('id', position)
+            self.order.append(tab_id)
+            self.snapshot_ids.append(tab_id)
+            self.tabs[tab_id] = {'url': tab.get('url'), 'title': tab.get('title', 'New Tab'),
+                                 'pinned': tab.get('index') in pinned}
+            if tab.get('index') == snapshot.get('current_tab', 0):
+                self.active = tab_id
+        
+        replayed = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # Only the last line can be torn, by a crash mid-write
+                        break
+                    if event['seq'] > self.seq:
+                        self._apply(event)
+                        self.seq = event['seq']
+                        replayed += 1
+        self.stats['replayed'] = replayed
+        self.stats['last_replay_ms'] = (time.perf_counter() - start) * 1000
+        return self.session() if self.order or snapshot else None
+    
+    def load_histories(self):
+        """Packed histories from the loaded snapshot by tab id; tabs opened
+        in the journal since have none"""
+        return {self.snapshot_ids[index]: packed for index, packed in self.session_manager.load_tab_histories().items()
+                if index < len(self.snapshot_ids)}
+    
+    def session(self):
+        tabs_data = [{'url': self.tabs[tab_id]['url'], 'title': self.tabs[tab_id]['title'], 'index': i, 'id': tab_id}
+                     for i, tab_id in enumerate(self.order)]
+        return {
+            'tabs': tabs_data,
+            'pinned_tabs': [tab['index'] for tab in tabs_data if self.tabs[tab['id']]['pinned']],
+            'current_tab': self.order.index(self.active) if self.active in self.tabs else 0,
+            'journal_seq': self.seq
+        }
+    
+    def _apply(self, event):
+        op, tab_id = event['op'], event['id']
+        if op == 'open':
+            if tab_id not in self.tabs:
+                self.order.insert(min(event.get('index', len(self.order)), len(self.order)), tab_id)
+            self.tabs[tab_id] = {'url': event.get('url'), 'title': event.get('title', 'New Tab'),
+                                 'pinned': event.get('pinned', False)}
+        elif tab_id not in self.tabs:
+            return
+        elif op == 'close':
+            self.order.remove(tab_id)
+            del self.tabs[tab_id]
+        elif op == 'navigate':
+            self.tabs[tab_id]['url'] = event['url']
+        elif op == 'title':
+            self.tabs[tab_id]['title'] = event['title']
+        elif op == 'pin':
+            self.tabs[tab_id]['pinned'] = event['pinned']
+        elif op == 'move':
+            self.order.remove(tab_id)
+            self.order.insert(min(event['index'], len(self.order)), tab_id)
+        if op == 'activate' or (op == 'open' and self.active is None):
+            self.active = tab_id
+    
+    def start(self, tabs, current_tab=0):
+        """Begin recording from the given state: [(tab id, url, title, pinned)]
+        in tab order. Writes it as the snapshot and empties the journal."""
+        self.order = [tab_id for tab_id, _, _, _ in tabs]
+        self.tabs = {tab_id: {'url': url, 'title': title, 'pinned': pinned} for tab_id, url, title, pinned in tabs}
+        self.active = self.order[current_tab] if 0 <= current_tab < len(self.order) else None
+        self.compact()
+        self.recording = True
+    
+    def record(self, op, tab_id, **fields):
+        if not self.recording or tab_id is None:
+            return
+        with self._lock:
+            self.seq += 1
+            event = {'seq': self.seq, 'op': op, 'id': tab_id, **fields}
+            self._apply(event)
+            if self._file is None:
+                self._file = open(self.journal_file, 'a', encoding='utf-8')
+            self._file.write(json.dumps(event, separators=(',', ':')) + '\n')
+            self._file.flush()
+            self.pending += 1
+            self.stats['events'] += 1
+            if self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.sync_interval, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+        if self.pending >= self.compact_after:
+            self.compact()
+    
+    def opened(self, tab_id, url, title, index, pinned=False):
+        self.record('open', tab_id, url=url, title=title, index=index, pinned=pinned)
+    
+    def closed(self, tab_id):
+        self.record('close', tab_id)
+    
+    def navigated(self, tab_id, url):
+        if tab_id in self.tabs and self.tabs[tab_id]['url'] != url:
+            self.record('navigate', tab_id, url=url)
+    
+    def retitled(self, tab_id, title):
+        if tab_id in self.tabs and self.tabs[tab_id]['title'] != title:
+            self.record('title', tab_id, title=title)
+    
+    def pinned(self, tab_id, pinned):
+        self.record('pin', tab_id, pinned=pinned)
+    
+    def moved(self, tab_id, index):
+        self.record('move', tab_id, index=index)
+    
+    def activated(self, tab_id):
+        if tab_id != self.active:
+            self.record('activate', tab_id)
+    
+    def sync(self):
+        with self._lock:
+            self._sync_timer = None
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self.stats['syncs'] += 1
+    
+    def compact(self):
+        """Write the current state as the snapshot and empty the journal"""
+        with self._lock:
+            session = self.session()
+            histories = self.history_provider() if self.history_provider else {}
+            self.session_manager.save_session(session['tabs'], session['pinned_tabs'], session['current_tab'],
+                                              journal_seq=self.seq,
+                                              histories={tab['index']: histories[tab['id']]
+                                                         for tab in session['tabs'] if tab['id'] in histories})
+            if self._file is not None:
+                self._file.close()
+            # The snapshot already holds every event, so a crash before the
+            # truncation only leaves events that replay skips
+            self._file = open(self.journal_file, 'w', encoding='utf-8')
+            self.pending = 0
+            self.stats['compactions'] += 1
+    
+    def close(self):
+        """Sync what was recorded and stop recording"""
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.recording = False
+    
+    def clear(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+
+
+class TabRegistry:
+    """Stable ids for the open tabs, with each tab's pinned flag, lifecycle
+    state and last-active time.
+
+    Tab indices shift whenever a tab is closed or dragged to a new place,
+    so anything kept beyond a single event refers to a tab by its widget
+    or id instead. Every lookup is a dict access.
+    """
+
+    def __init__(self):
+        self._next_id = itertools.count(1)
+        self._widgets = {}  # id -> tab widget
+        self._ids = {}  # tab widget -> id
+        self.pinned = set()  # ids
+        self.states = {}  # id -> lifecycle state name
+        self.last_active = {}  # id -> time.monotonic() when last shown
+    
+    def __len__(self):
+        return len(self._widgets)
+    
+    def __contains__(self, widget):
+        return widget in self._ids
+    
+    def add(self, widget, state='Active', pinned=False):
+        """Register widget under a new id and return the id"""
+        tab_id = next(self._next_id)
+        self._widgets[tab_id] = widget
+        self._ids[widget] = tab_id
+        self.states[tab_id] = state
+        if pinned:
+            self.pinned.add(tab_id)
+        return tab_id
+    
+    def replace(self, old, new, state='Active'):
+        """Move old's id, pin and activity over to new, e.g. when a
+        placeholder becomes a real tab"""
+        tab_id = self._ids.pop(old)
+        self._widgets[tab_id] = new
+        self._ids[new] = tab_id
+        self.states[tab_id] = state
+        return tab_id
+    
+    def remove(self, widget):
+        """Forget widget; returns its id, or None if it was not registered"""
+        tab_id = self._ids.pop(widget, None)
+        if tab_id is not None:
+            del self._widgets[tab_id]
+            del self.states[tab_id]
+            self.pinned.discard(tab_id)
+            self.last_active.pop(tab_id, None)
+        return tab_id
+    
+    def id_of(self, widget):
+        return self._ids.get(widget)
+    
+    def widget(self, tab_id):
+        return self._widgets.get(tab_id)
+    
+    def is_pinned(self, widget):
+        return self._ids.get(widget) in self.pinned
+    
+    def set_pinned(self, widget, pinned):
+        if pinned:
+            self.pinned.add(self._ids[widget])
+        else:
+            self.pinned.discard(self._ids[widget])
+    
+    def pinned_widgets(self):
+        return [self._widgets[tab_id] for tab_id in self.pinned]
+    
+    def state(self, widget):
+        return self.states.get(self._ids.get(widget))
+    
+    def set_state(self, widget, state):
+        if widget in self._ids:
+            self.states[self._ids[widget]] = state
+    
+    def touch(self, widget, now=None):
+        if widget in self._ids:
+            self.last_active[self._ids[widget]] = time.monotonic() if now is None else now
+    
+    def last_active_at(self, widget):
+        """When widget was last shown, or 0.0 if it never was"""
+        return self.last_active.get(self._ids.get(widget), 0.0)
+
+
+class TabSwitcherIndex:
+    """Fuzzy search over the full titles and URLs of all open tabs.
+
+    A query matches a tab when its characters appear in order in the
+    tab's title or in its URL. Exact substrings of the title rank first,
+    then substrings of the URL, then fuzzy matches by how tightly the
+    characters cluster. The matches of each query typed so far are kept,
+    so a keystroke only extends the previous matches by one character
+    and backspace returns to the previous ones. The SHORT_CACHE most
+    recent queries of up to SHORT_QUERY characters, which every search
+    passes through, also keep their matches and ranking until a tab
+    changes.
+
+    Matches are parallel lists rather than one tuple per tab, so that
+    extending them by a character is a few str.find maps over all of
+    them instead of a Python loop per tab.
+    """
+
+    SHORT_QUERY = 2
+    SHORT_CACHE = 128
+    # Stands in for "no match in this field": str.find from it or from
+    # MISSING + 1 returns -1, and -1 % MISSING is MISSING - 1, which is
+    # just as far past the end of any text
+    MISSING = 1 << 62
+    # Rank keys: exact title matches by position, then exact URL matches
+    # by position, then fuzzy matches by span
+    ADDRESS_RANK = 1 << 40
+    FUZZY_RANK = 2 << 40
+
+    def __init__(self):
+        self._entries = {}  # tab id -> (title, url, 'title\naddress' lowercased, title length)
+        self._prefixes = {}  # query -> its matches, see _extend()
+        self._short = OrderedDict()  # short query -> (its matches, limit, best ids)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def set(self, tab_id, title=None, url=None):
+        """Add a tab or update its title and/or URL"""
+        # Pages can still signal between closing and being deleted
+        if tab_id is None:
+            return
+        old_title, old_url, _, _ = self._entries.get(tab_id, ('', '', '', 0))
+        title = old_title if title is None else title
+        url = old_url if url is None else url
+        # Every URL starts with a scheme, which would make short queries
+        # fuzzy-match every tab
+        address = OmniboxIndex.ADDRESS_PREFIX_RE.sub('', url.lower())
+        folded = title.lower().replace('\n', ' ')
+        self._entries[tab_id] = (title, url, f'{folded}\n{address}', len(folded))
+        self._prefixes.clear()
+        self._short.clear()
+    
+    def remove(self, tab_id):
+        if self._entries.pop(tab_id, None) is not None:
+            self._prefixes.clear()
+            self._short.clear()
+    
+    def entry(self, tab_id):
+        """(title, url) of a tab, or None"""
+        entry = self._entries.get(tab_id)
+        return entry[:2] if entry else None
+    
+    def _extend(self, matches, chars):
+        """Matches extended by chars, each taken at its first occurrence
+        after the previous one in the same field.
+
+        matches is (ids, texts, title lengths, title starts, title ends,
+        address starts, address ends), where a start is the position of
+        the first character of the query and an end that of the last.
+        The starts are None for the empty query, whose ends are where
+        each field's search begins.
+        """
+        ids, texts, title_ends, title_starts, title_pos, address_starts, address_pos = matches
+        ones, missing = itertools.repeat(1), itertools.repeat(self.MISSING)
+        for char in chars:
+            char = itertools.repeat(char)
+            title_pos = list(map(str.find, texts, char, map(operator.add, title_pos, ones), title_ends))
+            address_pos = list(map(str.find, texts, char, map(operator.add, address_pos, ones)))
+            if title_starts is None:
+                title_starts, address_starts = title_pos, address_pos
+            if -1 in title_pos and -1 in address_pos:
+                # Tabs without the character in either field drop out;
+                # x & y is -1 only if both are
+                keep = list(map(operator.ne, map(operator.and_, title_pos, address_pos), itertools.repeat(-1)))
+                ids, texts, title_ends, title_starts, title_pos, address_starts, address_pos = (
+                    list(itertools.compress(values, keep))
+                    for values in (ids, texts, title_ends, title_starts, title_pos, address_starts, address_pos))
+            if -1 in title_pos:
+                title_pos = list(map(operator.mod, title_pos, missing))
+            if -1 in address_pos:
+                address_pos = list(map(operator.mod, address_pos, missing))
+        return ids, texts, title_ends, title_starts, title_pos, address_starts, address_pos
+    
+    def _best(self, query, matches, limit):
+        ids, texts, title_ends, title_starts, title_pos, address_starts, address_pos = matches
+        found = list(map(str.find, texts, itertools.repeat(query)))
+        if len(found) - found.count(-1) >= limit:
+            # Every fuzzy match ranks after the exact ones, so their spans
+            # make no difference
+            title_spans = address_spans = itertools.repeat(0)
+        else:
+            title_spans = map(operator.sub, title_pos, title_starts)
+            address_spans = map(operator.sub, address_pos, address_starts)
+        keys = [(position if position < title_end else self.ADDRESS_RANK + position) if position >= 0
+                else self.FUZZY_RANK + (title if title < address else address)
+                for position, title_end, title, address in zip(found, title_ends, title_spans, address_spans)]
+        return [ids[i] for i in sorted(range(len(ids)), key=keys.__getitem__)[:limit]]
+    
+    def search(self, query, limit=50):
+        """Ids of the best matching tabs, best first"""
+        query = query.strip().lower()
+        if not query:
+            return list(self._entries)[:limit]
+        
+        short = self._short.get(query)
+        if short is not None and short[1] >= limit:
+            matches, _, best = short
+            self._short.move_to_end(query)
+        else:
+            base = query
+            while base and base not in self._prefixes:
+                base = base[:-1]
+            if base:
+                matches = self._prefixes[base]
+            else:
+                # In id order, so that equally good matches keep it
+                ids = sorted(self._entries)
+                entries = [self._entries[tab_id] for tab_id in ids]
+                title_ends = [entry[3] for entry in entries]
+                matches = (ids, [entry[2] for entry in entries], title_ends,
+                           None, [-1] * len(ids), None, title_ends)
+            matches = self._extend(matches, query[len(base):])
+            best = self._best(query, matches, limit)
+            if len(query) <= self.SHORT_QUERY:
+                self._short[query] = (matches, limit, best)
+                if len(self._short) > self.SHORT_CACHE:
+                    self._short.popitem(last=False)
+        
+        # Only the prefixes of what is being typed can be reused
+        self._prefixes = {prefix: kept for prefix, kept in self._prefixes.items() if query.startswith(prefix)}
+        self._prefixes[query] = matches
+        return best[:limit]
+
+
+class TabPlaceholder(QWidget):
+    """Stands in for a restored tab until it is first shown.
+
+    Holds only the URL, title and packed back/forward history, so tabs
+    the user never opens cost neither a web view nor a network load.
+    """
+
+    def __init__(self, url, title, parent=None, history=None):
+        super().__init__(parent)
+        self._url = QUrl(url)
+        self.title = title
+        self.history = history
+    
+    def url(self):
+        return self._url
+    
+    def setUrl(self, qurl):
+        self._url = QUrl(qurl)
 
 
 class BrowserTab(QWebEngineView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_browser = parent
+        self.start_url = None  # the page a new tab opens on, see has_history()
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         
+    def history_state(self):
+        """This tab's back/forward history, serialized with QDataStream"""
+        data = QByteArray()
+        stream = QDataStream(data, QIODevice.OpenModeFlag.WriteOnly)
+        stream << self.history()
+        return data.data()
+    
+    def has_history(self):
+        """Whether the back/forward list holds a page worth keeping: any
+        but about:blank, and more than the start page a new tab opened on"""
+        urls = [item.originalUrl().toString() for item in self.history().items()
+                if not item.url().isEmpty() and item.url().toString() != 'about:blank']
+        if len(urls) == 1 and self.start_url is not None:
+            return BrowserDatabase.normalize_url(urls[0]) != BrowserDatabase.normalize_url(self.start_url.toString())
+        return bool(urls)
+    
+    def restore_history_state(self, state):
+        """Replace the history with a serialized one and load its current
+        entry; returns False if state could not be read"""
+        stream = QDataStream(QByteArray(state), QIODevice.OpenModeFlag.ReadOnly)
+        stream >> self.history()
+        return stream.status() == QDataStream.Status.Ok
+    
     def createWindow(self, window_type):
         new_tab = self.parent_browser.add_new_tab(QUrl('about:blank'), 'New Tab')
         return new_tab
@@ -761,6 +2606,635 @@ class DownloadManager(QDialog):
                 )
 
 
+class UiUpdateScheduler:
+    """Coalesces per-tab UI updates into at most one pass per interval.
+
+    Tabs report changes with mark(tab, kind, value); only the latest value
+    of each kind is kept, and everything marked is handed to
+    apply(tab, changes) together, interval_ms after the first mark.
+    apply returns how many of the changes it skipped because their widget
+    is hidden, e.g. load progress of a background tab.
+    """
+
+    def __init__(self, apply, interval_ms=16, defer=QTimer.singleShot):
+        self.apply = apply
+        self.interval_ms = interval_ms
+        self.defer = defer
+        self.dirty = {}  # tab -> {kind: latest value}
+        self.scheduled = False
+        self.stats = {'marked': 0, 'coalesced': 0, 'hidden': 0, 'applied': 0, 'flushes': 0, 'last_flush_ms': 0.0}
+    
+    def mark(self, tab, kind, value=None):
+        self.stats['marked'] += 1
+        changes = self.dirty.setdefault(tab, {})
+        if kind in changes:
+            self.stats['coalesced'] += 1
+        changes[kind] = value
+        if not self.scheduled:
+            self.scheduled = True
+            self.defer(self.interval_ms, self.flush)
+    
+    def forget(self, tab):
+        """Drop pending changes of a tab that is going away"""
+        self.dirty.pop(tab, None)
+    
+    def flush(self):
+        start = time.perf_counter()
+        self.scheduled = False
+        dirty, self.dirty = self.dirty, {}
+        for tab, changes in dirty.items():
+            hidden = self.apply(tab, changes) or 0
+            self.stats['hidden'] += hidden
+            self.stats['applied'] += len(changes) - hidden
+        self.stats['flushes'] += 1
+        self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+    
+    def metrics(self):
+        marked = self.stats['marked']
+        skipped = self.stats['coalesced'] + self.stats['hidden']
+        return {**self.stats, 'skipped': skipped, 'skip_rate': skipped / marked if marked else 0.0}
+
+
+class IdleTaskQueue:
+    """Runs queued tasks one per event-loop turn, so painting and input
+    get in between.
+
+    Nothing runs until start(). A task that returns True is not finished
+    and runs again on a later turn, which lets long work go in slices.
+    finished() is called each time the queue runs empty; flush() runs
+    everything left at once, for when the results are needed now.
+    """
+
+    def __init__(self, trace=None, finished=None, defer=QTimer.singleShot):
+        self.trace = trace
+        self.finished = finished
+        self.defer = defer
+        self.tasks = deque()  # (name, task)
+        self.started = False
+        self.scheduled = False
+        self.stats = {'tasks': 0, 'slices': 0, 'longest_slice_ms': 0.0}
+    
+    def add(self, name, task):
+        self.tasks.append((name, task))
+        self._schedule()
+    
+    def start(self):
+        if not self.started:
+            self.started = True
+            self._schedule()
+    
+    def _schedule(self):
+        if self.started and self.tasks and not self.scheduled:
+            self.scheduled = True
+            self.defer(0, self.run_next)
+    
+    def run_next(self):
+        self.scheduled = False
+        if self.tasks:
+            self._run_slice()
+            if self.tasks:
+                self._schedule()
+            elif self.finished:
+                self.finished()
+    
+    def _run_slice(self):
+        name, task = self.tasks[0]
+        start = time.perf_counter()
+        more = task()
+        end = time.perf_counter()
+        if not more:
+            self.tasks.popleft()
+            self.stats['tasks'] += 1
+        self.stats['slices'] += 1
+        self.stats['longest_slice_ms'] = max(self.stats['longest_slice_ms'], (end - start) * 1000)
+        if self.trace:
+            self.trace.add(name, start, end)
+    
+    def flush(self):
+        if not self.tasks:
+            return
+        while self.tasks:
+            self._run_slice()
+        if self.finished:
+            self.finished()
+
+
+class SpeculativePreloader(QObject):
+    """Loads the likely next page in a hidden QWebEnginePage before Enter.
+
+    At most budget speculative pages exist at once; starting another one
+    discards the oldest. take() hands the page for the URL actually opened
+    over to the caller and discards the rest, so a wrong guess costs only
+    the network and CPU already spent on it. A view that adopts a page
+    also adopts its back/forward list, so only views without history of
+    their own are handed one; a new tab still on its start page counts
+    as one, and gives up only that start page.
+    """
+
+    def __init__(self, budget=2, profile=None, parent=None):
+        super().__init__(parent)
+        self.budget = budget
+        self.profile = profile or QWebEngineProfile.defaultProfile()
+        self.pending = OrderedDict()  # normalized url -> {'page', 'started', 'load_ms'}
+        self.stats = {'started': 0, 'hits': 0, 'misses': 0, 'discarded': 0, 'saved_ms': 0.0}
+    
+    def preload(self, url, profile=None):
+        """Start loading url in a hidden page on profile, by default the
+        preloader's own"""
+        key = BrowserDatabase.normalize_url(url)
+        if key in self.pending:
+            self.pending.move_to_end(key)
+            return
+        while self.pending and len(self.pending) >= self.budget:
+            self._discard(next(iter(self.pending)))
+        if self.budget <= 0:
+            return
+        
+        page = QWebEnginePage(profile or self.profile, self)
+        entry = {'page': page, 'started': time.perf_counter(), 'load_ms': None}
+        page.loadFinished.connect(lambda ok, entry=entry: entry.update(
+            load_ms=(time.perf_counter() - entry['started']) * 1000 if ok else None))
+        page.load(QUrl(url))
+        self.pending[key] = entry
+        self.stats['started'] += 1
+    
+    def take(self, url, view=None):
+        """The preloaded page for url, or None; other speculative pages are
+        discarded either way. With a view, the page is only handed over if
+        the view can adopt it without losing anything: it must have no
+        history and use the same profile."""
+        key = BrowserDatabase.normalize_url(url)
+        if view is not None and key in self.pending and (
+                view.has_history() or self.pending[key]['page'].profile() is not view.page().profile()):
+            self.cancel()
+            return None
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            if self.pending:
+                self.stats['misses'] += 1
+            self.cancel()
+            return None
+        self.cancel()
+        
+        # A finished page saved its whole load; one still loading saved the
+        # head start it had over a load started now.
+        elapsed = (time.perf_counter() - entry['started']) * 1000
+        self.stats['hits'] += 1
+        self.stats['saved_ms'] += entry['load_ms'] if entry['load_ms'] is not None else elapsed
+        entry['page'].loadFinished.disconnect()
+        return entry['page']
+    
+    def cancel(self):
+        for key in list(self.pending):
+            self._discard(key)
+    
+    def _discard(self, key):
+        page = self.pending.pop(key)['page']
+        page.triggerAction(QWebEnginePage.WebAction.Stop)
+        page.deleteLater()
+        self.stats['discarded'] += 1
+    
+    def metrics(self):
+        guesses = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / guesses if guesses else 0.0,
+            'avg_saved_ms': self.stats['saved_ms'] / self.stats['hits'] if self.stats['hits'] else 0.0
+        }
+
+
+class BatchRenderer(QObject):
+    """Renders a list of URLs to PDF, a PNG screenshot and text.
+
+    A pool of offscreen views takes URLs from a shared queue, each attempt
+    on a fresh page so signals of an abandoned attempt can never reach
+    the next one. Every attempt, from load to the finished PDF, must
+    finish within timeout seconds; a failed or timed-out URL goes to the
+    back of the queue until it has been tried retries + 1 times. Pages use
+    an off-the-record profile, so batch jobs leave no cookies or cache in
+    the user's profile.
+    """
+
+    finished = pyqtSignal(dict)
+    TEXT_SCRIPT = 'document.body ? document.body.innerText : ""'
+
+    def __init__(self, urls, output_dir, workers=4, timeout=30.0, retries=1, size=(1280, 800), parent=None):
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.timeout_ms = int(timeout * 1000)
+        self.retries = retries
+        self.size = size
+        self.profile = QWebEngineProfile(self)
+        self.jobs = [{'index': i, 'url': url, 'status': 'pending', 'attempts': 0, 'error': None,
+                      'ms': None, 'files': {}} for i, url in enumerate(urls)]
+        self.queue = deque(self.jobs)
+        self.slots = []
+        self.started = None
+    
+    @staticmethod
+    def read_url_list(path):
+        """URLs from a file, one per line; blank lines and # comments are skipped"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    
+    @staticmethod
+    def output_name(index, url):
+        """File name stem for the index-th URL: its position and a readable slug"""
+        parts = urlsplit(url)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', f'{parts.netloc}{parts.path}').strip('-')[:80]
+        return f'{index:05d}-{slug or "page"}'
+    
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.started = time.perf_counter()
+        for _ in range(min(self.workers, len(self.jobs)) or 1):
+            view = QWebEngineView()
+            view.resize(*self.size)
+            view.show()
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            slot = {'view': view, 'page': None, 'timer': timer, 'job': None, 'token': 0, 'stage': None}
+            timer.timeout.connect(lambda slot=slot: self._fail(slot, slot['token'], 'timed out'))
+            self.slots.append(slot)
+        for slot in self.slots:
+            self._next(slot)
+    
+    def _next(self, slot):
+        if not self.queue:
+            slot['job'] = None
+            if all(other['job'] is None for other in self.slots):
+                self._finish()
+            return
+        job = self.queue.popleft()
+        job['attempts'] += 1
+        job['started'] = time.perf_counter()
+        slot['token'] += 1
+        slot['job'] = job
+        slot['stage'] = 'loading'
+        
+        token = slot['token']
+        page = QWebEnginePage(self.profile, slot['view'])
+        page.loadFinished.connect(lambda ok: self._loaded(slot, token, ok))
+        page.pdfPrintingFinished.connect(lambda path, ok: self._pdf_done(slot, token, ok))
+        slot['view'].setPage(page)
+        if slot['page'] is not None:
+            slot['page'].deleteLater()
+        slot['page'] = page
+        slot['timer'].start(self.timeout_ms)
+        page.load(QUrl(job['url']))
+    
+    def _current(self, slot, token, stage):
+        return slot['job'] is not None and slot['token'] == token and slot['stage'] == stage
+    
+    def _loaded(self, slot, token, ok):
+        if not self._current(slot, token, 'loading'):
+            return
+        if not ok:
+            self._fail(slot, token, 'load failed')
+            return
+        slot['stage'] = 'text'
+        slot['page'].runJavaScript(self.TEXT_SCRIPT, lambda text: self._text_done(slot, token, text))
+    
+    def _text_done(self, slot, token, text):
+        if not self._current(slot, token, 'text'):
+            return
+        job = slot['job']
+        base = os.path.join(self.output_dir, self.output_name(job['index'], job['url']))
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text or '')
+        job['files']['text'] = base + '.txt'
+        
+        if slot['view'].grab().save(base + '.png'):
+            job['files']['screenshot'] = base + '.png'
+        
+        slot['stage'] = 'pdf'
+        job['files']['pdf'] = base + '.pdf'
+        slot['page'].printToPdf(base + '.pdf')
+    
+    def _pdf_done(self, slot, token, ok):
+        if not self._current(slot, token, 'pdf'):
+            return
+        if not ok:
+            self._fail(slot, token, 'PDF printing failed')
+            return
+        slot['timer'].stop()
+        job = slot['job']
+        job['status'] = 'ok'
+        job['error'] = None
+        job['ms'] = (time.perf_counter() - job['started']) * 1000
+        self._next(slot)
+    
+    def _fail(self, slot, token, error):
+        if slot['job'] is None or slot['token'] != token:
+            return
+        slot['timer'].stop()
+        slot['page'].triggerAction(QWebEnginePage.WebAction.Stop)
+        job = slot['job']
+        job['error'] = error
+        if job['attempts'] <= self.retries:
+            self.queue.append(job)
+        else:
+            job['status'] = 'failed'
+            job['ms'] = (time.perf_counter() - job['started']) * 1000
+        self._next(slot)
+    
+    def summary(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        done = sorted(job['ms'] for job in self.jobs if job['status'] == 'ok')
+        ok = len(done)
+        return {
+            'urls': len(self.jobs),
+            'ok': ok,
+            'failed': sum(1 for job in self.jobs if job['status'] == 'failed'),
+            'retried': sum(1 for job in self.jobs if job['attempts'] > 1),
+            'workers': self.workers,
+            'elapsed_s': elapsed,
+            'urls_per_sec': ok / elapsed if elapsed else 0.0,
+            'p50_ms': done[len(done) // 2] if done else 0.0,
+            'p95_ms': done[min(ok - 1, int(ok * 0.95))] if done else 0.0
+        }
+    
+    def _finish(self):
+        for slot in self.slots:
+            slot['view'].close()
+            slot['view'].deleteLater()
+        self.slots = []
+        report = {'summary': self.summary(),
+                  'jobs': [{key: job[key] for key in ('url', 'status', 'attempts', 'error', 'ms', 'files')}
+                           for job in self.jobs]}
+        with open(os.path.join(self.output_dir, 'report.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        self.finished.emit(report)
+
+
+class TabLifecycleManager(QObject):
+    """Freezes and then discards background tabs, least recently used first.
+
+    A tab idle for tab_freeze_after_min minutes is frozen: it keeps its
+    memory but runs no scripts or timers. Tabs are discarded, giving up
+    their renderer state, while more than tab_max_live tabs are loaded or
+    the browser and its renderers use more than tab_memory_budget_mb. The
+    current tab and pinned tabs are exempt, and no page goes below the
+    state Qt recommends for it (pages playing audio stay active, pages
+    with unsaved form input are only frozen). A discarded tab reloads when
+    shown again.
+    """
+
+    def __init__(self, tabs, settings_manager, registry, interval=15000, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.settings_manager = settings_manager
+        self.registry = registry
+        self.stats = {'frozen': 0, 'discarded': 0, 'reloaded': 0, 'freed_bytes': 0, 'last_check_ms': 0.0}
+        
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.enforce)
+        self.timer.start(interval)
+    
+    def loaded_tabs(self):
+        return [tab for tab in (self.tabs.widget(i) for i in range(self.tabs.count())) if isinstance(tab, BrowserTab)]
+    
+    def touch(self, browser):
+        """Mark browser as just shown, waking it if it was frozen or discarded"""
+        if not isinstance(browser, BrowserTab):
+            return
+        self.registry.touch(browser)
+        page = browser.page()
+        state = page.lifecycleState()
+        if state != QWebEnginePage.LifecycleState.Active:
+            if state == QWebEnginePage.LifecycleState.Discarded:
+                self.stats['reloaded'] += 1
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            self.registry.set_state(browser, 'Active')
+    
+    def memory_bytes(self, tabs=None):
+        """Resident memory of the browser process and its tabs' renderers"""
+        pids = {tab.page().renderProcessPid() for tab in (tabs if tabs is not None else self.loaded_tabs())}
+        return ProcessSampler.rss_bytes(os.getpid()) + sum(ProcessSampler.rss_bytes(pid) for pid in pids if pid > 0)
+    
+    def renderer_bytes(self, browser, tabs):
+        """Memory discarding browser would give back: its renderer's, unless
+        another live tab shares that renderer"""
+        pid = browser.page().renderProcessPid()
+        if pid <= 0 or any(tab is not browser and tab.page().renderProcessPid() == pid for tab in tabs):
+            return 0
+        return ProcessSampler.rss_bytes(pid)
+    
+    def enforce(self, force=False):
+        """Apply the freeze and discard policy once; force discards every
+        eligible tab regardless of the limits"""
+        start = time.perf_counter()
+        tabs = self.loaded_tabs()
+        live = [tab for tab in tabs if tab.page().lifecycleState() != QWebEnginePage.LifecycleState.Discarded]
+        current = self.tabs.currentWidget()
+        candidates = sorted((tab for tab in live
+                             if tab is not current and not self.registry.is_pinned(tab)
+                             and tab.page().recommendedState() != QWebEnginePage.LifecycleState.Active),
+                            key=self.registry.last_active_at)
+        
+        freeze_after = int(self.settings_manager.get('tab_freeze_after_min') or 0) * 60
+        now = time.monotonic()
+        for tab in candidates:
+            if freeze_after and now - self.registry.last_active_at(tab) >= freeze_after:
+                self.freeze(tab)
+        candidates = [tab for tab in candidates
+                      if tab.page().recommendedState() == QWebEnginePage.LifecycleState.Discarded]
+        
+        max_live = int(self.settings_manager.get('tab_max_live') or 0)
+        budget = int(self.settings_manager.get('tab_memory_budget_mb') or 0) * 1024 * 1024
+        # Renderers take a moment to exit, so count discarded memory as
+        # gone right away instead of measuring again after each discard.
+        used = self.memory_bytes(live) if budget else 0
+        for tab in candidates:
+            if not (force or (max_live and len(live) > max_live) or (budget and used > budget)):
+                break
+            freed = self.renderer_bytes(tab, live)
+            self.discard(tab)
+            live.remove(tab)
+            used -= freed
+            self.stats['freed_bytes'] += freed
+        self.stats['last_check_ms'] = (time.perf_counter() - start) * 1000
+    
+    def freeze(self, browser):
+        page = browser.page()
+        if page.lifecycleState() == QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self.registry.set_state(browser, 'Frozen')
+            self.stats['frozen'] += 1
+    
+    def discard(self, browser):
+        self.freeze(browser)
+        browser.page().setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+        self.registry.set_state(browser, 'Discarded')
+        self.stats['discarded'] += 1
+    
+    def state_name(self, browser):
+        return self.registry.state(browser) or 'Not loaded'
+
+
+class DataTransferWorker(QThread):
+    """Runs a BrowserDataTransfer import or export off the GUI thread"""
+
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, database, direction, path, kind, parent=None):
+        super().__init__(parent)
+        self.transfer = BrowserDataTransfer(database)
+        self.direction = direction
+        self.path = path
+        self.kind = kind
+        self._cancelled = False
+    
+    def cancel(self):
+        self._cancelled = True
+    
+    def run(self):
+        run = self.transfer.import_file if self.direction == 'import' else self.transfer.export_file
+        try:
+            stats = run(self.path, self.kind,
+                        progress=lambda fraction, count: self.progress.emit(int(fraction * 100), count),
+                        cancelled=lambda: self._cancelled)
+        except Exception as e:
+            # Whatever went wrong, the progress dialog waits for one of the
+            # two signals
+            self.failed.emit(str(e) or type(e).__name__)
+            return
+        self.completed.emit(stats)
+
+
+class PagedListModel(QAbstractListModel):
+    """List model that reads its rows from the database one page at a time.
+
+    Rows are appended through canFetchMore/fetchMore as the view scrolls.
+    Only the starting key of each page is kept for good; the rows
+    themselves live in a small LRU cache and are re-read when a view
+    scrolls back to them, so memory stays flat however far it goes.
+
+    list_page(after, limit) and search_page(text, limit, after) read the
+    page that follows the key after, or the first page when it is None;
+    list_key and search_key give the key of a page's last row.
+    """
+
+    RowRole = Qt.ItemDataRole.UserRole
+    SearchTextRole = Qt.ItemDataRole.UserRole + 1
+    PAGE_SIZE = 200
+    CACHED_PAGES = 8
+
+    def __init__(self, list_page, list_key, search_page, search_key, display_text, parent=None):
+        super().__init__(parent)
+        self.list_page = list_page
+        self.list_key = list_key
+        self.search_page = search_page
+        self.search_key = search_key
+        self.display_text = display_text
+        self.search_text = ''
+        self._reset_state()
+    
+    def _reset_state(self):
+        self._anchors = [None]
+        self._pages = OrderedDict()
+        self._row_count = 0
+        self._exhausted = False
+    
+    def fetch_page(self, anchor, limit):
+        if self.search_text:
+            return self.search_page(self.search_text, limit, anchor)
+        return self.list_page(anchor, limit)
+    
+    def page_key(self, row):
+        return self.search_key(row) if self.search_text else self.list_key(row)
+    
+    def set_search(self, text):
+        """Switch between plain listing and database search results"""
+        text = text.strip()
+        if text != self.search_text:
+            self.search_text = text
+            self.reload()
+    
+    def reload(self):
+        self.beginResetModel()
+        self._reset_state()
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        page_no = len(self._anchors) - 1
+        anchor = self._anchors[page_no]
+        rows = self.fetch_page(anchor, self.PAGE_SIZE)
+        if len(rows) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        
+        self.beginInsertRows(QModelIndex(), self._row_count, self._row_count + len(rows) - 1)
+        self._cache_page(page_no, rows)
+        self._anchors.append(self.page_key(rows[-1]))
+        self._row_count += len(rows)
+        self.endInsertRows()
+    
+    def _cache_page(self, page_no, rows):
+        self._pages[page_no] = rows
+        self._pages.move_to_end(page_no)
+        while len(self._pages) > self.CACHED_PAGES:
+            self._pages.popitem(last=False)
+    
+    def row_at(self, row):
+        page_no, offset = divmod(row, self.PAGE_SIZE)
+        rows = self._pages.get(page_no)
+        if rows is None:
+            rows = self.fetch_page(self._anchors[page_no], self.PAGE_SIZE)
+            self._cache_page(page_no, rows)
+        else:
+            self._pages.move_to_end(page_no)
+        # Rows deleted since the page was first read leave it short.
+        return rows[offset] if offset < len(rows) else None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._row_count:
+            return None
+        row = self.row_at(index.row())
+        if row is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(row)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row[2]
+        if role == self.RowRole:
+            return row
+        if role == self.SearchTextRole:
+            return f"{row[1]} {row[2]}".lower()
+        return None
+
+
+class SearchFilterProxyModel(QSortFilterProxyModel):
+    """Narrows the rows already loaded while a database search is pending"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.terms = []
+    
+    def set_filter_text(self, text):
+        self.terms = text.lower().split()
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.terms:
+            return True
+        model = self.sourceModel()
+        haystack = model.data(model.index(source_row, 0, source_parent), PagedListModel.SearchTextRole)
+        return haystack is not None and all(term in haystack for term in self.terms)
+
+
 class BookmarkDialog(QDialog):
     def __init__(self, database, parent=None):
         super().__init__(parent)
@@ -778,24 +3252,34 @@ class BookmarkDialog(QDialog):
                 color: #333333;
                 padding: 8px;
             }
-            QListWidget {
+            QListView {
                 background-color: #ffffff;
                 border: 2px solid #e0e0e0;
                 border-radius: 8px;
                 padding: 8px;
                 font-size: 13px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 12px;
                 border-bottom: 1px solid #f0f0f0;
                 border-radius: 4px;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #e8f4fd;
             }
-            QListWidget::item:selected {
-                background-color: #4a90e2;
-                color: white;
+            QListView::item:selected {
+                background-color: #4a90e2;
+                color: white;
+            }
+            QLineEdit {
+                border: 2px solid #e0e0e0;
+                border-radius: 6px;
+                padding: 8px 12px;
+                background-color: #ffffff;
+                font-size: 13px;
+            }
+            QLineEdit:focus {
+                border: 2px solid #4a90e2;
             }
             QPushButton {
                 background-color: #4a90e2;
@@ -824,8 +3308,27 @@ class BookmarkDialog(QDialog):
         title_label = QLabel('📚 Your Bookmarks')
         layout.addWidget(title_label)
         
-        self.bookmark_list = QListWidget()
-        self.bookmark_list.itemDoubleClicked.connect(self.open_bookmark)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('🔍 Search bookmarks...')
+        self.search_input.textChanged.connect(self.on_search_changed)
+        layout.addWidget(self.search_input)
+        
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.apply_search)
+        
+        self.model = PagedListModel(
+            self.database.get_bookmarks_page, lambda row: (row[3], row[0]),
+            self.database.search_bookmarks, lambda row: (row[4], row[0]),
+            lambda row: f"{row[1]} - {row[2]}", self)
+        self.proxy = SearchFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.bookmark_list = QListView()
+        self.bookmark_list.setUniformItemSizes(True)
+        self.bookmark_list.setModel(self.proxy)
+        self.bookmark_list.doubleClicked.connect(self.open_bookmark)
         layout.addWidget(self.bookmark_list)
         
         button_layout = QHBoxLayout()
@@ -843,35 +3346,39 @@ class BookmarkDialog(QDialog):
         
         layout.addLayout(button_layout)
         self.setLayout(layout)
-        
-        self.load_bookmarks()
     
     def load_bookmarks(self):
-        self.bookmark_list.clear()
-        bookmarks = self.database.get_bookmarks()
-        for bookmark in bookmarks:
-            item = QListWidgetItem(f"{bookmark[1]} - {bookmark[2]}")
-            item.setData(Qt.ItemDataRole.UserRole, bookmark)
-            self.bookmark_list.addItem(item)
-    
-    def open_bookmark(self, item):
-        bookmark = item.data(Qt.ItemDataRole.UserRole)
-        if self.parent():
+        self.model.reload()
+    
+    def on_search_changed(self, text):
+        # Filter what is on screen now; query the database once typing pauses.
+        self.proxy.set_filter_text(text)
+        self.search_timer.start()
+    
+    def apply_search(self):
+        self.model.set_search(self.search_input.text())
+        self.proxy.set_filter_text('')
+    
+    def open_bookmark(self, index):
+        bookmark = index.data(PagedListModel.RowRole)
+        if bookmark and self.parent():
             self.parent().navigate_to_url(bookmark[2])
         self.close()
     
     def delete_bookmark(self):
-        current_item = self.bookmark_list.currentItem()
-        if current_item:
-            bookmark = current_item.data(Qt.ItemDataRole.UserRole)
-            self.database.delete_bookmark(bookmark[0])
-            self.load_bookmarks()
+        current_index = self.bookmark_list.currentIndex()
+        if current_index.isValid():
+            bookmark = current_index.data(PagedListModel.RowRole)
+            if bookmark:
+                self.database.delete_bookmark(bookmark[0])
+                self.load_bookmarks()
 
 
 class HistoryDialog(QDialog):
     def __init__(self, database, parent=None):
         super().__init__(parent)
         self.database = database
+        self.cleared = False
         self.setWindowTitle('📜 Browsing History')
         self.setGeometry(100, 100, 700, 500)
         
@@ -885,25 +3392,35 @@ class HistoryDialog(QDialog):
                 color: #333333;
                 padding: 8px;
             }
-            QListWidget {
+            QListView {
                 background-color: #ffffff;
                 border: 2px solid #e0e0e0;
                 border-radius: 8px;
                 padding: 8px;
                 font-size: 13px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 12px;
                 border-bottom: 1px solid #f0f0f0;
                 border-radius: 4px;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #e8f4fd;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #4a90e2;
                 color: white;
             }
+            QLineEdit {
+                border: 2px solid #e0e0e0;
+                border-radius: 6px;
+                padding: 8px 12px;
+                background-color: #ffffff;
+                font-size: 13px;
+            }
+            QLineEdit:focus {
+                border: 2px solid #4a90e2;
+            }
             QPushButton {
                 background-color: #4a90e2;
                 color: white;
@@ -931,8 +3448,27 @@ class HistoryDialog(QDialog):
         title_label = QLabel('🕒 Your Browsing History')
         layout.addWidget(title_label)
         
-        self.history_list = QListWidget()
-        self.history_list.itemDoubleClicked.connect(self.open_history_item)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('🔍 Search history...')
+        self.search_input.textChanged.connect(self.on_search_changed)
+        layout.addWidget(self.search_input)
+        
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.apply_search)
+        
+        self.model = PagedListModel(
+            self.database.get_history_page, lambda row: (row[3], row[4], row[0]),
+            self.database.search_history, lambda row: (row[4], row[0]),
+            lambda row: f"{row[1]} - {row[2]} ({row[3][:19]})", self)
+        self.proxy = SearchFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.history_list = QListView()
+        self.history_list.setUniformItemSizes(True)
+        self.history_list.setModel(self.proxy)
+        self.history_list.doubleClicked.connect(self.open_history_item)
         layout.addWidget(self.history_list)
         
         button_layout = QHBoxLayout()
@@ -950,20 +3486,22 @@ class HistoryDialog(QDialog):
         
         layout.addLayout(button_layout)
         self.setLayout(layout)
-        
-        self.load_history()
     
     def load_history(self):
-        self.history_list.clear()
-        history = self.database.get_history()
-        for item in history:
-            list_item = QListWidgetItem(f"{item[1]} - {item[2]} ({item[3][:19]})")
-            list_item.setData(Qt.ItemDataRole.UserRole, item)
-            self.history_list.addItem(list_item)
-    
-    def open_history_item(self, item):
-        history = item.data(Qt.ItemDataRole.UserRole)
-        if self.parent():
+        self.model.reload()
+    
+    def on_search_changed(self, text):
+        # Filter what is on screen now; query the database once typing pauses.
+        self.proxy.set_filter_text(text)
+        self.search_timer.start()
+    
+    def apply_search(self):
+        self.model.set_search(self.search_input.text())
+        self.proxy.set_filter_text('')
+    
+    def open_history_item(self, index):
+        history = index.data(PagedListModel.RowRole)
+        if history and self.parent():
             self.parent().navigate_to_url(history[2])
         self.close()
     
@@ -973,6 +3511,7 @@ class HistoryDialog(QDialog):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             self.database.clear_history()
+            self.cleared = True
             self.load_history()
 
 
@@ -1251,11 +3790,12 @@ class ExtensionDialog(QDialog):
 
 
 class SettingsDialog(QDialog):
-    def __init__(self, settings_manager, parent=None):
+    def __init__(self, settings_manager, parent=None, retention_job=None):
         super().__init__(parent)
         self.settings_manager = settings_manager
+        self.retention_job = retention_job
         self.setWindowTitle('⚙️ Browser Settings')
-        self.setGeometry(100, 100, 600, 400)
+        self.setGeometry(100, 100, 600, 680)
         
         self.setStyleSheet("""
             QDialog {
@@ -1290,6 +3830,16 @@ class SettingsDialog(QDialog):
             QComboBox::drop-down {
                 border: none;
             }
+            QSpinBox {
+                border: 2px solid #e0e0e0;
+                border-radius: 6px;
+                padding: 8px 12px;
+                background-color: #ffffff;
+                font-size: 13px;
+            }
+            QSpinBox:focus {
+                border: 2px solid #4a90e2;
+            }
             QPushButton {
                 background-color: #4a90e2;
                 color: white;
@@ -1346,36 +3896,538 @@ class SettingsDialog(QDialog):
         download_layout.addWidget(browse_btn)
         layout.addLayout(download_layout)
         
-        layout.addStretch()
+        # History retention (0 means no limit)
+        self.history_age_input = self.create_limit_row(layout, 'Keep History (days):',
+                                                       'history_max_age_days', 36500)
+        self.history_visits_input = self.create_limit_row(layout, 'Max History Entries:',
+                                                          'history_max_visits', 100000000)
+        self.history_size_input = self.create_limit_row(layout, 'Max Database Size (MB):',
+                                                        'history_max_db_size_mb', 1000000)
+        
+        # Pages loaded ahead of Enter for confident URL bar matches
+        self.preload_input = self.create_limit_row(layout, 'Speculative Preloads:', 'preload_budget', 4, 'Off')
+        
+        # Background tab lifecycle (pinned and current tabs are never touched)
+        self.freeze_input = self.create_limit_row(layout, 'Freeze Idle Tabs After (min):',
+                                                  'tab_freeze_after_min', 1440, 'Never')
+        self.max_live_input = self.create_limit_row(layout, 'Max Loaded Tabs:', 'tab_max_live', 1000)
+        self.tab_memory_input = self.create_limit_row(layout, 'Tab Memory Budget (MB):',
+                                                      'tab_memory_budget_mb', 1000000)
+        
+        compact_layout = QHBoxLayout()
+        self.reclaimed_label = QLabel()
+        self.reclaimed_label.setStyleSheet('font-weight: normal; color: #666666;')
+        compact_layout.addWidget(self.reclaimed_label)
+        compact_layout.addStretch()
+        compact_btn = QPushButton('🧹 Compact Now')
+        compact_btn.clicked.connect(self.compact_now)
+        compact_btn.setEnabled(self.retention_job is not None)
+        compact_layout.addWidget(compact_btn)
+        layout.addLayout(compact_layout)
+        
+        self.update_reclaimed_label()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.update_reclaimed_label)
+        self.stats_timer.start(1000)
+        
+        layout.addStretch()
+        
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+        
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton('✗ Cancel')
+        cancel_btn.clicked.connect(self.close)
+        button_layout.addWidget(cancel_btn)
+        
+        save_btn = QPushButton('💾 Save Settings')
+        save_btn.setObjectName('saveBtn')
+        save_btn.clicked.connect(self.save_settings)
+        button_layout.addWidget(save_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def create_limit_row(self, layout, label, key, maximum, zero_text='No limit'):
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label))
+        spin = QSpinBox()
+        spin.setRange(0, maximum)
+        spin.setSpecialValueText(zero_text)
+        spin.setValue(int(self.settings_manager.get(key) or 0))
+        row.addWidget(spin)
+        layout.addLayout(row)
+        return spin
+    
+    def update_reclaimed_label(self):
+        if not self.retention_job:
+            self.reclaimed_label.setText('History retention is not running')
+            return
+        stats = self.retention_job.stats
+        text = f"Reclaimed: {stats['reclaimed_bytes'] / (1024 * 1024):.1f} MB"
+        text += f" • {stats['deleted']} old entries removed"
+        if stats['last_run']:
+            text += f" • last run {stats['last_run'][11:19]}"
+        self.reclaimed_label.setText(text)
+    
+    def compact_now(self):
+        if self.retention_job:
+            self.retention_job.request_run()
+    
+    def browse_download_path(self):
+        path = QFileDialog.getExistingDirectory(self, 'Select Download Directory')
+        if path:
+            self.download_input.setText(path)
+    
+    def save_settings(self):
+        self.settings_manager.set('homepage', self.homepage_input.text())
+        self.settings_manager.set('search_engine', self.search_combo.currentData())
+        self.settings_manager.set('download_path', self.download_input.text())
+        self.settings_manager.set('history_max_age_days', self.history_age_input.value())
+        self.settings_manager.set('history_max_visits', self.history_visits_input.value())
+        self.settings_manager.set('history_max_db_size_mb', self.history_size_input.value())
+        self.settings_manager.set('preload_budget', self.preload_input.value())
+        self.settings_manager.set('tab_freeze_after_min', self.freeze_input.value())
+        self.settings_manager.set('tab_max_live', self.max_live_input.value())
+        self.settings_manager.set('tab_memory_budget_mb', self.tab_memory_input.value())
+        QMessageBox.information(self, 'Settings Saved', 'Your settings have been saved successfully!')
+        self.close()
+
+
+class TabMemoryDialog(QDialog):
+    """Lifecycle state and renderer memory of every tab, and what
+    freezing and discarding have given back so far"""
+
+    def __init__(self, tab_lifecycle, parent=None):
+        super().__init__(parent)
+        self.tab_lifecycle = tab_lifecycle
+        self.setWindowTitle('📊 Tab Memory')
+        self.setGeometry(100, 100, 700, 500)
+        
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #f8f9fa;
+            }
+            QLabel {
+                font-size: 13px;
+                font-weight: bold;
+                color: #333333;
+                padding: 4px;
+            }
+            QListWidget {
+                background-color: #ffffff;
+                border: 2px solid #e0e0e0;
+                border-radius: 8px;
+                padding: 8px;
+                font-size: 13px;
+            }
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 10px 20px;
+                font-weight: bold;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #357abd;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
+        self.tab_list = QListWidget()
+        layout.addWidget(self.tab_list)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        discard_btn = QPushButton('💤 Discard Background Tabs')
+        discard_btn.clicked.connect(self.discard_background_tabs)
+        button_layout.addWidget(discard_btn)
+        close_btn = QPushButton('Close')
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(2000)
+        self.refresh()
+    
+    def refresh(self):
+        manager = self.tab_lifecycle
+        tabs = manager.tabs
+        now = time.monotonic()
+        icons = {'Active': '🟢', 'Frozen': '🧊', 'Discarded': '💤', 'Not loaded': '⚪'}
+        
+        self.tab_list.clear()
+        for i in range(tabs.count()):
+            tab = tabs.widget(i)
+            state = manager.state_name(tab)
+            line = f"{icons.get(state, '•')} {state}"
+            if isinstance(tab, BrowserTab) and state != 'Discarded':
+                pid = tab.page().renderProcessPid()
+                line += f" · {ProcessSampler.rss_bytes(pid) / 1048576:.1f} MB (pid {pid})"
+            last_active = manager.registry.last_active_at(tab)
+            if last_active and tab is not tabs.currentWidget():
+                line += f" · idle {int(now - last_active) // 60} min"
+            self.tab_list.addItem(f"{line} — {tabs.tabText(i)}")
+        
+        stats = manager.stats
+        self.summary_label.setText(
+            f"Browser and renderers: {manager.memory_bytes() / 1048576:.0f} MB · "
+            f"{stats['discarded']} discarded, {stats['frozen']} frozen, {stats['reloaded']} reloaded · "
+            f"~{stats['freed_bytes'] / 1048576:.0f} MB freed")
+    
+    def discard_background_tabs(self):
+        self.tab_lifecycle.enforce(force=True)
+        self.refresh()
+
+
+class TabSwitcherDialog(QDialog):
+    """Ctrl+K popup that finds a tab by fuzzy-matching its title or URL"""
+
+    def __init__(self, browser_window, parent=None):
+        super().__init__(parent or browser_window)
+        self.browser_window = browser_window
+        self.index = browser_window.tab_switcher_index
+        self.setWindowTitle('Switch to Tab')
+        self.setWindowFlags(Qt.WindowType.Popup)
+        self.resize(640, 420)
+        
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #ffffff;
+                border: 2px solid #4a90e2;
+                border-radius: 8px;
+            }
+            QLineEdit {
+                border: 2px solid #e0e0e0;
+                border-radius: 6px;
+                padding: 10px;
+                font-size: 15px;
+            }
+            QLineEdit:focus {
+                border-color: #4a90e2;
+            }
+            QListWidget {
+                border: none;
+                font-size: 13px;
+            }
+            QListWidget::item {
+                padding: 6px;
+                border-radius: 4px;
+            }
+            QListWidget::item:selected {
+                background-color: #4a90e2;
+                color: white;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(12, 12, 12, 12)
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('🔎 Search open tabs...')
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.switch_to_selected)
+        self.search_input.installEventFilter(self)
+        layout.addWidget(self.search_input)
+        
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.switch_to_selected)
+        layout.addWidget(self.results)
+        
+        self.setLayout(layout)
+        
+        # Center over the browser window
+        geometry = browser_window.geometry()
+        self.move(geometry.center().x() - self.width() // 2, geometry.top() + 80)
+        self.update_results('')
+    
+    def update_results(self, text):
+        self.results.clear()
+        for tab_id in self.index.search(text):
+            title, url = self.index.entry(tab_id)
+            item = QListWidgetItem(f"{title or 'New Tab'}  —  {url}")
+            item.setData(Qt.ItemDataRole.UserRole, tab_id)
+            self.results.addItem(item)
+        self.results.setCurrentRow(0)
+    
+    def eventFilter(self, obj, event):
+        # Arrow keys move through the results while typing continues
+        if obj is self.search_input and event.type() == QEvent.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if event.key() == Qt.Key.Key_Down else -1
+                row = max(0, min(self.results.count() - 1, self.results.currentRow() + step))
+                self.results.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+    
+    def switch_to_selected(self, *args):
+        item = self.results.currentItem()
+        if item is not None:
+            widget = self.browser_window.tab_registry.widget(item.data(Qt.ItemDataRole.UserRole))
+            index = self.browser_window.tabs.indexOf(widget)
+            if index >= 0:
+                self.browser_window.tabs.setCurrentIndex(index)
+        self.accept()
+
+
+class SessionsDialog(QDialog):
+    """Named sessions, to switch to or delete"""
+
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.setWindowTitle('📚 Sessions')
+        self.setGeometry(100, 100, 500, 400)
+        
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #f8f9fa;
+            }
+            QListWidget {
+                background-color: #ffffff;
+                border: 2px solid #e0e0e0;
+                border-radius: 8px;
+                padding: 8px;
+                font-size: 13px;
+            }
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 10px 20px;
+                font-weight: bold;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #357abd;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        self.session_list = QListWidget()
+        self.session_list.itemDoubleClicked.connect(self.switch_session)
+        layout.addWidget(self.session_list)
+        
+        button_layout = QHBoxLayout()
+        switch_btn = QPushButton('Switch')
+        switch_btn.clicked.connect(self.switch_session)
+        button_layout.addWidget(switch_btn)
+        delete_btn = QPushButton('🗑️ Delete')
+        delete_btn.clicked.connect(self.delete_session)
+        button_layout.addWidget(delete_btn)
+        button_layout.addStretch()
+        close_btn = QPushButton('Close')
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        self.refresh()
+    
+    def refresh(self):
+        current = self.browser.settings_manager.get('session_name')
+        self.session_list.clear()
+        for session in self.browser.session_manager.list_sessions():
+            marker = '●' if session['name'] == current else '○'
+            saved_at = session['saved_at'][:16].replace('T', ' ')
+            item = QListWidgetItem(f"{marker} {session['name']} — {session['tabs']} tabs · saved {saved_at}")
+            item.setData(Qt.ItemDataRole.UserRole, session['name'])
+            self.session_list.addItem(item)
+    
+    def selected_name(self):
+        item = self.session_list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+    
+    def switch_session(self, *_):
+        name = self.selected_name()
+        if name and self.browser.switch_session(name):
+            self.close()
+    
+    def delete_session(self):
+        name = self.selected_name()
+        if not name:
+            return
+        reply = QMessageBox.question(self, 'Delete Session', f"Delete the session '{name}'?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.browser.session_manager.delete_named_session(name)
+            if self.browser.settings_manager.get('session_name') == name:
+                self.browser.settings_manager.set('session_name', '')
+            self.refresh()
+
+
+class TaskManagerDialog(QDialog):
+    """Live CPU and memory of the browser process and each tab's renderer.
+
+    Every interval the distinct renderer pids are sampled together, so
+    tabs sharing a renderer cost one read and show the same numbers.
+    """
+
+    COLUMNS = ('Task', 'PID', 'CPU %', 'Memory (MB)', 'State')
+
+    def __init__(self, browser_window, interval=1000, parent=None):
+        super().__init__(parent or browser_window)
+        self.browser_window = browser_window
+        self.sampler = ProcessSampler()
+        self.setWindowTitle('🗂 Task Manager')
+        self.setGeometry(100, 100, 760, 480)
+        
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #f8f9fa;
+            }
+            QTableWidget {
+                background-color: #ffffff;
+                border: 2px solid #e0e0e0;
+                border-radius: 8px;
+                font-size: 13px;
+            }
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 10px 20px;
+                font-weight: bold;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #357abd;
+            }
+            QPushButton#endBtn {
+                background-color: #e74c3c;
+            }
+            QPushButton#endBtn:hover {
+                background-color: #c0392b;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+        layout.addWidget(self.table)
         
         button_layout = QHBoxLayout()
-        button_layout.setSpacing(10)
-        
         button_layout.addStretch()
-        
-        cancel_btn = QPushButton('✗ Cancel')
-        cancel_btn.clicked.connect(self.close)
-        button_layout.addWidget(cancel_btn)
-        
-        save_btn = QPushButton('💾 Save Settings')
-        save_btn.setObjectName('saveBtn')
-        save_btn.clicked.connect(self.save_settings)
-        button_layout.addWidget(save_btn)
-        
+        discard_btn = QPushButton('💤 Discard Tab')
+        discard_btn.clicked.connect(self.discard_selected)
+        button_layout.addWidget(discard_btn)
+        end_btn = QPushButton('⛔ End Process')
+        end_btn.setObjectName('endBtn')
+        end_btn.clicked.connect(self.end_selected)
+        button_layout.addWidget(end_btn)
+        close_btn = QPushButton('Close')
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
         layout.addLayout(button_layout)
+        
         self.setLayout(layout)
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(interval)
+        self.refresh()
     
-    def browse_download_path(self):
-        path = QFileDialog.getExistingDirectory(self, 'Select Download Directory')
-        if path:
-            self.download_input.setText(path)
+    def tasks(self):
+        """(label, pid, tab) for the browser process and every loaded tab"""
+        tasks = [('🌐 Browser', os.getpid(), None)]
+        tabs = self.browser_window.tabs
+        for i in range(tabs.count()):
+            tab = tabs.widget(i)
+            if isinstance(tab, BrowserTab):
+                tasks.append((f'📄 {tabs.tabText(i)}', tab.page().renderProcessPid(), tab))
+        return tasks
     
-    def save_settings(self):
-        self.settings_manager.set('homepage', self.homepage_input.text())
-        self.settings_manager.set('search_engine', self.search_combo.currentData())
-        self.settings_manager.set('download_path', self.download_input.text())
-        QMessageBox.information(self, 'Settings Saved', 'Your settings have been saved successfully!')
-        self.close()
+    def refresh(self):
+        tasks = self.tasks()
+        samples = self.sampler.sample(pid for _, pid, _ in tasks)
+        lifecycle = self.browser_window.tab_lifecycle
+        selected = self.selected_task()
+        
+        # Sorting while rows are being filled would shuffle them midway
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(tasks))
+        for row, (label, pid, tab) in enumerate(tasks):
+            sample = samples.get(pid, {'cpu_percent': 0.0, 'rss_bytes': 0})
+            state = 'Running' if tab is None else lifecycle.state_name(tab)
+            values = (label, pid if pid > 0 else 0, round(sample['cpu_percent'], 1),
+                      round(sample['rss_bytes'] / 1048576, 1), state)
+            for column, value in enumerate(values):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                item.setData(Qt.ItemDataRole.UserRole, row)
+                self.table.setItem(row, column, item)
+        self.rows = tasks
+        self.table.setSortingEnabled(True)
+        
+        if selected is not None:
+            for row in range(self.table.rowCount()):
+                if self.rows[self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)] == selected:
+                    self.table.selectRow(row)
+                    break
+    
+    def selected_task(self):
+        items = self.table.selectedItems()
+        if not items or not hasattr(self, 'rows'):
+            return None
+        return self.rows[items[0].data(Qt.ItemDataRole.UserRole)]
+    
+    def discard_selected(self):
+        task = self.selected_task()
+        if task is None or task[2] is None:
+            return
+        if task[2] is self.browser_window.tabs.currentWidget():
+            QMessageBox.information(self, 'Discard Tab', 'The current tab cannot be discarded. Switch to another tab first.')
+            return
+        self.browser_window.tab_lifecycle.discard(task[2])
+        self.refresh()
+    
+    def end_selected(self):
+        task = self.selected_task()
+        if task is None or task[1] <= 0:
+            return
+        label, pid, tab = task
+        if tab is None:
+            QMessageBox.information(self, 'End Process', 'Close the window to end the browser process.')
+            return
+        sharing = [other for other_label, other_pid, other in self.rows if other_pid == pid and other is not None]
+        reply = QMessageBox.question(self, 'End Process',
+                                     f'End renderer process {pid}? {len(sharing)} tab(s) using it will stop '
+                                     f'until reloaded.',
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError as e:
+                QMessageBox.warning(self, 'End Process', f'Could not end process {pid}: {str(e)}')
+            self.refresh()
 
 
 class AIChatPanel(QWidget):
@@ -2397,16 +5449,85 @@ class DevToolsPanel(QWidget):
             self.performance_display.setPlainText("Performance data not available")
 
 
+class StartupTrace:
+    """Startup phases as Chrome trace events, to open in chrome://tracing
+    or Perfetto. Times are time.perf_counter() values; the trace starts at
+    origin."""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.events = []
+        self._begun = {}
+    
+    def begin(self, name):
+        self._begun[name] = time.perf_counter()
+    
+    def end(self, name):
+        self.add(name, self._begun.pop(name), time.perf_counter())
+    
+    def add(self, name, start, end):
+        self.events.append({'name': name, 'cat': 'startup', 'ph': 'X', 'pid': os.getpid(),
+                            'tid': threading.get_native_id(), 'ts': round((start - self.origin) * 1e6),
+                            'dur': round((end - start) * 1e6)})
+    
+    def phases_ms(self):
+        """Total duration of each phase; a phase run in slices is summed"""
+        phases = {}
+        for event in self.events:
+            phases[event['name']] = phases.get(event['name'], 0) + event['dur'] / 1000
+        return phases
+    
+    def total_ms(self):
+        """From the origin to the end of the last phase"""
+        return max((event['ts'] + event['dur'] for event in self.events), default=0) / 1000
+    
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': sorted(self.events, key=lambda event: event['ts']),
+                       'displayTimeUnit': 'ms'}, f, indent=1)
+
+
 class Browser(QMainWindow):
-    def __init__(self):
+    # Emitted once the window has painted and the session is restored
+    startup_finished = pyqtSignal()
+    RESTORE_SLICE = 20  # background tabs restored per event-loop turn
+    
+    def __init__(self, trace=None):
         super().__init__()
+        self.started_at = time.perf_counter()
+        self.trace = trace or StartupTrace(self.started_at)
+        self.trace.begin('managers')
+        self.tab_metrics = {
+            'startup_ms': None,
+            'first_load_ms': None,
+            'restored_tabs': 0,
+            'materialized_tabs': 0,
+            'switch_ms': deque(maxlen=100),
+            'session_switch_ms': None,
+            'first_paint_ms': None,
+            'interactive_ms': None
+        }
         
         self.database = BrowserDatabase()
+        self.history_writer = HistoryWriter(self.database)
+        self.history_writer.start()
+        self.omnibox = OmniboxIndex()
+        self.omnibox.load_in_background(self.database)
         self.settings_manager = SettingsManager()
+        self.retention_job = HistoryRetentionJob(self.database, self.settings_manager)
+        self.retention_job.start()
+        self.preloader = SpeculativePreloader(int(self.settings_manager.get('preload_budget') or 0), parent=self)
+        self.ui_updates = UiUpdateScheduler(self.apply_tab_updates)
         self.session_manager = SessionManager()
+        self.session_journal = SessionJournal(self.session_manager, history_provider=self.tab_histories)
         self.theme_manager = ThemeManager()
         self.extension_manager = ExtensionManager()
-        self.download_manager = DownloadManager(self)
+        # Built on first use by the properties below
+        self._download_manager = None
+        self._ai_panel = None
+        self._devtools_panel = None
+        self.trace.end('managers')
+        self.trace.begin('widgets')
         
         self.setWindowTitle('Modern Web Browser')
         self.setGeometry(100, 100, 1200, 800)
@@ -2415,151 +5536,34 @@ class Browser(QMainWindow):
         current_theme = self.settings_manager.get('theme')
         self.apply_theme(current_theme)
         
-        # Old stylesheet - will be replaced by apply_theme
-        old_stylesheet = """
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            QToolBar {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #ffffff, stop:1 #f0f0f0);
-                border: none;
-                border-bottom: 1px solid #d0d0d0;
-                spacing: 8px;
-                padding: 8px;
-            }
-            QLineEdit {
-                border: 2px solid #e0e0e0;
-                border-radius: 20px;
-                padding: 8px 16px;
-                background-color: #ffffff;
-                font-size: 13px;
-                selection-background-color: #4a90e2;
-            }
-            QLineEdit:focus {
-                border: 2px solid #4a90e2;
-                background-color: #ffffff;
-            }
-            QPushButton {
-                background-color: #4a90e2;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: bold;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #357abd;
-            }
-            QPushButton:pressed {
-                background-color: #2868a8;
-            }
-            QTabWidget::pane {
-                border: none;
-                background-color: #ffffff;
-            }
-            QTabBar::tab {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #f0f0f0, stop:1 #e0e0e0);
-                border: 1px solid #d0d0d0;
-                border-bottom: none;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-                padding: 8px 16px;
-                margin-right: 2px;
-                min-width: 120px;
-            }
-            QTabBar::tab:selected {
-                background: #ffffff;
-                border-bottom: 2px solid #4a90e2;
-            }
-            QTabBar::tab:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #ffffff, stop:1 #f0f0f0);
-            }
-            QMenuBar {
-                background-color: #ffffff;
-                border-bottom: 1px solid #e0e0e0;
-                padding: 4px;
-            }
-            QMenuBar::item {
-                padding: 6px 12px;
-                border-radius: 4px;
-            }
-            QMenuBar::item:selected {
-                background-color: #4a90e2;
-                color: white;
-            }
-            QMenu {
-                background-color: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 6px;
-                padding: 4px;
-            }
-            QMenu::item {
-                padding: 8px 24px;
-                border-radius: 4px;
-            }
-            QMenu::item:selected {
-                background-color: #4a90e2;
-                color: white;
-            }
-            QToolBar QToolButton {
-                background-color: transparent;
-                border: none;
-                border-radius: 6px;
-                padding: 6px;
-                font-size: 18px;
-                font-weight: bold;
-                color: #333333;
-            }
-            QToolBar QToolButton:hover {
-                background-color: #e8f4fd;
-                color: #4a90e2;
-            }
-            QToolBar QToolButton:pressed {
-                background-color: #d0e8f7;
-            }
-        """
-        
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
-        self.tabs.currentChanged.connect(self.update_url_bar)
-        
-        # Tab pinning support
-        self.pinned_tabs = set()  # Store indices of pinned tabs
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        self.tabs.tabBar().tabMoved.connect(self.on_tab_moved)
+        
+        # Pins, lifecycle state and activity follow each tab by id, so
+        # closing or dragging tabs never leaves them on the wrong one
+        self.tab_registry = TabRegistry()
+        self.tab_switcher_index = TabSwitcherIndex()
+        self.tab_lifecycle = TabLifecycleManager(self.tabs, self.settings_manager, self.tab_registry, parent=self)
         self.tabs.tabBar().setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tabs.tabBar().customContextMenuRequested.connect(self.show_tab_context_menu)
         
-        # Create AI Chat side panel
-        self.ai_panel = AIChatPanel(self)
-        self.ai_panel.setMinimumWidth(300)
-        self.ai_panel.setMaximumWidth(500)
-        
-        # Create Developer Tools panel
-        self.devtools_panel = DevToolsPanel(self)
-        self.devtools_panel.setMinimumHeight(200)
-        
-        # Create vertical splitter for main content and devtools
+        # Create vertical splitter for main content and devtools; the
+        # panels join the splitters when they are first opened
         self.vertical_splitter = QSplitter(Qt.Orientation.Vertical)
         self.vertical_splitter.addWidget(self.tabs)
-        self.vertical_splitter.addWidget(self.devtools_panel)
         self.vertical_splitter.setStretchFactor(0, 3)  # Main content
-        self.vertical_splitter.setStretchFactor(1, 1)  # DevTools
         
         # Create horizontal splitter for content and AI panel
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
         self.splitter.addWidget(self.vertical_splitter)
-        self.splitter.addWidget(self.ai_panel)
         self.splitter.setStretchFactor(0, 3)  # Main content gets more space
-        self.splitter.setStretchFactor(1, 1)  # Side panel gets less space
         
         # Initially hide panels
-        self.ai_panel.hide()
         self.ai_panel_visible = False
-        self.devtools_panel.hide()
         self.devtools_visible = False
         
         self.setCentralWidget(self.splitter)
@@ -2571,17 +5575,17 @@ class Browser(QMainWindow):
         
         back_btn = QAction('◀', self)
         back_btn.setToolTip('Back')
-        back_btn.triggered.connect(lambda: self.current_browser().back())
+        back_btn.triggered.connect(lambda: self.browser_action(BrowserTab.back))
         navbar.addAction(back_btn)
         
         forward_btn = QAction('▶', self)
         forward_btn.setToolTip('Forward')
-        forward_btn.triggered.connect(lambda: self.current_browser().forward())
+        forward_btn.triggered.connect(lambda: self.browser_action(BrowserTab.forward))
         navbar.addAction(forward_btn)
         
         reload_btn = QAction('↻', self)
         reload_btn.setToolTip('Reload')
-        reload_btn.triggered.connect(lambda: self.current_browser().reload())
+        reload_btn.triggered.connect(lambda: self.browser_action(BrowserTab.reload))
         navbar.addAction(reload_btn)
         
         home_btn = QAction('🏠', self)
@@ -2594,8 +5598,21 @@ class Browser(QMainWindow):
         self.url_bar = QLineEdit()
         self.url_bar.setPlaceholderText('🔍 Search or enter website address...')
         self.url_bar.returnPressed.connect(self.navigate_to_url)
+        self.url_bar.textEdited.connect(self.update_suggestions)
         navbar.addWidget(self.url_bar)
         
+        # Suggestions come ranked from the omnibox index, so the completer
+        # only shows them and must not filter them again.
+        self.suggestion_model = QStandardItemModel(self)
+        self.opened_suggestion = None
+        self.typed_text = ''
+        self.inline_completion = None
+        self.completer = QCompleter(self.suggestion_model, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(8)
+        self.completer.setWidget(self.url_bar)
+        self.completer.activated[QModelIndex].connect(self.open_suggestion)
+        
         navbar.addSeparator()
         
         new_tab_btn = QAction('➕', self)
@@ -2603,10 +5620,10 @@ class Browser(QMainWindow):
         new_tab_btn.triggered.connect(lambda: self.add_new_tab(QUrl(self.settings_manager.get('homepage')), 'New Tab'))
         navbar.addAction(new_tab_btn)
         
-        bookmark_add_btn = QAction('⭐', self)
-        bookmark_add_btn.setToolTip('Bookmark this page')
-        bookmark_add_btn.triggered.connect(self.add_bookmark)
-        navbar.addAction(bookmark_add_btn)
+        self.bookmark_btn = QAction('☆', self)
+        self.bookmark_btn.setToolTip('Bookmark this page')
+        self.bookmark_btn.triggered.connect(self.add_bookmark)
+        navbar.addAction(self.bookmark_btn)
         
         navbar.addSeparator()
         
@@ -2620,9 +5637,33 @@ class Browser(QMainWindow):
         devtools_btn.triggered.connect(self.toggle_devtools)
         navbar.addAction(devtools_btn)
         
+        # Menu contents are filled in once the window is up; the menu bar
+        # is created now so the layout does not shift
         menu_bar = self.menuBar()
+        self.menus = {title: menu_bar.addMenu(title) for title in ('File', 'Bookmarks', 'History', 'Tools')}
         
-        file_menu = menu_bar.addMenu('File')
+        QWebEngineProfile.defaultProfile().downloadRequested.connect(self.on_download_requested)
+        
+        self.trace.end('widgets')
+        
+        # The window paints with just its chrome; the rest runs on the
+        # event loop afterwards, one stage per turn. Extensions come before
+        # the first tab loads so their scripts run on it.
+        self.startup_tasks = IdleTaskQueue(self.trace, finished=self.on_startup_tasks_finished)
+        self.startup_tasks.add('menus', self.populate_menus)
+        self.startup_tasks.add('extensions', self.load_extensions)
+        self.startup_tasks.add('session restore', self.restore_session)
+        self.pending_restore = None
+        
+        self.shown_at = time.perf_counter()
+        self.show()
+        self.tab_metrics['startup_ms'] = (time.perf_counter() - self.started_at) * 1000
+        # Normally started by the first paint; this covers a window that
+        # is never painted, e.g. one shown minimized
+        QTimer.singleShot(250, self.startup_tasks.start)
+    
+    def populate_menus(self):
+        file_menu = self.menus['File']
         
         new_tab_action = QAction('New Tab', self)
         new_tab_action.setShortcut(QKeySequence('Ctrl+T'))
@@ -2634,6 +5675,32 @@ class Browser(QMainWindow):
         close_tab_action.triggered.connect(lambda: self.close_tab(self.tabs.currentIndex()))
         file_menu.addAction(close_tab_action)
         
+        switch_tab_action = QAction('🔎 Switch to Tab...', self)
+        switch_tab_action.setShortcut(QKeySequence('Ctrl+K'))
+        switch_tab_action.triggered.connect(self.show_tab_switcher)
+        file_menu.addAction(switch_tab_action)
+        
+        file_menu.addSeparator()
+        
+        save_session_action = QAction('💾 Save Session As...', self)
+        save_session_action.triggered.connect(self.save_session_as)
+        file_menu.addAction(save_session_action)
+        
+        sessions_action = QAction('📚 Sessions...', self)
+        sessions_action.setShortcut(QKeySequence('Ctrl+Shift+S'))
+        sessions_action.triggered.connect(self.show_sessions)
+        file_menu.addAction(sessions_action)
+        
+        file_menu.addSeparator()
+        
+        import_action = QAction('📥 Import History/Bookmarks...', self)
+        import_action.triggered.connect(lambda: self.transfer_data('import'))
+        file_menu.addAction(import_action)
+        
+        export_action = QAction('📤 Export History/Bookmarks...', self)
+        export_action.triggered.connect(lambda: self.transfer_data('export'))
+        file_menu.addAction(export_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction('Exit', self)
@@ -2641,7 +5708,7 @@ class Browser(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
         
-        bookmarks_menu = menu_bar.addMenu('Bookmarks')
+        bookmarks_menu = self.menus['Bookmarks']
         
         add_bookmark_action = QAction('Add Bookmark', self)
         add_bookmark_action.setShortcut(QKeySequence('Ctrl+D'))
@@ -2653,7 +5720,7 @@ class Browser(QMainWindow):
         view_bookmarks_action.triggered.connect(self.view_bookmarks)
         bookmarks_menu.addAction(view_bookmarks_action)
         
-        history_menu = menu_bar.addMenu('History')
+        history_menu = self.menus['History']
         
         view_history_action = QAction('View History', self)
         view_history_action.setShortcut(QKeySequence('Ctrl+H'))
@@ -2664,7 +5731,7 @@ class Browser(QMainWindow):
         clear_history_action.triggered.connect(self.clear_history)
         history_menu.addAction(clear_history_action)
         
-        tools_menu = menu_bar.addMenu('Tools')
+        tools_menu = self.menus['Tools']
         
         devtools_action = QAction('🔧 Developer Tools', self)
         devtools_action.setShortcut(QKeySequence('F12'))
@@ -2695,57 +5762,203 @@ class Browser(QMainWindow):
         extensions_action.triggered.connect(self.show_extensions)
         tools_menu.addAction(extensions_action)
         
+        tab_memory_action = QAction('📊 Tab Memory', self)
+        tab_memory_action.triggered.connect(self.show_tab_memory)
+        tools_menu.addAction(tab_memory_action)
+        
+        task_manager_action = QAction('🗂 Task Manager', self)
+        task_manager_action.setShortcut(QKeySequence('Shift+Esc'))
+        task_manager_action.triggered.connect(self.show_task_manager)
+        tools_menu.addAction(task_manager_action)
+        
         tools_menu.addSeparator()
         
         settings_action = QAction('Settings', self)
         settings_action.triggered.connect(self.show_settings)
         tools_menu.addAction(settings_action)
-        
-        QWebEngineProfile.defaultProfile().downloadRequested.connect(self.on_download_requested)
-        
-        # Load extensions
-        self.load_extensions()
-        
-        # Restore previous session or open homepage
-        self.restore_session()
-        
-        self.show()
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.tab_metrics['first_paint_ms'] is None:
+            now = time.perf_counter()
+            self.tab_metrics['first_paint_ms'] = (now - self.started_at) * 1000
+            self.trace.add('first paint', self.shown_at, now)
+            self.startup_tasks.start()
+            self.finish_startup()
+    
+    def on_startup_tasks_finished(self):
+        if self.tab_metrics['interactive_ms'] is None:
+            now = time.perf_counter()
+            self.tab_metrics['interactive_ms'] = (now - self.started_at) * 1000
+            self.trace.add('time to interactive', self.trace.origin, now)
+            self.finish_startup()
+    
+    def finish_startup(self):
+        if self.tab_metrics['first_paint_ms'] is not None and self.tab_metrics['interactive_ms'] is not None:
+            self.startup_finished.emit()
+    
+    @property
+    def download_manager(self):
+        if self._download_manager is None:
+            start = time.perf_counter()
+            self._download_manager = DownloadManager(self)
+            self.trace.add('download manager', start, time.perf_counter())
+        return self._download_manager
+    
+    @property
+    def ai_panel(self):
+        """The AI chat side panel, built when first opened; building it
+        imports ai_providers and reads their config"""
+        if self._ai_panel is None:
+            start = time.perf_counter()
+            self._ai_panel = AIChatPanel(self)
+            self._ai_panel.setMinimumWidth(300)
+            self._ai_panel.setMaximumWidth(500)
+            self._ai_panel.hide()
+            self.splitter.addWidget(self._ai_panel)
+            self.splitter.setStretchFactor(1, 1)  # Side panel gets less space
+            self.trace.add('ai panel', start, time.perf_counter())
+        return self._ai_panel
+    
+    @property
+    def devtools_panel(self):
+        if self._devtools_panel is None:
+            start = time.perf_counter()
+            self._devtools_panel = DevToolsPanel(self)
+            self._devtools_panel.setMinimumHeight(200)
+            self._devtools_panel.hide()
+            self.vertical_splitter.addWidget(self._devtools_panel)
+            self.vertical_splitter.setStretchFactor(1, 1)  # DevTools
+            self.trace.add('devtools', start, time.perf_counter())
+        return self._devtools_panel
     
     def current_browser(self):
         return self.tabs.currentWidget()
     
+    def browser_action(self, action):
+        """Run action on the current tab; the window is up before the
+        session restore gives it one"""
+        browser = self.current_browser()
+        if browser is not None:
+            action(browser)
+    
     def add_new_tab(self, qurl=None, label='New Tab'):
         if qurl is None:
             qurl = QUrl(self.settings_manager.get('homepage'))
         
-        browser = BrowserTab(self)
+        browser = self.create_browser()
+        tab_id = self.tab_registry.add(browser)
+        self.tab_switcher_index.set(tab_id, label, qurl.toString())
         i = self.tabs.addTab(browser, label)
+        self.session_journal.opened(tab_id, qurl.toString(), label, i)
         self.tabs.setCurrentIndex(i)
+        browser.start_url = qurl
+        browser.setUrl(qurl)
         
+        return browser
+    
+    def create_browser(self):
+        browser = BrowserTab(self)
         browser.urlChanged.connect(lambda qurl, browser=browser: self.update_url(qurl, browser))
         browser.loadFinished.connect(lambda _, browser=browser: self.update_title(browser))
-        browser.loadProgress.connect(lambda progress: self.update_load_progress(progress))
-        
-        browser.setUrl(qurl)
-        
+        browser.loadProgress.connect(lambda progress, browser=browser: self.update_load_progress(progress, browser))
         return browser
     
+    def add_placeholder_tab(self, url, title, pinned=False, history=None, position=-1):
+        placeholder = TabPlaceholder(url, title, self, history)
+        tab_id = self.tab_registry.add(placeholder, 'Not loaded', pinned)
+        self.tab_switcher_index.set(tab_id, title, url)
+        # Out-of-range positions append
+        index = self.tabs.insertTab(position, placeholder, f'📌 {title}' if pinned else title)
+        self.session_journal.opened(tab_id, url, title, index, pinned)
+        if pinned:
+            self.tabs.tabBar().setTabButton(index, self.tabs.tabBar().ButtonPosition.RightSide, None)
+        return index
+    
+    def materialize_tab(self, index):
+        """Swap the placeholder at index for a real BrowserTab and start
+        loading it; returns the tab's BrowserTab"""
+        placeholder = self.tabs.widget(index)
+        if not isinstance(placeholder, TabPlaceholder):
+            return placeholder
+        
+        browser = self.create_browser()
+        label = self.tabs.tabText(index)
+        current = self.tabs.currentIndex()
+        # Swapping the page widget must not look like a tab switch
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, browser, label)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        self.tab_registry.replace(placeholder, browser)
+        if self.tab_registry.is_pinned(browser):
+            self.tabs.tabBar().setTabButton(index, self.tabs.tabBar().ButtonPosition.RightSide, None)
+        
+        if not (placeholder.history and self.restore_tab_history(browser, placeholder.history)):
+            browser.setUrl(placeholder.url())
+        placeholder.deleteLater()
+        self.tab_metrics['materialized_tabs'] += 1
+        return browser
+    
+    def restore_tab_history(self, browser, packed):
+        try:
+            return browser.restore_history_state(SessionManager.unpack_history(packed))
+        except zlib.error:
+            return False
+    
+    def tab_histories(self):
+        """Packed back/forward history of every tab by tab id; placeholders
+        pass on the history they were restored with"""
+        histories = {}
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if isinstance(tab, BrowserTab):
+                packed = SessionManager.pack_history(tab.history_state())
+            else:
+                packed = tab.history
+            if packed:
+                histories[self.tab_registry.id_of(tab)] = packed
+        return histories
+    
+    def on_tab_changed(self, index):
+        start = time.perf_counter()
+        if index >= 0:
+            self.tab_lifecycle.touch(self.materialize_tab(index))
+            self.session_journal.activated(self.tab_registry.id_of(self.tabs.widget(index)))
+        self.update_url_bar()
+        self.tab_metrics['switch_ms'].append((time.perf_counter() - start) * 1000)
+    
     def close_tab(self, i):
         # Don't close pinned tabs
-        if i in self.pinned_tabs:
+        if self.tab_registry.is_pinned(self.tabs.widget(i)):
             QMessageBox.information(self, 'Pinned Tab', 'Cannot close a pinned tab. Unpin it first!')
             return
         
         if self.tabs.count() > 1:
-            self.tabs.removeTab(i)
-            # Update pinned tabs indices after removal
-            self.pinned_tabs = {idx if idx < i else idx - 1 for idx in self.pinned_tabs}
+            self.remove_tab(i)
         else:
             self.close()
     
+    def remove_tab(self, i):
+        """Close the tab at i and free its page"""
+        widget = self.tabs.widget(i)
+        self.tabs.removeTab(i)
+        tab_id = self.tab_registry.remove(widget)
+        self.tab_switcher_index.remove(tab_id)
+        self.session_journal.closed(tab_id)
+        self.ui_updates.forget(widget)
+        # removeTab only hides the widget; its renderer would keep running
+        widget.deleteLater()
+    
     def navigate_to_url(self, url=None):
         if url is None:
             url = self.url_bar.text()
+            # Enter on a suggestion reaches here after open_suggestion ran
+            if url == self.opened_suggestion:
+                return
+            if self.inline_completion and url == self.inline_completion[0]:
+                url = self.inline_completion[1]
         else:
             if isinstance(url, str):
                 self.url_bar.setText(url)
@@ -2757,46 +5970,139 @@ class Browser(QMainWindow):
                 search_engine = self.settings_manager.get('search_engine')
                 url = search_engine + url.replace(' ', '+')
         
-        self.current_browser().setUrl(QUrl(url))
+        self.typed_text = ''
+        browser = self.current_browser()
+        if browser is None:
+            # Entered before the session restore ran; it opens the tab to use
+            self.startup_tasks.flush()
+            browser = self.current_browser()
+        page = self.preloader.take(url, browser)
+        if page is None:
+            browser.setUrl(QUrl(url))
+        else:
+            # The view only deletes pages it owns, so hand this one over
+            page.setParent(browser)
+            browser.setPage(page)
+            self.update_title(browser)
+    
+    def update_suggestions(self, text):
+        self.suggestion_model.clear()
+        for url, title, bookmarked in self.omnibox.complete(text):
+            item = QStandardItem(f"{'⭐' if bookmarked else '🕘'} {title}  —  {url}")
+            item.setData(url, Qt.ItemDataRole.UserRole)
+            self.suggestion_model.appendRow(item)
+        
+        if self.suggestion_model.rowCount():
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+        
+        url = self.omnibox.preload_candidate(text)
+        if url:
+            # Only a new tab or one without history can take the page, see take()
+            browser = self.current_browser()
+            if browser is not None and not browser.has_history():
+                self.preloader.preload(url, browser.page().profile())
+            self.inline_complete(text, url)
+        self.typed_text = text
+    
+    def inline_complete(self, text, url):
+        """Fill in the rest of url's address after the typed text, selected,
+        so Enter opens the page being preloaded"""
+        # Deleting characters must not bring the completion straight back
+        if self.typed_text.startswith(text) or self.url_bar.cursorPosition() != len(text):
+            return
+        address = OmniboxIndex.ADDRESS_PREFIX_RE.sub('', url)
+        typed = OmniboxIndex.ADDRESS_PREFIX_RE.sub('', text.lower())
+        if not address.lower().startswith(typed):
+            return
+        completed = text + address[len(typed):]
+        self.url_bar.setText(completed)
+        self.url_bar.setSelection(len(text), len(completed) - len(text))
+        self.inline_completion = (completed, url)
+    
+    def open_suggestion(self, index):
+        url = index.data(Qt.ItemDataRole.UserRole)
+        self.opened_suggestion = url
+        QTimer.singleShot(0, lambda: setattr(self, 'opened_suggestion', None))
+        self.navigate_to_url(url)
     
     def navigate_home(self):
         self.navigate_to_url(self.settings_manager.get('homepage'))
     
     def update_url(self, qurl, browser=None):
+        tab_id = self.tab_registry.id_of(browser)
+        self.tab_switcher_index.set(tab_id, url=qurl.toString())
+        self.session_journal.navigated(tab_id, qurl.toString())
         if browser != self.current_browser():
             return
         
-        self.url_bar.setText(qurl.toString())
-        
         title = browser.page().title()
         url = qurl.toString()
+        self.ui_updates.mark(browser, 'url', url)
         
         if url and url != 'about:blank':
-            self.database.add_history(title if title else url, url)
+            self.history_writer.add(title if title else url, url)
+            self.omnibox.record_visit(title if title else url, url)
     
     def update_title(self, browser):
-        if browser != self.current_browser():
-            return
+        if browser == self.current_browser() and self.tab_metrics['first_load_ms'] is None:
+            self.tab_metrics['first_load_ms'] = (time.perf_counter() - self.started_at) * 1000
         
         title = browser.page().title()
+        if title:
+            self.omnibox.set_title(browser.url().toString(), title)
+        tab_id = self.tab_registry.id_of(browser)
+        self.tab_switcher_index.set(tab_id, title)
+        if title:
+            self.session_journal.retitled(tab_id, title)
+        self.ui_updates.mark(browser, 'title', title)
+    
+    def apply_tab_updates(self, browser, changes):
+        """Show the latest changes of one tab; returns how many were skipped
+        because the tab is in the background"""
         i = self.tabs.indexOf(browser)
-        
-        if len(title) > 20:
-            title = title[:20] + '...'
-        
-        self.tabs.setTabText(i, title if title else 'New Tab')
+        if i < 0:
+            return len(changes)
+        current = i == self.tabs.currentIndex()
+        hidden = 0
+        for kind, value in changes.items():
+            if kind == 'title':
+                # Tab labels are always on screen
+                title = value[:20] + '...' if len(value) > 20 else value
+                if self.tab_registry.is_pinned(browser):
+                    title = f'📌 {title}'
+                self.tabs.setTabText(i, title if value else 'New Tab')
+            elif not current:
+                hidden += 1
+            elif kind == 'url':
+                self.url_bar.setText(value)
+                self.update_bookmark_star(value)
+            elif kind == 'progress':
+                if value < 100:
+                    self.setWindowTitle(f'Loading ({value}%) - Modern Web Browser')
+                else:
+                    self.setWindowTitle('Modern Web Browser')
+        return hidden
     
     def update_url_bar(self):
         browser = self.current_browser()
         if browser:
             qurl = browser.url()
+            self.typed_text = ''
             self.url_bar.setText(qurl.toString())
+            self.update_bookmark_star(qurl.toString())
     
-    def update_load_progress(self, progress):
-        if progress < 100:
-            self.setWindowTitle(f'Loading ({progress}%) - Modern Web Browser')
+    def update_bookmark_star(self, url):
+        if url and self.database.is_bookmarked(url):
+            self.bookmark_btn.setText('⭐')
+            self.bookmark_btn.setToolTip('This page is bookmarked')
         else:
-            self.setWindowTitle('Modern Web Browser')
+            self.bookmark_btn.setText('☆')
+            self.bookmark_btn.setToolTip('Bookmark this page')
+    
+    def update_load_progress(self, progress, browser=None):
+        self.ui_updates.mark(browser or self.current_browser(), 'progress', progress)
     
     def add_bookmark(self):
         browser = self.current_browser()
@@ -2805,30 +6111,109 @@ class Browser(QMainWindow):
             url = browser.url().toString()
             
             if url and url != 'about:blank':
-                self.database.add_bookmark(title if title else url, url)
+                if self.database.add_bookmark(title if title else url, url) is None:
+                    QMessageBox.information(self, 'Already Bookmarked', f'Page "{title}" is already in your bookmarks.')
+                    return
+                self.omnibox.add_bookmark(title if title else url, url)
+                self.update_bookmark_star(url)
                 QMessageBox.information(self, 'Bookmark Added', f'Page "{title}" has been bookmarked!')
     
+    def transfer_data(self, direction):
+        """Import or export history/bookmarks in the background with progress"""
+        kind, ok = QInputDialog.getItem(self, f'{direction.title()} Data', 'What would you like to transfer?',
+                                        ['Bookmarks', 'History'], 0, False)
+        if not ok:
+            return
+        kind = kind.lower()
+        file_filter = 'JSON Lines (*.jsonl *.ndjson);;CSV Files (*.csv)'
+        if kind == 'bookmarks':
+            file_filter = 'Bookmark HTML (*.html *.htm);;' + file_filter
+        
+        if direction == 'import':
+            path, _ = QFileDialog.getOpenFileName(self, f'Import {kind.title()}', '', file_filter)
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, f'Export {kind.title()}', '', file_filter)
+        if not path:
+            return
+        
+        if direction == 'import' and kind == 'history':
+            self.history_writer.flush(timeout=1.0)
+        
+        progress_dialog = QProgressDialog(f'{direction.title()}ing {kind}...', 'Cancel', 0, 100, self)
+        progress_dialog.setWindowTitle(f'{direction.title()} {kind.title()}')
+        progress_dialog.setMinimumDuration(300)
+        
+        worker = DataTransferWorker(self.database, direction, path, kind, self)
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.progress.connect(lambda percent, count: (
+            progress_dialog.setValue(percent),
+            progress_dialog.setLabelText(f'{direction.title()}ing {kind}... {count:,} records')))
+        
+        def on_completed(stats):
+            progress_dialog.reset()
+            count = stats.get('imported', stats.get('exported', 0))
+            message = f'{count:,} {kind} records {direction}ed.'
+            if stats.get('skipped'):
+                message += f" {stats['skipped']:,} skipped."
+            if stats.get('cancelled'):
+                message += ' The transfer was cancelled.'
+            if direction == 'import':
+                self.omnibox.load_in_background(self.database)
+            self.update_url_bar()
+            QMessageBox.information(self, f'{direction.title()} Finished', message)
+        
+        def on_failed(error):
+            progress_dialog.reset()
+            QMessageBox.critical(self, f'{direction.title()} Failed', f'Could not {direction} {kind}: {error}')
+        
+        worker.completed.connect(on_completed)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+    
     def view_bookmarks(self):
         dialog = BookmarkDialog(self.database, self)
         dialog.exec()
+        self.omnibox.sync_bookmarks(self.database.is_bookmarked)
+        self.update_url_bar()
     
     def view_history(self):
+        self.history_writer.flush(timeout=1.0)
         dialog = HistoryDialog(self.database, self)
         dialog.exec()
+        if dialog.cleared:
+            self.omnibox.load_in_background(self.database)
     
     def clear_history(self):
         reply = QMessageBox.question(self, 'Clear History',
                                      'Are you sure you want to clear all browsing history?',
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
+            self.history_writer.flush(timeout=1.0)
             self.database.clear_history()
+            self.omnibox.load_in_background(self.database)
             QMessageBox.information(self, 'History Cleared', 'All browsing history has been cleared!')
     
     def show_downloads(self):
         self.download_manager.show()
     
     def show_settings(self):
-        dialog = SettingsDialog(self.settings_manager, self)
+        dialog = SettingsDialog(self.settings_manager, self, self.retention_job)
+        dialog.exec()
+        self.preloader.budget = int(self.settings_manager.get('preload_budget') or 0)
+        if not self.preloader.budget:
+            self.preloader.cancel()
+    
+    def show_tab_memory(self):
+        dialog = TabMemoryDialog(self.tab_lifecycle, self)
+        dialog.exec()
+    
+    def show_tab_switcher(self):
+        dialog = TabSwitcherDialog(self)
+        dialog.exec()
+    
+    def show_task_manager(self):
+        dialog = TaskManagerDialog(self)
         dialog.exec()
     
     def on_download_requested(self, download):
@@ -2915,7 +6300,7 @@ class Browser(QMainWindow):
         """)
         
         # Pin/Unpin action
-        is_pinned = tab_index in self.pinned_tabs
+        is_pinned = self.tab_registry.is_pinned(self.tabs.widget(tab_index))
         pin_text = '📌 Unpin Tab' if is_pinned else '📍 Pin Tab'
         pin_action = menu.addAction(pin_text)
         pin_action.triggered.connect(lambda: self.toggle_pin_tab(tab_index))
@@ -2948,15 +6333,18 @@ class Browser(QMainWindow):
     
     def toggle_pin_tab(self, tab_index):
         """Pin or unpin a tab"""
-        if tab_index in self.pinned_tabs:
+        widget = self.tabs.widget(tab_index)
+        if self.tab_registry.is_pinned(widget):
             # Unpin the tab
-            self.pinned_tabs.remove(tab_index)
+            self.tab_registry.set_pinned(widget, False)
+            self.session_journal.pinned(self.tab_registry.id_of(widget), False)
             self.tabs.setTabText(tab_index, self.tabs.tabText(tab_index).replace('📌 ', ''))
             self.tabs.tabBar().setTabButton(tab_index, self.tabs.tabBar().ButtonPosition.RightSide, 
                                            self.tabs.tabBar().tabButton(tab_index, self.tabs.tabBar().ButtonPosition.RightSide))
         else:
             # Pin the tab
-            self.pinned_tabs.add(tab_index)
+            self.tab_registry.set_pinned(widget, True)
+            self.session_journal.pinned(self.tab_registry.id_of(widget), True)
             current_text = self.tabs.tabText(tab_index)
             if not current_text.startswith('📌 '):
                 self.tabs.setTabText(tab_index, f'📌 {current_text}')
@@ -2973,60 +6361,187 @@ class Browser(QMainWindow):
     def reload_tab(self, tab_index):
         """Reload a specific tab"""
         browser = self.tabs.widget(tab_index)
-        if browser:
+        # Placeholders load fresh when first shown anyway
+        if browser and not isinstance(browser, TabPlaceholder):
             browser.reload()
     
     def close_other_tabs(self, tab_index):
         """Close all tabs except the specified one"""
         # Close tabs from right to left to maintain indices
         for i in range(self.tabs.count() - 1, -1, -1):
-            if i != tab_index and i not in self.pinned_tabs:
-                self.tabs.removeTab(i)
+            if i != tab_index and not self.tab_registry.is_pinned(self.tabs.widget(i)):
+                self.remove_tab(i)
     
     def close_tabs_to_right(self, tab_index):
         """Close all tabs to the right of the specified tab"""
         for i in range(self.tabs.count() - 1, tab_index, -1):
-            if i not in self.pinned_tabs:
-                self.tabs.removeTab(i)
+            if not self.tab_registry.is_pinned(self.tabs.widget(i)):
+                self.remove_tab(i)
     
-    def save_session(self):
-        """Save current browser session"""
-        tabs_data = []
+    def session_tabs(self):
+        """(tab id, url, title, pinned) of every tab, left to right"""
+        tabs = []
         for i in range(self.tabs.count()):
             browser = self.tabs.widget(i)
             if browser:
                 url = browser.url().toString()
-                title = self.tabs.tabText(i).replace('📌 ', '')  # Remove pin icon from title
-                tabs_data.append({
-                    'url': url,
-                    'title': title,
-                    'index': i
-                })
-        
-        self.session_manager.save_session(tabs_data, self.pinned_tabs)
+                if isinstance(browser, TabPlaceholder):
+                    title = browser.title
+                else:
+                    # Remove pin icon from the label if the page has no title
+                    title = browser.page().title() or self.tabs.tabText(i).replace('📌 ', '')
+                tabs.append((self.tab_registry.id_of(browser), url, title, self.tab_registry.is_pinned(browser)))
+        return tabs
+    
+    def save_session(self):
+        """Save current browser session"""
+        # The full snapshot also empties the journal recorded since the last one
+        self.session_journal.start(self.session_tabs(), self.tabs.currentIndex())
+    
+    def on_tab_moved(self, from_index, to_index):
+        self.session_journal.moved(self.tab_registry.id_of(self.tabs.widget(to_index)), to_index)
     
     def restore_session(self):
-        """Restore previous browser session"""
-        session = self.session_manager.load_session()
-        
-        if session and session.get('tabs'):
-            # Restore tabs
-            for tab_data in session['tabs']:
-                url = tab_data.get('url', self.settings_manager.get('homepage'))
-                title = tab_data.get('title', 'New Tab')
-                
-                # Skip about:blank or empty URLs
-                if url and url != 'about:blank':
-                    self.add_new_tab(QUrl(url), title)
-            
-            # Restore pinned tabs
-            pinned_indices = session.get('pinned_tabs', [])
-            for idx in pinned_indices:
-                if idx < self.tabs.count():
-                    self.toggle_pin_tab(idx)
+        """Restore previous browser session: the active tab now, the others
+        a slice at a time on later event-loop turns"""
+        # The last snapshot plus every tab event journaled after it, so a
+        # crash loses no more than the last unsynced events
+        session = self.session_journal.load()
+        entries, current = self.session_entries(session) if session else ([], 0)
+        
+        if entries:
+            # Still compressed; each is only unpacked when its tab loads
+            by_id = self.session_journal.load_histories()
+            histories = {tab['index']: by_id[tab['id']] for tab in session['tabs'] if tab.get('id') in by_id}
+            index, url, title, pinned = entries[current]
+            self.tabs.blockSignals(True)
+            self.add_placeholder_tab(url, title, pinned, histories.get(index))
+            self.tabs.blockSignals(False)
+            self.on_tab_changed(0)
+            self.tab_metrics['restored_tabs'] = 1
+            self.pending_restore = {'before': deque(entries[:current]), 'after': deque(entries[current + 1:]),
+                                    'histories': histories, 'active': self.tab_registry.id_of(self.tabs.widget(0)),
+                                    'placed_before': 0, 'placed_after': 0}
+            self.startup_tasks.add('background tabs', self.restore_background_tabs)
         else:
             # No session found, open homepage
             self.add_new_tab(QUrl(self.settings_manager.get('homepage')), 'Home')
+        # Journal against the restored tabs, which got new ids. Until
+        # then the previous snapshot and journal stay as they were.
+        self.startup_tasks.add('journal', self.save_session)
+    
+    def restore_background_tabs(self):
+        """Open the next slice of restored tabs on either side of the
+        active one; returns True while some are left"""
+        pending = self.pending_restore
+        self.tabs.blockSignals(True)
+        for _ in range(self.RESTORE_SLICE):
+            if pending['before']:
+                index, url, title, pinned = pending['before'].popleft()
+                position = pending['placed_before']
+                pending['placed_before'] += 1
+            elif pending['after']:
+                index, url, title, pinned = pending['after'].popleft()
+                anchor = self.tabs.indexOf(self.tab_registry.widget(pending['active']))
+                position = anchor + 1 + pending['placed_after'] if anchor >= 0 else -1
+                pending['placed_after'] += 1
+            else:
+                break
+            self.add_placeholder_tab(url, title, pinned, pending['histories'].get(index), position)
+            self.tab_metrics['restored_tabs'] += 1
+        self.tabs.blockSignals(False)
+        if pending['before'] or pending['after']:
+            return True
+        self.pending_restore = None
+        return False
+    
+    def session_entries(self, session):
+        """(saved index, url, title, pinned) of each of the session's tabs
+        worth restoring, and the position of the active one among them"""
+        entries, current = [], 0
+        pinned_indices = set(session.get('pinned_tabs', []))
+        for tab_data in session.get('tabs', []):
+            url = tab_data.get('url', self.settings_manager.get('homepage'))
+            
+            # Skip about:blank or empty URLs
+            if url and url != 'about:blank':
+                if tab_data.get('index') == session.get('current_tab', 0):
+                    current = len(entries)
+                # Saved pins refer to the saved indices, which skipped
+                # tabs would otherwise shift
+                entries.append((tab_data.get('index'), url, tab_data.get('title', 'New Tab'),
+                                tab_data.get('index') in pinned_indices))
+        return entries, current
+    
+    def restore_tabs(self, session, histories):
+        """Open the session's tabs as placeholders and load only the active
+        one; the rest load when they are first switched to. histories maps
+        a saved tab index to its packed history."""
+        entries, current = self.session_entries(session)
+        self.tabs.blockSignals(True)
+        for index, url, title, pinned in entries:
+            self.add_placeholder_tab(url, title, pinned, histories.get(index))
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        
+        if self.tabs.count():
+            self.on_tab_changed(current)
+    
+    def save_named_session(self, name):
+        """Save the open tabs as the named session"""
+        self.startup_tasks.flush()
+        tabs = self.session_tabs()
+        histories = self.tab_histories()
+        self.session_manager.save_named_session(
+            name,
+            [{'url': url, 'title': title, 'index': i} for i, (_, url, title, _) in enumerate(tabs)],
+            {i for i, tab in enumerate(tabs) if tab[3]},
+            self.tabs.currentIndex(),
+            {i: histories[tab[0]] for i, tab in enumerate(tabs) if tab[0] in histories})
+        self.settings_manager.set('session_name', name.strip())
+    
+    def switch_session(self, name):
+        """Replace the open tabs with the named session's. The open tabs
+        are saved first: back to their named session, or as a new
+        "Unsaved" one if they were never given a name. Switching to the
+        current session changes nothing."""
+        start = time.perf_counter()
+        name = name.strip()
+        current_name = self.settings_manager.get('session_name')
+        if name == current_name:
+            return True
+        # Tabs still being restored belong to the session being left
+        self.startup_tasks.flush()
+        session = self.session_manager.load_named_session(name)
+        if not session or not session.get('tabs'):
+            QMessageBox.warning(self, 'Sessions', f"Session '{name}' could not be loaded.")
+            return False
+        self.save_named_session(current_name or f"Unsaved {datetime.now():%Y-%m-%d %H:%M:%S}")
+        
+        # Closing the tabs would journal every close; the new set is
+        # written as one snapshot below instead
+        self.session_journal.close()
+        self.tabs.blockSignals(True)
+        for i in range(self.tabs.count() - 1, -1, -1):
+            self.remove_tab(i)
+        self.restore_tabs(session, self.session_manager.named(name).load_tab_histories())
+        if not self.tabs.count():
+            self.add_new_tab(QUrl(self.settings_manager.get('homepage')), 'Home')
+        
+        self.settings_manager.set('session_name', name)
+        self.save_session()
+        self.tab_metrics['session_switch_ms'] = (time.perf_counter() - start) * 1000
+        return True
+    
+    def save_session_as(self):
+        name, ok = QInputDialog.getText(self, 'Save Session', 'Session name:',
+                                        text=self.settings_manager.get('session_name'))
+        if ok and name.strip():
+            self.save_named_session(name)
+    
+    def show_sessions(self):
+        dialog = SessionsDialog(self)
+        dialog.exec()
     
     def toggle_ai_panel(self):
         """Toggle AI Chat side panel visibility"""
@@ -3048,18 +6563,83 @@ class Browser(QMainWindow):
     
     def closeEvent(self, event):
         """Save session before closing"""
+        # A restore still in progress would otherwise be saved half done
+        self.startup_tasks.flush()
         self.save_session()
+        self.session_journal.close()
+        self.history_writer.stop()
+        self.retention_job.stop()
+        self.database.close()
         event.accept()
 
 
-def main():
-    app = QApplication(sys.argv)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Modern Web Browser')
+    parser.add_argument('--trace-startup', metavar='TRACE_FILE',
+                        help='write a Chrome trace of the startup phases to TRACE_FILE')
+    parser.add_argument('--exit-after-startup', action='store_true',
+                        help='quit once the window has painted, e.g. to time startup')
+    # Anything else, such as -platform, is for Qt
+    args, qt_args = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    
+    trace = StartupTrace(IMPORTS_STARTED)
+    trace.add('imports', IMPORTS_STARTED, IMPORTS_FINISHED)
+    trace.begin('application')
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName('Modern Web Browser')
+    trace.end('application')
+    
+    window = Browser(trace)
     
-    window = Browser()
+    def on_startup_finished():
+        if args.trace_startup:
+            trace.write(args.trace_startup)
+            print(f"📈 Startup trace written to {args.trace_startup} ({trace.total_ms():.0f} ms to first paint)")
+        if args.exit_after_startup:
+            QTimer.singleShot(0, window.close)
+    window.startup_finished.connect(on_startup_finished)
     
     sys.exit(app.exec())
 
 
+def batch_render_main(argv=None):
+    """Render a list of URLs headlessly:
+    python main.py --batch-render urls.txt --output renders --workers 4"""
+    parser = argparse.ArgumentParser(description='Render URLs to PDF, screenshots and text without a window')
+    parser.add_argument('--batch-render', metavar='URL_FILE', required=True, help='file with one URL per line')
+    parser.add_argument('--output', default='batch_output', help='directory for the rendered files')
+    parser.add_argument('--workers', type=int, default=4, help='pages rendering at once (default 4)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds allowed per attempt (default 30)')
+    parser.add_argument('--retries', type=int, default=1, help='extra attempts for a failed URL (default 1)')
+    args = parser.parse_args(argv)
+    
+    try:
+        urls = BatchRenderer.read_url_list(args.batch_render)
+    except OSError as e:
+        parser.error(f"cannot read {args.batch_render}: {e.strerror}")
+    if not urls:
+        print(f"No URLs in {args.batch_render}")
+        return 1
+    
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv[:1])
+    app.setApplicationName('Modern Web Browser')
+    renderer = BatchRenderer(urls, args.output, args.workers, args.timeout, args.retries)
+    renderer.finished.connect(lambda report: app.quit())
+    renderer.start()
+    app.exec()
+    
+    summary = renderer.summary()
+    for job in renderer.jobs:
+        if job['status'] != 'ok':
+            print(f"✗ {job['url']}: {job['error']} after {job['attempts']} attempt(s)")
+    print(f"🖨 Rendered {summary['ok']}/{summary['urls']} URLs in {summary['elapsed_s']:.1f} s "
+          f"({summary['urls_per_sec']:.2f} URLs/s, p50 {summary['p50_ms']:.0f} ms, p95 {summary['p95_ms']:.0f} ms, "
+          f"{summary['retried']} retried) → {args.output}")
+    return 0 if summary['failed'] == 0 else 2
+
+
 if __name__ == '__main__':
+    if '--batch-render' in sys.argv[1:]:
+        sys.exit(batch_render_main(sys.argv[1:]))
     main()
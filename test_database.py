@@ -0,0 +1,336 @@
+"""
+Test script to verify the browser database schema and query plans
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+
+print("🧪 Testing Browser Database...")
+print("=" * 50)
+
+from datetime import datetime
+from main import BrowserDatabase, BrowserDataTransfer, HistoryRetentionJob, OmniboxIndex
+
+temp_dir = tempfile.mkdtemp()
+db_path = os.path.join(temp_dir, 'browser_data.db')
+
+
+def query_plan(database, sql, params=()):
+    rows = database.reader().execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+# Test 1: Migrations bring a fresh database to the latest version
+print("\n✓ Test 1: Schema Migrations")
+db = BrowserDatabase(db_path)
+print(f"  Schema version: {db.schema_version()}")
+assert db.schema_version() == len(BrowserDatabase.MIGRATIONS), "All migrations should be applied"
+db.close()
+
+db = BrowserDatabase(db_path)
+assert db.schema_version() == len(BrowserDatabase.MIGRATIONS), "Reopening should not re-run migrations"
+print("  ✓ PASSED")
+
+# Test 2: Listing queries are served from covering indexes
+print("\n✓ Test 2: Query Plans")
+for i in range(200):
+    db.add_history(f'Page {i}', f'https://example.com/{i}')
+    db.add_bookmark(f'Bookmark {i}', f'https://example.com/b/{i}')
+
+plan = query_plan(db, BrowserDatabase.SQL_GET_HISTORY, (100,))
+print(f"  get_history: {plan}")
+assert 'COVERING INDEX idx_visits_visited_at' in plan, "get_history should use the visited_at index"
+assert 'TEMP B-TREE' not in plan, "get_history should not sort"
+
+plan = query_plan(db, BrowserDatabase.SQL_GET_MOST_VISITED, (10,))
+print(f"  get_most_visited: {plan}")
+assert 'idx_places_visit_count' in plan, "Most visited should walk the visit_count index"
+assert 'TEMP B-TREE' not in plan, "Most visited should not sort"
+
+plan = query_plan(db, BrowserDatabase.SQL_GET_BOOKMARKS)
+print(f"  get_bookmarks: {plan}")
+assert 'COVERING INDEX idx_bookmarks_created_at' in plan, "get_bookmarks should use the created_at index"
+
+plan = query_plan(db, 'SELECT id FROM places WHERE url = ?', ('https://example.com/1',))
+print(f"  place by url: {plan}")
+assert 'INDEX' in plan, "URL lookups should use the unique url index"
+print("  ✓ PASSED")
+
+# Test 3: Reads see committed writes
+print("\n✓ Test 3: Read/Write Round Trip")
+history = db.get_history(limit=5)
+assert len(history) == 5, "Should return 5 history rows"
+assert history[0][2] == 'https://example.com/199', "Newest visit should come first"
+print("  ✓ PASSED")
+
+# Test 4: Keyset pages walk every row exactly once
+print("\n✓ Test 4: Keyset Pagination")
+seen = []
+anchor = None
+while True:
+    page = db.get_history_page(anchor, limit=30)
+    if not page:
+        break
+    seen.extend(row[0] for row in page)
+    last = page[-1]
+    anchor = (last[3], last[4], last[0])
+assert len(seen) == 200 and len(set(seen)) == 200, "Every visit should appear exactly once"
+
+plan = query_plan(db, BrowserDatabase.SQL_GET_HISTORY_PAGE, ('2099-01-01', 0, 0, 30))
+print(f"  get_history_page: {plan}")
+assert 'COVERING INDEX idx_visits_visited_at' in plan, "Pages should seek into the visited_at index"
+assert 'TEMP B-TREE' not in plan, "Pages should not sort"
+print("  ✓ PASSED")
+
+# Test 5: Repeat visits share one place and bump its counters
+print("\n✓ Test 5: Places and Visits")
+db.clear_history()
+for i in range(30):
+    db.add_history(f'Page {i % 3}', f'https://example.com/{i % 3}')
+places = db.reader().execute('SELECT COUNT(*) FROM places').fetchone()[0]
+visits = db.reader().execute('SELECT COUNT(*) FROM visits').fetchone()[0]
+assert places == 3, "Each URL should be stored once"
+assert visits == 30, "Every visit should be kept"
+assert all(row[3] == 10 for row in db.get_most_visited()), "Each place should have 10 visits"
+db.add_history('Page 0', 'https://example.com/0')
+assert db.get_most_visited(1)[0][2] == 'https://example.com/0', "Most visited should be updated incrementally"
+assert db.get_frecent(1)[0][2] == 'https://example.com/0', "Frecency should be updated incrementally"
+print("  ✓ PASSED")
+
+# Test 6: Full-text search with prefix matching, kept in sync by triggers
+print("\n✓ Test 6: Full-Text Search")
+db.add_history('Python Tutorial for Beginners', 'https://docs.python.org/3/tutorial/')
+db.add_history('Qt for Python', 'https://doc.qt.io/qtforpython/')
+db.add_bookmark('Python Package Index', 'https://pypi.org/')
+print(f"  FTS5 enabled: {db.fts_enabled}")
+
+results = db.search_history('pyth tut')
+assert [row[2] for row in results] == ['https://docs.python.org/3/tutorial/'], "Every term should match as a prefix"
+assert len(db.search_history('python')) == 2, "Should match titles and URLs"
+assert db.search_history('https') == [], "Scheme-only searches should not match everything"
+assert db.search_bookmarks('pypi')[0][1] == 'Python Package Index', "Bookmarks should be searchable"
+
+db.add_history('Python 3 Tutorial', 'https://docs.python.org/3/tutorial/')
+assert db.search_history('python 3')[0][1] == 'Python 3 Tutorial', "Title changes should be re-indexed"
+db.clear_history()
+assert db.search_history('python') == [], "Cleared history should leave the index"
+bookmark_id = db.search_bookmarks('pypi')[0][0]
+db.delete_bookmark(bookmark_id)
+assert db.search_bookmarks('pypi') == [], "Deleted bookmarks should leave the index"
+
+# Older pages first, so the most frecent ones have the lowest ids
+count = BrowserDatabase.SEARCH_SORT_LIMIT + 300
+db.add_history_batch([(f'Paged result {i}', f'https://paged.example.com/{i}', f'2024-01-01T{23 - i // 60:02d}:{59 - i % 60:02d}:00')
+                      for i in range(count)])
+for terms in ('paged result', 'paged result 12'):
+    rows, after = [], None
+    while True:
+        page = db.search_history(terms, 200, after)
+        if not page:
+            break
+        rows += page
+        after = (page[-1][4], page[-1][0])
+    expected = [f'https://paged.example.com/{i}' for i in range(count) if terms == 'paged result' or str(i).startswith('12')]
+    print(f"  '{terms}': {len(rows)} matches")
+    assert [row[2] for row in rows] == expected, "Paging should reach every match, most frecent first"
+db.clear_history()
+
+seen, after = [], None
+while True:
+    page = db.search_bookmarks('bookmark', 30, after)
+    if not page:
+        break
+    seen += [row[0] for row in page]
+    after = (page[-1][4], page[-1][0])
+assert len(seen) == 200 and len(set(seen)) == 200, "Bookmark search pages should reach every match once"
+
+if db.fts_enabled:
+    plan = query_plan(db, BrowserDatabase.SQL_SEARCH_HISTORY, ('"python"*', 1.0, 0, 50))
+    print(f"  search_history: {plan}")
+    assert 'VIRTUAL TABLE INDEX' in plan, "Search should go through the FTS5 index"
+    plan = query_plan(db, BrowserDatabase.SQL_SEARCH_HISTORY_BY_FRECENCY, ('"python"*', 1.0, 0, 50))
+    print(f"  broad search_history: {plan}")
+    assert 'idx_places_frecency' in plan and 'TEMP B-TREE' not in plan, "Broad searches should walk the frecency index"
+print("  ✓ PASSED")
+
+# Test 7: Retention prunes in batches and compaction reclaims space
+print("\n✓ Test 7: Retention and Compaction")
+
+
+class RetentionSettings:
+    def __init__(self, **values):
+        self.values = values
+
+    def get(self, key):
+        return self.values.get(key, 0)
+
+
+assert db._pragma('auto_vacuum') == 2, "Database should use incremental auto-vacuum"
+old_rows = [(f'Old page {i} ' + 'x' * 200, f'https://old.example.com/{i % 500}', f'2020-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}')
+            for i in range(3000)]
+db.add_history_batch(old_rows)
+db.add_history_batch([(f'New page {i}', f'https://new.example.com/{i}', datetime.now().isoformat())
+                      for i in range(50)])
+
+job = HistoryRetentionJob(db, RetentionSettings(history_max_age_days=30), batch_size=400, batch_pause=0)
+stats = job.run_once()
+print(f"  Deleted: {stats['last_deleted']}, reclaimed: {stats['last_reclaimed_bytes']} bytes")
+assert stats['last_deleted'] == 3000, "Visits older than the age limit should be removed"
+assert stats['last_reclaimed_bytes'] > 0, "Freed pages should be returned to the file system"
+assert db.visit_count() == 50, "Recent visits should be kept"
+assert db.search_history('old') == [], "Places without visits should be removed"
+
+job = HistoryRetentionJob(db, RetentionSettings(history_max_visits=20), batch_size=7, batch_pause=0)
+assert job.run_once()['last_deleted'] == 30, "Visit count should be trimmed to the limit"
+assert db.visit_count() == 20, "Exactly the newest visits should remain"
+print("  ✓ PASSED")
+
+db.close()
+
+# Test 8: Bookmark index answers "is bookmarked" and blocks duplicates
+print("\n✓ Test 8: Bookmark URL Index")
+db = BrowserDatabase(db_path)
+bookmark_id = db.add_bookmark('Example', 'https://Example.com/docs/')
+assert bookmark_id is not None, "New bookmarks should be added"
+assert db.is_bookmarked('https://example.com/docs'), "Lookup should ignore host case and trailing slash"
+assert db.is_bookmarked('https://example.com:443/docs#intro'), "Lookup should ignore default ports and fragments"
+assert not db.is_bookmarked('https://example.com/docs?page=2'), "Query strings should be significant"
+assert db.add_bookmark('Example again', 'https://example.com/docs') is None, "Duplicates should be rejected"
+db.close()
+
+db = BrowserDatabase(db_path)
+assert db.is_bookmarked('https://example.com/docs'), "Index should be rebuilt at startup"
+db.delete_bookmark(bookmark_id)
+assert not db.is_bookmarked('https://example.com/docs'), "Deleting should update the index"
+db.close()
+print("  ✓ PASSED")
+
+# Test 9: Streaming import/export round trips through every format
+print("\n✓ Test 9: Import and Export")
+source = BrowserDatabase(os.path.join(temp_dir, 'source.db'))
+source.add_history_batch([(f'Visit {i}', f'https://history.example.com/{i % 40}', f'2025-03-01T10:{i // 60:02d}:{i % 60:02d}')
+                          for i in range(250)])
+source.add_bookmarks_batch([(f'Mark <{i}> & co', f'https://marks.example.com/{i}', f'2025-02-01T08:00:{i:02d}')
+                            for i in range(30)])
+transfer = BrowserDataTransfer(source, chunk_size=64)
+for name, kind in (('history.jsonl', 'history'), ('history.csv', 'history'),
+                   ('bookmarks.html', 'bookmarks'), ('bookmarks.csv', 'bookmarks')):
+    path = os.path.join(temp_dir, name)
+    progress = []
+    stats = transfer.export_file(path, kind, progress=lambda fraction, count: progress.append(fraction))
+    assert progress and progress[-1] == 1.0, "Export should report progress"
+
+    target = BrowserDatabase(os.path.join(temp_dir, f'target_{name}.db'))
+    imported = BrowserDataTransfer(target, chunk_size=64).import_file(path, kind)
+    expected = 250 if kind == 'history' else 30
+    assert stats['exported'] == expected and imported['imported'] == expected, f"{name} should round-trip"
+    if kind == 'history':
+        assert target.get_history(1)[0][1:] == source.get_history(1)[0][1:], "Newest visit should survive the round trip"
+        assert target.get_most_visited(1)[0][3] == source.get_most_visited(1)[0][3], "Visit counts should match"
+    else:
+        assert sorted(b[1:3] for b in target.get_bookmarks()) == sorted(b[1:3] for b in source.get_bookmarks()), \
+            "Bookmark titles and URLs should match"
+        again = BrowserDataTransfer(target).import_file(path, kind)
+        assert again['imported'] == 0 and again['skipped'] == 30, "Re-importing bookmarks should skip duplicates"
+    target.close()
+    print(f"  ✓ {name}: {expected} records")
+source.close()
+print("  ✓ PASSED")
+
+# Test 10: Legacy history rows are migrated into places/visits
+print("\n✓ Test 10: Legacy History Migration")
+legacy_path = os.path.join(temp_dir, 'legacy.db')
+legacy = sqlite3.connect(legacy_path)
+legacy.execute('CREATE TABLE bookmarks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, '
+               'url TEXT NOT NULL, created_at TEXT NOT NULL)')
+legacy.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, '
+               'url TEXT NOT NULL, visited_at TEXT NOT NULL)')
+legacy.executemany('INSERT INTO history (title, url, visited_at) VALUES (?, ?, ?)',
+                   [(f'Old {i}', f'https://old.example.com/{i % 4}', f'2024-01-01T00:00:{i:02d}')
+                    for i in range(12)])
+legacy.commit()
+legacy.close()
+
+db = BrowserDatabase(legacy_path)
+assert db.schema_version() == len(BrowserDatabase.MIGRATIONS), "Legacy database should be upgraded"
+auto_vacuum = lambda: db.conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+assert auto_vacuum() == 0, "Opening should not block on a full VACUUM"
+HistoryRetentionJob(db, RetentionSettings()).run_once()
+assert auto_vacuum() == 2, "The retention job should switch to incremental auto-vacuum"
+history = db.get_history(limit=100)
+assert len(history) == 12, "Every legacy visit should be migrated"
+assert history[0][1] == 'Old 11', "Places should keep the newest title"
+assert len(db.get_most_visited(100)) == 4, "Legacy rows should collapse into unique places"
+db.close()
+print("  ✓ PASSED")
+
+# Test 11: Omnibox index ranks prefix matches and follows new visits
+print("\n✓ Test 11: Omnibox Autocomplete")
+db = BrowserDatabase(os.path.join(temp_dir, 'omnibox.db'))
+db.add_history_batch([(f'Python Docs {i}', f'https://docs.python.org/3/page{i}', f'2025-01-01T00:00:{i:02d}')
+                      for i in range(20)] +
+                     [('Rust Book', 'https://doc.rust-lang.org/book', f'2025-01-02T00:00:{i:02d}') for i in range(5)] +
+                     [(f'Filler {i}', f'https://filler{i}.example.com', '2024-06-01T00:00:00') for i in range(3000)])
+db.add_bookmark('Pyramid Guide', 'https://pyramid.example.org')
+omnibox = OmniboxIndex()
+omnibox.load(db)
+assert len(omnibox) == 3022, "Every place and bookmark should be indexed"
+assert omnibox.complete('ru')[0][0] == 'https://doc.rust-lang.org/book', "Prefixes of any word should match"
+assert omnibox.complete('https://doc.ru')[0][0] == 'https://doc.rust-lang.org/book', "Typed URLs should match"
+assert omnibox.complete('py doc')[0][0].startswith('https://docs.python.org/'), "Every term should match"
+assert ('https://pyramid.example.org', 'Pyramid Guide', True) in omnibox.complete('pyr'), "Bookmarks should be flagged"
+assert omnibox.complete('fill', limit=5) == omnibox.complete('fil', limit=5), "Broad terms should still rank"
+assert omnibox.complete('zzz') == [] and omnibox.complete('   ') == [], "Misses should return nothing"
+
+omnibox.record_visit('Zebra Facts', 'https://zebra.example.com')
+assert omnibox.complete('zeb')[0][1] == 'Zebra Facts', "New visits should be searchable at once"
+omnibox.set_title('https://zebra.example.com', 'Striped Horses')
+assert omnibox.complete('striped')[0][0] == 'https://zebra.example.com', "New titles should be searchable"
+assert omnibox.complete('zebra facts') == [], "Old titles should no longer match"
+for _ in range(10):
+    omnibox.record_visit('Rust Book', 'https://doc.rust-lang.org/book')
+assert omnibox.complete('doc')[0][0] == 'https://doc.rust-lang.org/book', "Visits should raise the ranking"
+assert omnibox.preload_candidate('doc.ru') == 'https://doc.rust-lang.org/book', "A dominant match should be preloaded"
+assert omnibox.preload_candidate('https://doc.') == 'https://doc.rust-lang.org/book', "Typed schemes should be ignored"
+assert omnibox.preload_candidate('do') is None, "Very short input should not be preloaded"
+assert omnibox.preload_candidate('rust') is None, "Title matches should not be preloaded"
+assert omnibox.preload_candidate('docs.python.org') is None, "Close runner-ups should block preloading"
+db.delete_bookmark(db.get_bookmarks()[0][0])
+omnibox.sync_bookmarks(db.is_bookmarked)
+assert not omnibox.complete('pyr')[0][2], "Deleted bookmarks should lose their flag"
+db.close()
+print("  ✓ PASSED")
+
+# Test 12: Broad terms must not hide rarer pages matching all of them
+print("\n✓ Test 12: Omnibox Broad Queries")
+omnibox = OmniboxIndex()
+for i in range(6000):
+    omnibox.record_visit(f'alpha{i}', f'https://a.example.com/{i}')
+    omnibox.record_visit(f'beta{i}', f'https://b.example.com/{i}')
+omnibox.record_visit('alpha beta guide', 'https://guide.example.com/', '2020-01-01T00:00:00')
+guide = [('https://guide.example.com/', 'alpha beta guide', False)]
+assert omnibox.complete('alpha beta') == guide, "A page matching every broad term should be found"
+assert omnibox.complete('alpha guide') == guide
+assert omnibox.complete('beta alpha gui') == guide
+assert len(omnibox.complete('alpha')) == 8, "Broad single terms should still fill the list"
+print("  ✓ PASSED")
+
+# Test 13: Reader connections close when their thread exits
+print("\n✓ Test 13: Reader Connections")
+db = BrowserDatabase(db_path)
+assert len(db._readers) == 1, "The opening thread keeps its reader"
+readers = []
+for _ in range(5):
+    worker = threading.Thread(target=lambda: readers.append(db.reader().execute('SELECT 1').fetchone()))
+    worker.start()
+    worker.join()
+print(f"  Open readers after 5 threads: {len(db._readers)}")
+assert readers == [(1,)] * 5, "Each thread should get a working reader"
+assert len(db._readers) == 1, "A finished thread's reader should be closed"
+db.close()
+assert len(db._readers) == 0, "Closing the database should close every reader"
+print("  ✓ PASSED")
+
+print("\n" + "=" * 50)
+print("🎉 All database tests passed!")
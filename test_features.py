@@ -59,8 +59,370 @@ settings_mgr = SettingsManager()
 default_theme = settings_mgr.get('theme')
 print(f"  Default theme: {default_theme}")
 assert default_theme in themes, "Default theme should be valid"
+assert all(settings_mgr.default_settings[key] == 0 for key in
+           ('history_max_age_days', 'history_max_visits', 'history_max_db_size_mb')), \
+    "History retention should be off until the user enables it"
 print("  ✓ PASSED")
 
+# Test 6: Check process memory readings used by the tab lifecycle manager
+print("\n✓ Test 6: Process Memory")
+from main import ProcessSampler
+own_rss = ProcessSampler.rss_bytes(os.getpid())
+print(f"  Own resident memory: {own_rss / 1048576:.1f} MB")
+if os.path.exists('/proc/self/stat'):
+    assert own_rss > 0, "Resident memory should be read from /proc"
+assert ProcessSampler.rss_bytes(-1) == 0, "Unknown processes should read as 0"
+print("  ✓ PASSED")
+
+# Test 7: Check the CPU and memory sampling behind the task manager
+print("\n✓ Test 7: Process Sampler")
+import time
+sampler = ProcessSampler()
+first = sampler.sample([os.getpid(), os.getpid(), -1])
+assert set(first) <= {os.getpid()}, "Unknown pids should be skipped and duplicates read once"
+deadline = time.perf_counter() + 0.2
+while time.perf_counter() < deadline:
+    sum(range(1000))
+second = sampler.sample([os.getpid()])
+if os.path.exists('/proc/self/stat'):
+    own = second[os.getpid()]
+    print(f"  Own CPU: {own['cpu_percent']:.0f}%, memory: {own['rss_bytes'] / 1048576:.1f} MB")
+    assert first[os.getpid()]['cpu_percent'] == 0, "The first sample has no interval to measure"
+    assert own['cpu_percent'] > 0, "A busy process should show CPU use"
+    assert own['rss_bytes'] > 0, "Resident memory should be read from /proc"
+print("  ✓ PASSED")
+
+# Test 8: Check that UI updates are coalesced and skipped for hidden tabs
+print("\n✓ Test 8: UI Update Scheduler")
+from main import UiUpdateScheduler
+applied = []
+deferred = []
+scheduler = UiUpdateScheduler(lambda tab, changes: applied.append((tab, dict(changes))) or (0 if tab == 'front' else 1),
+                              defer=lambda delay, flush: deferred.append(flush))
+for progress in (10, 50, 90):
+    scheduler.mark('front', 'progress', progress)
+scheduler.mark('back', 'progress', 30)
+assert len(deferred) == 1, "One flush should be scheduled for a burst of changes"
+deferred.pop()()
+assert applied == [('front', {'progress': 90}), ('back', {'progress': 30})], "Only the latest value should be applied"
+metrics = scheduler.metrics()
+assert (metrics['coalesced'], metrics['hidden'], metrics['applied']) == (2, 1, 1)
+print(f"  {metrics['marked']} updates marked, {metrics['applied']} applied, {metrics['skipped']} skipped")
+scheduler.mark('back', 'title', 'Closed')
+scheduler.forget('back')
+deferred.pop()()
+assert len(applied) == 2, "Forgotten tabs should not be updated"
+print("  ✓ PASSED")
+
+# Test 9: Check fuzzy tab search over titles and URLs
+print("\n✓ Test 9: Tab Switcher")
+from main import TabSwitcherIndex
+tab_index = TabSwitcherIndex()
+tab_index.set(1, 'Python Documentation', 'https://docs.python.org/3/')
+tab_index.set(2, 'GitHub', 'https://github.com/python/cpython')
+tab_index.set(3, 'Weather Forecast', 'https://weather.example.com/today')
+assert tab_index.search('python') == [1, 2], "Title matches should rank before URL matches"
+assert tab_index.search('wfc') == [3], "Characters in order should match fuzzily"
+assert tab_index.search('wfcx') == [], "Typing further should narrow the matches"
+assert tab_index.search('http') == [], "The URL scheme should not match"
+assert tab_index.search('c') == [1, 3, 2], "Single characters should match"
+tab_index.set(3, title='Cpython Weather')
+assert tab_index.search('c') == [3, 1, 2], "Title changes should reach cached short queries"
+assert tab_index.search('cpyth') == [3, 2, 1], "Title changes should be searchable right away"
+assert tab_index.search('cpyth', limit=1) == [3] and tab_index.search('cp') == [3, 2, 1]
+tab_index.remove(3)
+assert tab_index.search('cpyth') == [2, 1] and len(tab_index) == 2
+print(f"  ✓ {len(tab_index)} tabs searchable by title and URL")
+print("  ✓ PASSED")
+
+# Test 10: Check the URL list and file naming of batch rendering
+print("\n✓ Test 10: Batch Render Inputs")
+import tempfile
+from main import BatchRenderer
+with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+    f.write("# pages to render\nhttps://example.com/\n\n  https://docs.python.org/3/library/  \n")
+try:
+    urls = BatchRenderer.read_url_list(f.name)
+finally:
+    os.remove(f.name)
+assert urls == ['https://example.com/', 'https://docs.python.org/3/library/'], "Comments and blanks should be skipped"
+names = [BatchRenderer.output_name(i, url) for i, url in enumerate(urls)]
+print(f"  Output files: {', '.join(names)}")
+assert names == ['00000-example-com', '00001-docs-python-org-3-library']
+assert BatchRenderer.output_name(7, 'data:,') == '00007-page', "URLs without a readable part get a generic name"
+print("  ✓ PASSED")
+
+# Test 11: Check the Chrome trace written by --trace-startup
+print("\n✓ Test 11: Startup Trace")
+from main import StartupTrace
+trace = StartupTrace(origin=10.0)
+trace.add('imports', 10.0, 10.25)
+trace.add('managers', 10.25, 10.3)
+assert trace.phases_ms() == {'imports': 250.0, 'managers': 50.0}
+assert trace.total_ms() == 300.0
+with tempfile.TemporaryDirectory() as trace_dir:
+    trace.write(os.path.join(trace_dir, 'trace.json'))
+    with open(os.path.join(trace_dir, 'trace.json'), 'r', encoding='utf-8') as f:
+        events = json.load(f)['traceEvents']
+assert [(event['name'], event['ph'], event['ts'], event['dur']) for event in events] == \
+    [('imports', 'X', 0, 250000), ('managers', 'X', 250000, 50000)], "Events should be complete events in µs"
+print("  ✓ PASSED")
+
+# Test 12: Check that startup work runs in stages after the first paint
+print("\n✓ Test 12: Idle Task Queue")
+from main import IdleTaskQueue
+ran = []
+deferred = []
+finished = []
+remaining = [45]
+
+def restore_slice():
+    ran.append('tabs')
+    remaining[0] -= 20
+    return remaining[0] > 0
+
+trace = StartupTrace()
+queue = IdleTaskQueue(trace, finished=lambda: finished.append(True), defer=lambda delay, run: deferred.append(run))
+queue.add('extensions', lambda: ran.append('extensions'))
+queue.add('session restore', lambda: queue.add('background tabs', restore_slice))
+assert deferred == [], "Nothing should run before the window is up"
+queue.start()
+queue.start()
+while deferred:
+    assert len(deferred) == 1, "One stage should run per event-loop turn"
+    deferred.pop()()
+assert ran == ['extensions', 'tabs', 'tabs', 'tabs'] and finished == [True], "Sliced tasks should run until done"
+assert queue.stats['tasks'] == 3 and queue.stats['slices'] == 5
+assert [event['name'] for event in trace.events].count('background tabs') == 3
+assert set(trace.phases_ms()) == {'extensions', 'session restore', 'background tabs'}
+
+queue.add('journal', lambda: ran.append('journal'))
+queue.flush()
+assert ran[-1] == 'journal' and finished == [True, True], "flush should run what is left at once"
+deferred.pop()()
+assert ran.count('journal') == 1
+print(f"  {queue.stats['tasks']} stages in {queue.stats['slices']} slices")
+print("  ✓ PASSED")
+
+# Test 13: Check that the browser paints and restores within budget
+print("\n✓ Test 13: Startup Budget")
+import subprocess
+import sys
+STARTUP_BUDGET_MS = 3000
+if subprocess.run([sys.executable, '-c', 'import PyQt6.QtWebEngineWidgets'], capture_output=True).returncode == 0:
+    main_py = os.path.abspath('main.py')
+    with tempfile.TemporaryDirectory() as profile_dir:
+        trace_file = os.path.join(profile_dir, 'startup.json')
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        env.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+        subprocess.run([sys.executable, main_py, '--trace-startup', trace_file, '--exit-after-startup'],
+                       cwd=profile_dir, env=env, timeout=120, check=True, capture_output=True)
+        with open(trace_file, 'r', encoding='utf-8') as f:
+            events = json.load(f)['traceEvents']
+    phases = {event['name']: event for event in events}
+    print("  " + ", ".join(f"{name} {event['dur'] / 1000:.0f} ms" for name, event in phases.items()))
+    assert {'imports', 'managers', 'widgets', 'first paint', 'extensions', 'session restore',
+            'time to interactive'} <= set(phases)
+    assert not {'ai panel', 'devtools', 'download manager'} & set(phases), "Panels should wait until first used"
+    first_paint = phases['first paint']['ts'] + phases['first paint']['dur']
+    assert first_paint <= phases['session restore']['ts'], "The window should paint before the session is restored"
+    interactive_ms = phases['time to interactive']['dur'] / 1000
+    print(f"  First paint after {first_paint / 1000:.0f} ms, interactive after {interactive_ms:.0f} ms "
+          f"(budget {STARTUP_BUDGET_MS} ms)")
+    assert interactive_ms < STARTUP_BUDGET_MS, "Startup is over budget"
+    print("  ✓ PASSED")
+else:
+    print("  ⚠ QtWebEngine not installed")
+    print("  ⚠ SKIPPED")
+
+# Test 14: Check that odd but valid import files import instead of crashing
+print("\n✓ Test 14: Import Edge Cases")
+from datetime import datetime, timezone
+from main import BrowserDatabase, BrowserDataTransfer, DataTransferWorker
+with tempfile.TemporaryDirectory() as import_dir:
+    db = BrowserDatabase(os.path.join(import_dir, 'import.db'))
+    jsonl_path = os.path.join(import_dir, 'history.jsonl')
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for record in ({'url': 'https://aware.example.com/', 'title': 'Aware', 'visited_at': '2024-05-01T10:00:00Z'},
+                       {'url': 'https://offset.example.com/', 'visited_at': '2024-05-01T10:00:00+02:00'},
+                       {'url': 'https://future.example.com/', 'visited_at': '9999-01-01T00:00:00'},
+                       {'url': 'https://epoch.example.com/', 'visited_at': 10 ** 12},
+                       {'url': 'https://number-title.example.com/', 'title': 42},
+                       {'url': 'https://object-title.example.com/', 'title': {'text': 'Nested'}},
+                       {'url': ['https://list.example.com/']},
+                       {'url': 12345}):
+            f.write(json.dumps(record) + '\n')
+    csv_path = os.path.join(import_dir, 'history.csv')
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        f.write('title,url,visited_at\nCSV,https://csv.example.com/,2024-05-01T10:00:00Z\n')
+    
+    stats = BrowserDataTransfer(db).import_file(jsonl_path, 'history')
+    assert (stats['imported'], stats['skipped']) == (7, 1), "Only the list URL should be skipped"
+    assert BrowserDataTransfer(db).import_file(csv_path, 'history')['imported'] == 1
+    visits = {row[2]: row for row in db.get_history(20)}
+    now = datetime.now().isoformat()
+    aware_local = datetime(2024, 5, 1, 10, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert visits['https://aware.example.com/'][3] == aware_local.isoformat(), "Aware dates should become naive local time"
+    assert visits['https://future.example.com/'][3] <= now, "Future dates should be clamped to now"
+    assert visits['https://number-title.example.com/'][1] == '42'
+    assert visits['https://object-title.example.com/'][1] == 'https://object-title.example.com/'
+    
+    # The dialog waits for completed or failed, whatever the error
+    errors = []
+    worker = DataTransferWorker(db, 'import', jsonl_path, 'history')
+    worker.failed.connect(errors.append)
+    worker.transfer.import_file = lambda *args, **kwargs: 1 / 0
+    worker.run()
+    assert errors == ['division by zero'], "Any error should be reported through failed"
+    db.close()
+print(f"  ✓ {stats['imported']} records imported, {stats['skipped']} skipped")
+print("  ✓ PASSED")
+
+# Test 15: Check that a preload hit never costs a tab its history
+print("\n✓ Test 15: Preload Keeps History")
+PRELOAD_CHECK = """
+import os, sys
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWebEngineCore import QWebEngineProfile
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+from main import Browser
+
+def wait_for(signal, start=None):
+    loop = QEventLoop()
+    signal.connect(loop.quit)
+    QTimer.singleShot(10000, loop.quit)
+    if start:
+        start()
+    loop.exec()
+    signal.disconnect(loop.quit)
+
+pages = ['data:text/html,<title>%s</title>%s' % (name, name) for name in 'abcd']
+window = Browser()
+wait_for(window.startup_finished)
+window.settings_manager.set('homepage', pages[0])
+window.preloader.budget = 2
+
+# A new tab from the toolbar is on its start page, which it gives up
+tab = window.add_new_tab()
+wait_for(tab.loadFinished)
+window.preloader.preload(pages[1], tab.page().profile())
+window.navigate_to_url(pages[1])
+assert window.preloader.stats['hits'] == 1, 'A new tab should take the preloaded page'
+assert window.current_browser() is tab and tab.url().toString() == pages[1]
+
+# Once it has history of its own, the tab keeps it
+window.preloader.preload(pages[2], tab.page().profile())
+wait_for(tab.loadFinished, lambda: window.navigate_to_url(pages[2]))
+assert window.preloader.stats['hits'] == 1, 'A tab with history must not swap pages'
+wait_for(tab.loadFinished, tab.back)
+assert tab.url().toString() == pages[1], 'Back should return to the previous page'
+
+private = window.add_new_tab()
+wait_for(private.loadFinished)
+window.preloader.preload(pages[3], QWebEngineProfile(private))
+window.navigate_to_url(pages[3])
+assert window.preloader.stats['hits'] == 1, 'Pages must not cross profiles'
+"""
+if subprocess.run([sys.executable, '-c', 'import PyQt6.QtWebEngineWidgets'], capture_output=True).returncode == 0:
+    env = dict(os.environ)
+    env.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+    with tempfile.TemporaryDirectory() as profile_dir:
+        env['PYTHONPATH'] = os.path.dirname(os.path.abspath('main.py'))
+        result = subprocess.run([sys.executable, '-c', PRELOAD_CHECK], cwd=profile_dir, env=env, timeout=120,
+                                capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("  ✓ New tabs take the preloaded page, tabs with history keep theirs")
+    print("  ✓ PASSED")
+else:
+    print("  ⚠ QtWebEngine not installed")
+    print("  ⚠ SKIPPED")
+
+# Test 16: Check that the toolbar and URL bar work before the session is restored
+print("\n✓ Test 16: Input Before Restore")
+EARLY_INPUT_CHECK = """
+import os, sys
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+from PyQt6.QtGui import QAction
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+from main import Browser
+
+window = Browser()
+assert window.current_browser() is None, 'The session is restored after the window shows'
+for action in window.findChildren(QAction):
+    if action.toolTip() in ('Back', 'Forward', 'Reload'):
+        action.trigger()
+window.omnibox.record_visit('Example', 'https://example.com/')
+window.preloader.budget = 2
+window.update_suggestions('example.c')
+window.navigate_to_url('about:blank')
+assert window.current_browser() is not None, 'Entering a URL should restore the session first'
+"""
+if subprocess.run([sys.executable, '-c', 'import PyQt6.QtWebEngineWidgets'], capture_output=True).returncode == 0:
+    env = dict(os.environ)
+    env.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath('main.py'))
+    with tempfile.TemporaryDirectory() as profile_dir:
+        result = subprocess.run([sys.executable, '-c', EARLY_INPUT_CHECK], cwd=profile_dir, env=env, timeout=120,
+                                capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("  ✓ Back, forward, reload, typing and Enter work while the session is pending")
+    print("  ✓ PASSED")
+else:
+    print("  ⚠ QtWebEngine not installed")
+    print("  ⚠ SKIPPED")
+
+# Test 17: Check that switching sessions never drops the open tabs
+print("\n✓ Test 17: Session Switching")
+SESSION_SWITCH_CHECK = """
+import os, sys
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+from PyQt6.QtCore import QEventLoop, QUrl
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+from main import Browser
+
+window = Browser()
+loop = QEventLoop()
+window.startup_finished.connect(loop.quit)
+loop.exec()
+
+def urls():
+    return sorted(url for _, url, _, _ in window.session_tabs())
+
+window.add_new_tab(QUrl('about:blank#work'), 'Work')
+window.save_named_session('Work')
+for i in range(window.tabs.count() - 1, 0, -1):
+    window.remove_tab(i)
+window.settings_manager.set('session_name', '')
+window.add_new_tab(QUrl('about:blank#open'), 'Open')
+unnamed = urls()
+
+assert window.switch_session('Work')
+saved = [session['name'] for session in window.session_manager.list_sessions() if session['name'] != 'Work']
+assert len(saved) == 1 and saved[0].startswith('Unsaved'), 'Unnamed tabs should be saved before switching'
+assert sorted(tab['url'] for tab in window.session_manager.load_named_session(saved[0])['tabs']) == unnamed
+
+window.add_new_tab(QUrl('about:blank#later'), 'Later')
+before = urls()
+assert window.switch_session('Work') and urls() == before, 'Switching to the current session should change nothing'
+"""
+if subprocess.run([sys.executable, '-c', 'import PyQt6.QtWebEngineWidgets'], capture_output=True).returncode == 0:
+    env = dict(os.environ)
+    env.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath('main.py'))
+    with tempfile.TemporaryDirectory() as profile_dir:
+        result = subprocess.run([sys.executable, '-c', SESSION_SWITCH_CHECK], cwd=profile_dir, env=env, timeout=120,
+                                capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("  ✓ Unnamed tabs are saved, switching to the current session is a no-op")
+    print("  ✓ PASSED")
+else:
+    print("  ⚠ QtWebEngine not installed")
+    print("  ⚠ SKIPPED")
+
 print("\n" + "=" * 50)
 print("🎉 All tests passed! Browser features are working correctly.")
 print("\n📚 Next steps:")
@@ -16,10 +16,9 @@ print("  ✓ PASSED")
 
 # Test 2: Check if session file exists
 print("\n✓ Test 2: Session File Existence")
-if os.path.exists('browser_session.json'):
+if os.path.exists(session_mgr.session_file) or os.path.exists(session_mgr.legacy_file):
     print("  ✓ Session file exists")
-    with open('browser_session.json', 'r', encoding='utf-8') as f:
-        session_data = json.load(f)
+    session_data = session_mgr.load_session()
     print(f"  Tabs saved: {len(session_data.get('tabs', []))}")
     print(f"  Pinned tabs: {len(session_data.get('pinned_tabs', []))}")
     print("  ✓ PASSED")
@@ -29,9 +28,8 @@ else:
 
 # Test 3: Validate session structure
 print("\n✓ Test 3: Session Data Structure")
-if os.path.exists('browser_session.json'):
-    with open('browser_session.json', 'r', encoding='utf-8') as f:
-        session = json.load(f)
+if os.path.exists(session_mgr.session_file) or os.path.exists(session_mgr.legacy_file):
+    session = session_mgr.load_session()
     
     assert 'tabs' in session, "Session should have 'tabs' key"
     assert 'pinned_tabs' in session, "Session should have 'pinned_tabs' key"
@@ -65,11 +63,171 @@ loaded_session = session_mgr.load_session()
 assert loaded_session is not None, "Should load saved session"
 assert len(loaded_session['tabs']) == 2, "Should have 2 tabs"
 assert 0 in loaded_session['pinned_tabs'], "Tab 0 should be pinned"
+assert loaded_session['current_tab'] == 0, "Active tab should default to the first"
 print("  ✓ Save and load working correctly")
 print("  ✓ PASSED")
 
-# Test 5: Test clear session
-print("\n✓ Test 5: Clear Session")
+# Test 5: The active tab is remembered so it can be restored first
+print("\n✓ Test 5: Active Tab")
+session_mgr.save_session(test_session['tabs'], set(), current_tab=1)
+assert session_mgr.load_session()['current_tab'] == 1, "Active tab index should be saved"
+print("  ✓ Active tab saved")
+print("  ✓ PASSED")
+
+# Test 6: Pins and activity stay with their tab as tabs close and move
+print("\n✓ Test 6: Tab Registry")
+from main import TabRegistry
+registry = TabRegistry()
+tabs = [object() for _ in range(4)]
+ids = [registry.add(tab) for tab in tabs]
+assert len(set(ids)) == 4, "Every tab should get its own id"
+registry.set_pinned(tabs[2], True)
+registry.touch(tabs[3], now=42.0)
+registry.remove(tabs[0])
+assert registry.is_pinned(tabs[2]) and not registry.is_pinned(tabs[1]), "Pins should follow the tab, not its index"
+assert registry.id_of(tabs[2]) == ids[2], "Ids should not change when other tabs close"
+assert registry.last_active_at(tabs[3]) == 42.0 and registry.last_active_at(tabs[1]) == 0.0
+replacement = object()
+registry.replace(tabs[2], replacement)
+assert registry.is_pinned(replacement) and registry.widget(ids[2]) is replacement, "Replacing keeps the id and pin"
+assert tabs[2] not in registry and len(registry) == 3
+registry.remove(replacement)
+assert registry.pinned_widgets() == [], "Closed tabs should drop their pin"
+print("  ✓ Pins, ids and activity survive closing and replacing tabs")
+print("  ✓ PASSED")
+
+# Test 7: Tab events are journaled as they happen and survive a crash
+print("\n✓ Test 7: Session Journal")
+import shutil
+import tempfile
+import time
+from main import SessionJournal
+journal_dir = tempfile.mkdtemp(prefix='session_journal_test_')
+try:
+    journal_mgr = SessionManager(os.path.join(journal_dir, 'browser_session.bin'), legacy_file=None)
+    journal = SessionJournal(journal_mgr, sync_interval=0.05, compact_after=1000)
+    journal.start([(1, 'https://home.example.com/', 'Home', True)])
+    for tab_id in range(2, 202):
+        journal.opened(tab_id, f'https://example.com/{tab_id}', 'New Tab', tab_id - 1)
+        for step in range(10):
+            journal.navigated(tab_id, f'https://example.com/{tab_id}/{step}')
+        journal.retitled(tab_id, f'Page {tab_id}')
+    for tab_id in range(2, 102):
+        journal.closed(tab_id)
+    journal.moved(201, 1)
+    journal.activated(150)
+    time.sleep(0.2)
+    assert journal.stats['syncs'] >= 1, "A sync should follow the events"
+    
+    # A crash can tear the last line; nothing is closed or compacted
+    with open(journal.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 99999, "op": "clo')
+    restored = SessionJournal(journal_mgr)
+    start = time.perf_counter()
+    session = restored.load()
+    replay_ms = (time.perf_counter() - start) * 1000
+    print(f"  Replayed {restored.stats['replayed']} events in {replay_ms:.1f} ms")
+    assert journal.stats['compactions'] == 1 + journal.stats['events'] // 1000, "Long journals should be compacted"
+    assert restored.stats['replayed'] == journal.pending, "Every event since the last snapshot should be replayed"
+    assert len(session['tabs']) == 101, "Closed tabs should stay closed"
+    assert [tab['id'] for tab in session['tabs'][:3]] == [1, 201, 102], "Moves should be replayed"
+    assert session['tabs'][2] == {'url': 'https://example.com/102/9', 'title': 'Page 102', 'index': 2, 'id': 102}
+    assert session['pinned_tabs'] == [0] and session['tabs'][session['current_tab']]['id'] == 150
+    
+    # Compaction leaves the same session in the snapshot alone; stale
+    # journal lines from before it are skipped
+    with open(journal.journal_file, 'r', encoding='utf-8') as f:
+        stale = f.read()
+    journal.compact()
+    assert os.path.getsize(journal.journal_file) == 0, "Compaction should empty the journal"
+    with open(journal.journal_file, 'w', encoding='utf-8') as f:
+        f.write(stale)
+    assert SessionJournal(journal_mgr).load() == session, "Events already in the snapshot should not replay"
+    journal.close()
+    print("  ✓ Session rebuilt from snapshot and journal")
+finally:
+    shutil.rmtree(journal_dir, ignore_errors=True)
+print("  ✓ PASSED")
+
+# Test 8: Snapshots are binary and each tab's history reads on its own
+print("\n✓ Test 8: Binary Snapshot")
+snapshot_dir = tempfile.mkdtemp(prefix='session_snapshot_test_')
+try:
+    legacy_file = os.path.join(snapshot_dir, 'browser_session.json')
+    with open(legacy_file, 'w', encoding='utf-8') as f:
+        json.dump(test_session, f)
+    snapshot_mgr = SessionManager(os.path.join(snapshot_dir, 'browser_session.bin'), legacy_file)
+    assert snapshot_mgr.load_session()['tabs'] == test_session['tabs'], "Old JSON sessions should still load"
+    
+    history = bytes(range(256)) * 16
+    packed = SessionManager.pack_history(history)
+    assert SessionManager.unpack_history(packed) == history
+    assert len(packed) < len(history), "Histories should be compressed"
+    snapshot_tabs = [{'url': f'https://example.com/{i}', 'title': f'Page {i}', 'index': i, 'id': i + 10}
+                     for i in range(3)]
+    snapshot_mgr.save_session(snapshot_tabs, {1}, current_tab=2, journal_seq=42,
+                              histories={0: packed, 2: packed[::-1]})
+    with open(snapshot_mgr.session_file, 'rb') as f:
+        assert f.read(4) == SessionManager.MAGIC
+    
+    loaded = snapshot_mgr.load_session()
+    assert loaded['tabs'] == snapshot_tabs and loaded['pinned_tabs'] == [1]
+    assert loaded['current_tab'] == 2 and loaded['journal_seq'] == 42
+    assert snapshot_mgr.load_tab_history(0) == packed
+    assert snapshot_mgr.load_tab_history(2) == packed[::-1]
+    assert snapshot_mgr.load_tab_history(1) is None, "Tabs without history have no entry"
+    assert snapshot_mgr.load_tab_history(3) is None
+    assert snapshot_mgr.load_tab_histories() == {0: packed, 2: packed[::-1]}
+    
+    # Histories are keyed by tab id, which stays put when the journal moves tabs
+    snapshot_journal = SessionJournal(snapshot_mgr)
+    snapshot_journal.load()
+    assert snapshot_journal.load_histories() == {10: packed, 12: packed[::-1]}
+    snapshot_journal.close()
+    
+    snapshot_mgr.clear_session()
+    assert not os.path.exists(snapshot_mgr.session_file) and not os.path.exists(legacy_file)
+    assert snapshot_mgr.load_session() is None and snapshot_mgr.load_tab_histories() == {}
+    print("  ✓ Tab list and histories saved compactly and read separately")
+finally:
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+print("  ✓ PASSED")
+
+# Test 9: Named sessions are saved, listed, loaded and deleted on their own
+print("\n✓ Test 9: Named Sessions")
+sessions_dir = tempfile.mkdtemp(prefix='named_sessions_test_')
+try:
+    named_mgr = SessionManager(os.path.join(sessions_dir, 'browser_session.bin'), None,
+                               os.path.join(sessions_dir, 'sessions'))
+    assert named_mgr.list_sessions() == [], "No sessions saved yet"
+    work_tabs = [{'url': f'https://work.example.com/{i}', 'title': f'Work {i}', 'index': i} for i in range(100)]
+    named_mgr.save_named_session('Work', work_tabs, {0, 1}, current_tab=5, histories={5: packed})
+    named_mgr.save_named_session('travel/2025: Japan', test_session['tabs'], set())
+    
+    listed = named_mgr.list_sessions()
+    assert [(session['name'], session['tabs']) for session in listed] == [('travel/2025: Japan', 2), ('Work', 100)]
+    assert len(os.listdir(named_mgr.sessions_dir)) == 2, "Names should not create subdirectories"
+    
+    work = named_mgr.load_named_session('Work')
+    assert work['tabs'] == work_tabs and work['pinned_tabs'] == [0, 1] and work['current_tab'] == 5
+    assert named_mgr.named('Work').load_tab_histories() == {5: packed}
+    assert named_mgr.load_named_session('Missing') is None
+    assert not os.path.exists(named_mgr.session_file), "Named sessions leave the main snapshot alone"
+    try:
+        named_mgr.named('   ')
+        assert False, "Blank names should be rejected"
+    except ValueError:
+        pass
+    
+    named_mgr.delete_named_session('travel/2025: Japan')
+    assert [session['name'] for session in named_mgr.list_sessions()] == ['Work']
+    print("  ✓ Sessions kept apart and listed from their headers")
+finally:
+    shutil.rmtree(sessions_dir, ignore_errors=True)
+print("  ✓ PASSED")
+
+# Test 10: Test clear session
+print("\n✓ Test 10: Clear Session")
 session_mgr.clear_session()
 assert not os.path.exists(session_mgr.session_file), "Session file should be deleted"
 print("  ✓ Session cleared successfully")
@@ -84,10 +242,14 @@ print("\n" + "=" * 50)
 print("🎉 All session persistence tests passed!")
 print("\n📚 Session Persistence Features:")
 print("  ✅ Auto-save on browser close")
+print("  ✅ Tab changes journaled as they happen, so crashes keep the session")
 print("  ✅ Auto-restore on browser start")
 print("  ✅ Pinned tabs preserved")
 print("  ✅ Tab order maintained")
-print("  ✅ JSON format for easy backup")
+print("  ✅ Tabs can be dragged without losing their pins")
+print("  ✅ Active tab loads first, others when opened")
+print("  ✅ Named sessions to switch between")
+print("  ✅ Compact binary snapshot with each tab's back/forward history")
 print("\n🎯 Try it:")
 print("  1. python main.py")
 print("  2. Open tabs and pin some")